@@ -3,8 +3,57 @@ Escale AI package initialization.
 
 This package contains modules to assemble the Base Team and Client-specific
 teams for the AI Marketing Agency. Refer to the README for details.
+
+Submodules and the main classes are loaded lazily (PEP 562), so
+``import escale_ai`` is nearly free and ``escale_ai.AgentFactory`` only
+imports what the factory needs.
 """
 
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
+
+_SUBMODULES = frozenset(
+    {
+        "agent_factory", "agent_pool", "assets", "base_team", "bench", "cache", "client_team", "compliance",
+        "config", "eventlog", "media_sim", "metrics", "pipeline", "scheduler", "scoring", "state", "templates",
+        "tools", "workspace",
+    }
+)
+
+#: Public name -> submodule defining it.
+_EXPORTS: Dict[str, str] = {
+    "AgentFactory": "agent_factory",
+    "BaseTeam": "base_team",
+    "ClientTeam": "client_team",
+    "StageCache": "cache",
+    "WorkspaceStore": "workspace",
+}
+
+if TYPE_CHECKING:
+    from .agent_factory import AgentFactory
+    from .base_team import BaseTeam
+    from .cache import StageCache
+    from .client_team import ClientTeam
+    from .workspace import WorkspaceStore
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | _SUBMODULES | set(_EXPORTS))
+
+
 __all__ = [
     "base_team",
     "client_team",
@@ -5,40 +5,195 @@ This module exposes functions to create the permanent base team and
 client-specific operational teams. The factory ensures that all teams
 share common templates and that new client teams are created in their
 own isolated workspace.
+
+Many clients can be processed at once with `AgentFactory.run_client_pipelines`,
+which fans the runs out over a thread pool, a process pool or an asyncio
+event loop and yields each client's result as soon as it finishes:
+
+    for result in AgentFactory.run_client_pipelines(["Clinic A", "Clinic B"]):
+        print(result.client_name, result.ok, result.elapsed)
+
+Every run gets a fresh team holding only that run's state, while the agents
+come from the shared `AgentFactory.agent_pool`: stateless agents are built
+once per process and each client's account manager once per client.
+`AgentFactory.warm_up` builds them ahead of the first request.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import copy
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Mapping, NamedTuple, Optional, Tuple, Union
 
+from .agent_pool import AgentPool
 from .base_team import BaseTeam
 from .client_team import ClientTeam
 
+if TYPE_CHECKING:
+    from .assets import AssetStore
+    from .cache import StageCache
+    from .scheduler import FairScheduler
+    from .workspace import WorkspaceStore
+
+ClientSpec = Union[str, Tuple[str, Optional[Dict[str, Any]]]]
+
+#: Concurrency used by ``executor="async"`` when ``max_workers`` is not given.
+DEFAULT_ASYNC_CONCURRENCY = 32
+
+
+class ClientRunResult(NamedTuple):
+    """Outcome of one client pipeline run in a batch.
+
+    Attributes:
+        client_name: The client the pipeline ran for.
+        context: Resulting context, or None if the run failed.
+        error: ``"ExceptionType: message"`` if the run failed, else None.
+        elapsed: Wall-clock seconds spent in the run.
+    """
+
+    client_name: str
+    context: Optional[Dict[str, Any]]
+    error: Optional[str]
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _run_client(client_name: str, initial_context: Optional[Dict[str, Any]]) -> ClientRunResult:
+    """Run one client pipeline, capturing timing and failures.
+
+    Module-level so it can be pickled for process pools.
+    """
+    start = time.perf_counter()
+    try:
+        context = AgentFactory.run_client_pipeline(client_name, initial_context)
+    except Exception as exc:
+        return ClientRunResult(client_name, None, f"{type(exc).__name__}: {exc}", time.perf_counter() - start)
+    return ClientRunResult(client_name, context, None, time.perf_counter() - start)
+
+
+async def _run_client_async(client_name: str, initial_context: Optional[Dict[str, Any]]) -> ClientRunResult:
+    start = time.perf_counter()
+    try:
+        context = await AgentFactory.run_client_pipeline_async(client_name, initial_context)
+    except Exception as exc:
+        return ClientRunResult(client_name, None, f"{type(exc).__name__}: {exc}", time.perf_counter() - start)
+    return ClientRunResult(client_name, context, None, time.perf_counter() - start)
+
+
+def _client_jobs(clients: Union[Iterable[ClientSpec], Mapping[str, Optional[Dict[str, Any]]]]) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Normalize client specs and give every client its own context copy."""
+    items = clients.items() if isinstance(clients, Mapping) else clients
+    for item in items:
+        if isinstance(item, str):
+            yield item, None
+        else:
+            name, context = item
+            yield name, copy.deepcopy(context)
+
 
 class AgentFactory:
-    """Factory methods for creating base and client teams."""
+    """Factory methods for creating base and client teams.
+
+    Attributes:
+        stage_cache: Cache shared by every client team created by the
+            factory; None (the default) disables stage caching.
+        workspace_store: When set, client teams are attached to their
+            persistent workspace, kept hot in the store between runs. The
+            factory's cache, scheduler and asset store still apply; the
+            store's own are used where the factory has none.
+        agent_pool: Agents shared by every team the factory creates; None
+            builds new agents for every team.
+        scheduler: When set, the stages of every client team wait for a
+            fair-share slot (see `escale_ai.scheduler`).
+        asset_store: When set, client creatives are saved there and passed
+            around as references (see `escale_ai.assets`).
+    """
+
+    stage_cache: Optional[StageCache] = None
+    workspace_store: Optional[WorkspaceStore] = None
+    agent_pool: Optional[AgentPool] = AgentPool()
+    scheduler: Optional[FairScheduler] = None
+    asset_store: Optional[AssetStore] = None
+
+    @staticmethod
+    def warm_up(clients: Iterable[str] = ()) -> int:
+        """
+        Build the shared agents of the base team and of the given clients.
+
+        Meant to run once at process start so the first requests do not
+        pay for agent construction or for loading the state models.
+
+        Args:
+            clients: Clients whose account managers are built as well.
+
+        Returns:
+            Number of agents held by ``agent_pool`` (0 without a pool).
+        """
+        pool = AgentFactory.agent_pool
+        if pool is None:
+            return 0
+        pool.warm(AgentFactory.create_base_team())
+        pool.warm(ClientTeam("", agent_pool=pool), shared_only=True)
+        for client_name in clients:
+            pool.warm(ClientTeam(client_name, agent_pool=pool, asset_store=AgentFactory.asset_store))
+        return len(pool)
 
     @staticmethod
     def create_base_team() -> BaseTeam:
         """
         Create an instance of the permanent base team.
         Returns:
-            BaseTeam: A new instance of the base team.
+            BaseTeam: A new team whose agents come from ``agent_pool``.
         """
-        return BaseTeam()
+        return BaseTeam(agent_pool=AgentFactory.agent_pool)
 
     @staticmethod
-    def create_client_team(client_name: str) -> ClientTeam:
+    def create_client_team(
+        client_name: str,
+        brand_kit: Optional[Dict[str, str]] = None,
+        priority: Optional[int] = None,
+        within: Optional[float] = None,
+    ) -> ClientTeam:
         """
         Create a new client-specific team.
 
         Args:
             client_name: The name of the client to personalize the team for.
+            brand_kit: Optional overrides of ``config.DEFAULT_BRAND_KIT``.
+            priority: Scheduling priority of the run (see `escale_ai.scheduler`).
+            within: Seconds from now by which the run should be done.
 
         Returns:
-            ClientTeam: A new instance of the client team.
+            ClientTeam: A new instance of the client team, attached to the
+            client's workspace when a ``workspace_store`` is configured.
         """
-        return ClientTeam(client_name)
+        deadline = time.monotonic() + within if within is not None else None
+        if AgentFactory.workspace_store is not None:
+            return AgentFactory.workspace_store.team(
+                client_name,
+                brand_kit,
+                agent_pool=AgentFactory.agent_pool,
+                priority=priority,
+                deadline=deadline,
+                stage_cache=AgentFactory.stage_cache,
+                scheduler=AgentFactory.scheduler,
+                asset_store=AgentFactory.asset_store,
+            )
+        return ClientTeam(
+            client_name,
+            brand_kit,
+            stage_cache=AgentFactory.stage_cache,
+            agent_pool=AgentFactory.agent_pool,
+            scheduler=AgentFactory.scheduler,
+            priority=priority,
+            deadline=deadline,
+            asset_store=AgentFactory.asset_store,
+        )
 
     @staticmethod
     def run_base_pipeline(initial_context: Dict[str, Any] | None = None) -> Dict[str, Any]:
@@ -53,14 +208,133 @@ class AgentFactory:
         return team.run_pipeline(initial_context)
 
     @staticmethod
-    def run_client_pipeline(client_name: str, initial_context: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    def run_client_pipeline(
+        client_name: str,
+        initial_context: Dict[str, Any] | None = None,
+        priority: Optional[int] = None,
+        within: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """
         Helper method to run the pipeline for a specific client.
         Args:
             client_name: The client's name.
             initial_context: Optional initial context for the pipeline.
+            priority: Scheduling priority of the run.
+            within: Seconds from now by which the run should be done.
         Returns:
             A context dictionary with results from each stage.
         """
-        team = AgentFactory.create_client_team(client_name)
+        team = AgentFactory.create_client_team(client_name, priority=priority, within=within)
         return team.run_pipeline(initial_context)
+
+    @staticmethod
+    async def run_base_pipeline_async(initial_context: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """
+        Run the base pipeline without blocking the calling event loop.
+        Args:
+            initial_context: Optional initial context for the pipeline.
+        Returns:
+            A context dictionary with results from each stage.
+        """
+        team = AgentFactory.create_base_team()
+        return await team.run_pipeline_async(initial_context)
+
+    @staticmethod
+    async def run_client_pipeline_async(
+        client_name: str,
+        initial_context: Dict[str, Any] | None = None,
+        priority: Optional[int] = None,
+        within: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run a client pipeline without blocking the calling event loop.
+        Args:
+            client_name: The client's name.
+            initial_context: Optional initial context for the pipeline.
+            priority: Scheduling priority of the run.
+            within: Seconds from now by which the run should be done.
+        Returns:
+            A context dictionary with results from each stage.
+        """
+        team = AgentFactory.create_client_team(client_name, priority=priority, within=within)
+        return await team.run_pipeline_async(initial_context)
+
+    @staticmethod
+    def run_client_pipelines(
+        clients: Union[Iterable[ClientSpec], Mapping[str, Optional[Dict[str, Any]]]],
+        max_workers: Optional[int] = None,
+        executor: str = "thread",
+    ) -> Iterator[ClientRunResult]:
+        """
+        Run the pipelines of many clients concurrently.
+
+        Every client gets its own team and its own deep copy of its initial
+        context. A failing client is reported in its result and does not
+        stop the rest of the batch. At most a few runs per worker are in
+        flight at any time, so arbitrarily long client iterables are
+        consumed lazily.
+
+        Args:
+            clients: Client names, ``(name, initial_context)`` pairs or a
+                mapping of name to initial context.
+            max_workers: Maximum parallelism; defaults to the executor's own
+                default (``DEFAULT_ASYNC_CONCURRENCY`` for ``"async"``).
+            executor: ``"thread"``, ``"process"`` or ``"async"``.
+
+        Yields:
+            ClientRunResult objects in completion order.
+        """
+        jobs = _client_jobs(clients)
+        if executor == "async":
+            return _iter_async(jobs, max_workers or DEFAULT_ASYNC_CONCURRENCY)
+        if executor == "thread":
+            pool: Executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="escale-client")
+        elif executor == "process":
+            from concurrent.futures import ProcessPoolExecutor  # pulls in multiprocessing
+
+            pool = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError(f"unknown executor: {executor!r}")
+        return _iter_pool(pool, jobs)
+
+
+def _iter_pool(pool: Executor, jobs: Iterator[Tuple[str, Optional[Dict[str, Any]]]]) -> Iterator[ClientRunResult]:
+    with pool:
+        window = 2 * getattr(pool, "_max_workers", 1)
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < window:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(_run_client, *job))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _iter_async(jobs: Iterator[Tuple[str, Optional[Dict[str, Any]]]], concurrency: int) -> Iterator[ClientRunResult]:
+    loop = asyncio.new_event_loop()
+    try:
+        pending: set = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < concurrency:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                pending.add(loop.create_task(_run_client_async(*job)))
+            if not pending:
+                break
+            done, pending = loop.run_until_complete(asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        loop.close()
@@ -0,0 +1,143 @@
+"""
+Shared agents for the teams created by `escale_ai.agent_factory.AgentFactory`.
+
+A team carries the state of one run, but its agents do not: they read
+everything from the context and keep only what they were built from
+(model clients, prompt templates, service handles, the client name).
+`AgentPool` keeps those agents alive between runs so a request only
+allocates a small team object and its context:
+
+* agents declared with ``LazyAgent(..., key=shared)`` exist once per team
+  class;
+* agents keyed by the client (``AIAccountManager``) exist once per client;
+* agents keyed by the services they use are shared by teams configured
+  with the same services.
+
+Agents keyed by `shared` are kept for good; of the others the pool holds
+at most ``max_agents`` and drops the least recently used one beyond that.
+`AgentPool.warm` builds a team's agents ahead of the first request.
+
+Usage:
+    from escale_ai.agent_pool import AgentPool
+
+    pool = AgentPool()
+    pool.warm(BaseTeam())
+    team = BaseTeam(agent_pool=pool)
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Hashable, NamedTuple, Tuple
+
+from . import config
+from .pipeline import LazyAgent, shared
+
+if TYPE_CHECKING:
+    from .pipeline import PipelineTeam
+
+
+class AgentPoolStats(NamedTuple):
+    """Counters of an `AgentPool`.
+
+    Attributes:
+        built: agents constructed so far
+        reused: lookups served by an existing agent (approximate when
+            threads look agents up concurrently)
+        size: agents currently held
+    """
+
+    built: int
+    reused: int
+    size: int
+
+
+class AgentPool:
+    """Bounded, thread-safe store of agents shared between teams.
+
+    Args:
+        max_agents: agents kept besides the `shared` ones; the least recently
+            used is dropped beyond it
+    """
+
+    def __init__(self, max_agents: int = config.AGENT_POOL_MAX_AGENTS) -> None:
+        self.max_agents = max_agents
+        self._agents: "OrderedDict[Tuple[LazyAgent, Hashable], Any]" = OrderedDict()
+        # Agents keyed by `shared`: one per declaration, never dropped.
+        self._shared: Dict[LazyAgent, Any] = {}
+        self._lock = threading.Lock()
+        self._built = 0
+        self._reused = 0
+
+    @property
+    def stats(self) -> AgentPoolStats:
+        return AgentPoolStats(self._built, self._reused, len(self))
+
+    def get(self, team: "PipelineTeam", descriptor: LazyAgent) -> Any:
+        """Return the agent ``descriptor`` declares for ``team``, building it once per key."""
+        if descriptor.key is shared:
+            agent = self._shared.get(descriptor)
+            if agent is None:
+                agent = self._shared.setdefault(descriptor, descriptor.factory(team))
+                self._built += 1
+            else:
+                self._reused += 1
+            return agent
+        key = (descriptor, descriptor.key(team))
+        agents = self._agents
+        agent = agents.get(key)
+        if agent is None:
+            return self._build(team, descriptor, key)
+        # Lock-free hit path: OrderedDict operations are atomic under the GIL.
+        self._reused += 1
+        try:
+            agents.move_to_end(key)
+        except KeyError:  # dropped by another thread in the meantime
+            pass
+        return agent
+
+    def _build(self, team: "PipelineTeam", descriptor: LazyAgent, key: Tuple[LazyAgent, Hashable]) -> Any:
+        # Built outside the lock so a slow agent does not block other lookups;
+        # if two threads race, the first agent stored wins.
+        agent = descriptor.factory(team)
+        with self._lock:
+            agent = self._agents.setdefault(key, agent)
+            self._built += 1
+            while len(self._agents) > self.max_agents:
+                self._agents.popitem(last=False)
+        return agent
+
+    def warm(self, team: "PipelineTeam", shared_only: bool = False) -> int:
+        """Build the poolable agents of ``team`` and load its state model.
+
+        Args:
+            team: a team configured like the ones that will run
+            shared_only: only build the agents keyed by `shared`, i.e. skip
+                the ones depending on the team (such as the client name)
+
+        Returns:
+            Number of agents built or found for the team.
+        """
+        count = 0
+        for stage in team.graph:
+            descriptor = getattr(type(team), stage.name, None)
+            if not isinstance(descriptor, LazyAgent) or descriptor.key is None:
+                continue
+            if shared_only and descriptor.key is not shared:
+                continue
+            self.get(team, descriptor)
+            count += 1
+        type(team).state_model
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._agents.clear()
+            self._shared.clear()
+
+    def __len__(self) -> int:
+        return len(self._agents) + len(self._shared)
+
+
+__all__ = ["AgentPool", "AgentPoolStats"]
@@ -0,0 +1,300 @@
+"""
+Content-addressed storage of creative assets.
+
+`AssetStore` keeps every file once, named by the SHA-256 of its bytes, so
+the same image produced for many clients is stored once and a pipeline
+context only carries its `AssetRef` name (``"<sha256>.png"``), never the
+bytes. Blobs are immutable, which lets the web app serve them straight
+from disk with the hash as a permanent ETag.
+
+Derived files are built on first request and stored like any other blob:
+
+* `AssetStore.branded` applies a brand kit (a bar in its primary color
+  and its logo) once per asset and kit;
+* `AssetStore.variant` resizes an asset to one of ``config.AD_FORMATS``
+  (a thumbnail, the square feed format, stories...) once per asset and
+  format.
+
+Which blob a derivation produced is recorded in a small index on disk, so
+later requests, in this process or another, find it without re-rendering.
+Image work needs Pillow, which is optional (``pip install -e ".[images]"``):
+without it storing and serving assets still works and only `branded` and
+`variant` raise `RuntimeError`.
+
+Usage:
+    from escale_ai.assets import AssetStore
+
+    store = AssetStore("data/assets")
+    ref = store.put_file("campaign/hero.png")
+    thumb = store.render(ref, "thumbnail", brand_kit=team.brand_kit)
+    print(store.path(thumb))
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import mimetypes
+import os
+import re
+import struct
+import tempfile
+import threading
+import zlib
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from . import config
+from .cache import fingerprint
+
+try:  # Optional image support
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = ImageOps = None
+
+_NAME = re.compile(r"^([0-9a-f]{64})(\.[A-Za-z0-9]{1,8})?$")
+
+
+class AssetRef(NamedTuple):
+    """Reference to a stored blob.
+
+    Attributes:
+        digest: SHA-256 of the content, hex encoded.
+        ext: File extension including the dot (``".png"``), or ``""``.
+    """
+
+    digest: str
+    ext: str = ""
+
+    @property
+    def name(self) -> str:
+        """The reference as stored in pipeline contexts and asset URLs."""
+        return self.digest + self.ext
+
+    @property
+    def media_type(self) -> str:
+        return mimetypes.guess_type("asset" + self.ext)[0] or "application/octet-stream"
+
+    @classmethod
+    def parse(cls, name: str) -> "AssetRef":
+        """Parse a reference name; raises ValueError if it is not one."""
+        match = _NAME.match(name)
+        if match is None:
+            raise ValueError(f"not an asset reference: {name!r}")
+        return cls(match.group(1), match.group(2) or "")
+
+
+class AssetStoreStats(NamedTuple):
+    """Counters of an `AssetStore` since it was opened."""
+
+    written: int
+    deduplicated: int
+    derived_built: int
+    derived_reused: int
+
+
+class AssetStore:
+    """Directory of hash-named blobs with lazily derived variants.
+
+    Args:
+        root: directory of the store; created on the first write
+        formats: ad format name -> ``(width, height)`` for `variant`
+    """
+
+    def __init__(self, root: str = config.ASSET_STORE_PATH, formats: Optional[Mapping[str, Tuple[int, int]]] = None) -> None:
+        self.root = root
+        self.formats = dict(config.AD_FORMATS if formats is None else formats)
+        self._lock = threading.Lock()
+        self._building: Dict[str, threading.Lock] = {}
+        self._derived: Dict[str, AssetRef] = {}
+        self._written = 0
+        self._deduplicated = 0
+        self._built = 0
+        self._reused = 0
+
+    # -- blobs ---------------------------------------------------------------
+
+    def path(self, ref: AssetRef) -> str:
+        """File holding ``ref``'s bytes (it may not exist)."""
+        return os.path.join(self.root, "blobs", ref.digest[:2], ref.digest)
+
+    def exists(self, ref: AssetRef) -> bool:
+        return os.path.exists(self.path(ref))
+
+    def read(self, ref: AssetRef) -> bytes:
+        with open(self.path(ref), "rb") as f:
+            return f.read()
+
+    def put(self, data: bytes, ext: str = ".png") -> AssetRef:
+        """Store ``data`` unless an identical blob exists; return its reference."""
+        ref = AssetRef(hashlib.sha256(data).hexdigest(), ext)
+        self._commit(ref, lambda f: f.write(data))
+        return ref
+
+    def put_file(self, path: str) -> AssetRef:
+        """Store the file at ``path``, reading it in chunks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        ref = AssetRef(digest.hexdigest(), os.path.splitext(path)[1].lower())
+
+        def copy(out) -> None:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    out.write(chunk)
+
+        self._commit(ref, copy)
+        return ref
+
+    def _commit(self, ref: AssetRef, write: Callable[[Any], Any]) -> None:
+        target = self.path(ref)
+        if os.path.exists(target):
+            with self._lock:
+                self._deduplicated += 1
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Write aside and rename, so a blob is either complete or absent.
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            self._written += 1
+
+    # -- derived assets --------------------------------------------------------
+
+    def derive(self, key: Any, build: Callable[[], bytes], ext: str = ".png") -> AssetRef:
+        """Return the blob ``build`` produces for ``key``, building it only once.
+
+        Concurrent callers with the same key wait for the first one instead
+        of rendering the same file twice.
+        """
+        index_key = fingerprint(key)
+        ref = self._derived.get(index_key)
+        if ref is not None and self.exists(ref):
+            return self._hit(ref)
+        with self._lock:
+            building = self._building.setdefault(index_key, threading.Lock())
+        with building:
+            try:
+                ref = self._derived.get(index_key) or self._load_index(index_key)
+                if ref is not None and self.exists(ref):
+                    self._derived[index_key] = ref
+                    return self._hit(ref)
+                ref = self.put(build(), ext)
+                self._save_index(index_key, ref)
+                with self._lock:
+                    self._derived[index_key] = ref
+                    self._built += 1
+                return ref
+            finally:
+                with self._lock:
+                    self._building.pop(index_key, None)
+
+    def branded(self, ref: AssetRef, brand_kit: Optional[Mapping[str, str]] = None) -> AssetRef:
+        """``ref`` with ``brand_kit`` (default ``config.DEFAULT_BRAND_KIT``) applied."""
+        kit = dict(config.DEFAULT_BRAND_KIT if brand_kit is None else brand_kit)
+        return self.derive(("branded", ref.digest, kit), lambda: _apply_brand_kit(self.read(ref), kit))
+
+    def variant(self, ref: AssetRef, fmt: str) -> AssetRef:
+        """``ref`` cropped and resized to the ad format ``fmt``."""
+        size = self.formats.get(fmt)
+        if size is None:
+            raise KeyError(f"unknown ad format: {fmt!r}")
+        return self.derive(("variant", ref.digest, size), lambda: _resize(self.read(ref), size))
+
+    def render(self, ref: AssetRef, fmt: Optional[str] = None, brand_kit: Optional[Mapping[str, str]] = None) -> AssetRef:
+        """Branded (when ``brand_kit`` is given) and resized (when ``fmt`` is) version of ``ref``."""
+        if brand_kit is not None:
+            ref = self.branded(ref, brand_kit)
+        if fmt is not None:
+            ref = self.variant(ref, fmt)
+        return ref
+
+    @property
+    def stats(self) -> AssetStoreStats:
+        return AssetStoreStats(self._written, self._deduplicated, self._built, self._reused)
+
+    def _hit(self, ref: AssetRef) -> AssetRef:
+        with self._lock:
+            self._reused += 1
+        return ref
+
+    def _index_path(self, index_key: str) -> str:
+        return os.path.join(self.root, "derived", index_key[:2], index_key)
+
+    def _load_index(self, index_key: str) -> Optional[AssetRef]:
+        try:
+            with open(self._index_path(index_key), encoding="ascii") as f:
+                return AssetRef.parse(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _save_index(self, index_key: str, ref: AssetRef) -> None:
+        path = self._index_path(index_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="ascii") as f:
+            f.write(ref.name)
+        os.replace(tmp, path)
+
+
+def solid_png(width: int, height: int, color: str) -> bytes:
+    """Encode a ``width`` x ``height`` PNG filled with the ``#RRGGBB`` color.
+
+    Used for placeholder creatives; needs only the standard library.
+    """
+    rgb = bytes.fromhex(color.lstrip("#")[:6])
+    row = b"\x00" + rgb * width
+    body = zlib.compress(row * height, 6)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", body) + chunk(b"IEND", b"")
+
+
+def _require_pillow() -> None:
+    if Image is None:
+        raise RuntimeError('rendering asset variants requires Pillow (pip install -e ".[images]")')
+
+
+def _png(image: Any) -> bytes:
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+def _resize(data: bytes, size: Tuple[int, int]) -> bytes:
+    _require_pillow()
+    with Image.open(io.BytesIO(data)) as image:
+        return _png(ImageOps.fit(image.convert("RGBA"), size))
+
+
+def _apply_brand_kit(data: bytes, kit: Mapping[str, str]) -> bytes:
+    """Add a bar in the primary color along the bottom with the logo on it."""
+    _require_pillow()
+    with Image.open(io.BytesIO(data)) as source:
+        image = source.convert("RGBA")
+    bar = max(image.height // 12, 1)
+    image.paste(kit.get("primary_color", "#000000"), (0, image.height - bar, image.width, image.height))
+    logo_path = kit.get("logo_path")
+    if logo_path and os.path.exists(logo_path):
+        with Image.open(logo_path) as logo:
+            logo = logo.convert("RGBA")
+            logo.thumbnail((image.width // 3, bar))
+            image.alpha_composite(logo, (bar // 4, image.height - bar + (bar - logo.height) // 2))
+    return _png(image)
+
+
+__all__ = [
+    "AssetRef",
+    "AssetStore",
+    "AssetStoreStats",
+    "solid_png",
+]
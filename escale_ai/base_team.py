@@ -3,9 +3,11 @@ Defines the base team for the AI Marketing Agency.
 
 This module defines the permanent team responsible for prospecting,
 outreach and sales activities. Each role is implemented as a simple
-class with a `run` method that accepts and returns a context dictionary.
+class with a `run` method that accepts and returns a context dictionary,
+and declares the context keys it ``reads`` and ``writes``.
 
-The BaseTeam class orchestrates the execution of each role in order.
+The BaseTeam class orchestrates the execution of each role through a
+`StageGraph`, so roles that do not depend on each other run concurrently.
 
 Note: This is a lightweight skeleton meant to be expanded. In a full
 implementation, you would use LangGraph to model the flow and
@@ -14,12 +16,29 @@ Google Antigravity or other orchestration tools to manage the agents.
 
 from __future__ import annotations
 
-from typing import Any, Dict
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from . import config
+from .compliance import ComplianceChecker, default_checker, issues_of, texts_of
+from .pipeline import LazyAgent, LazyImport, PipelineTeam, Stage, StageGraph, shared
+from .tools.lead_source import CSVLeadSource
+
+if TYPE_CHECKING:
+    from .agent_pool import AgentPool
+    from .scoring import LeadTable
+    from .templates import EmailTemplate
+    from .tools.calendar_service import LocalCalendarService
+    from .tools.email_sender import EmailSendingEngine
+    from .tools.lead_index import LeadIndex
 
 
 class AISalesManager:
     """Supervises the overall sales pipeline."""
 
+    reads = ()
+    writes = ("sales_manager",)
+
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
         # Placeholder logic: mark that the sales manager has reviewed the context
         context["sales_manager"] = "reviewed"
@@ -27,35 +46,163 @@ class AISalesManager:
 
 
 class AIProspector:
-    """Finds and qualifies potential clients (clinics)."""
+    """Finds and qualifies potential clients (clinics).
+
+    When a `LeadIndex` is provided, prospects come from the persistent index
+    instead of re-reading and de-duplicating the leads CSV on every run. Any
+    rows appended to ``leads_csv`` since the previous run are ingested first.
+    The optional ``prospect_filters`` context entry (``state``, ``city``,
+    ``services``) narrows the query.
+
+    With a `LeadTable` the leads are qualified instead: every lead in
+    ``config.ALLOWED_COUNTRY`` matching the filters is scored in one
+    vectorized pass and the best ``config.EMAIL_LIMIT_PER_DAY`` are kept.
+    """
+
+    reads = ("prospect_filters",)
+    writes = ("prospects",)
+
+    def __init__(
+        self,
+        lead_index: Optional[LeadIndex] = None,
+        leads_csv: Optional[str] = None,
+        lead_table: Optional[LeadTable] = None,
+    ) -> None:
+        self.lead_index = lead_index
+        self.leads_csv = leads_csv
+        self.lead_table = lead_table
 
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        # TODO: Implement real prospecting logic (e.g., scraping databases)
-        context["prospects"] = ["clinic1", "clinic2"]
+        if self.lead_table is not None:
+            filters = context.get("prospect_filters") or {}
+            leads = self.lead_table.top_k(
+                config.EMAIL_LIMIT_PER_DAY,
+                services=filters.get("services"),
+                state=filters.get("state"),
+                city=filters.get("city"),
+            )
+            context["prospects"] = [lead.clinic_name for lead in leads]
+            return context
+        if self.lead_index is None:
+            # TODO: Implement real prospecting logic (e.g., scraping databases)
+            context["prospects"] = ["clinic1", "clinic2"]
+            return context
+        if self.leads_csv:
+            self.lead_index.ingest_csv(self.leads_csv)
+        filters = context.get("prospect_filters") or {}
+        leads = self.lead_index.query(
+            state=filters.get("state"),
+            city=filters.get("city"),
+            services=filters.get("services"),
+            limit=config.EMAIL_LIMIT_PER_DAY,
+        )
+        context["prospects"] = [lead["clinic_name"] or lead["email"] for lead in leads]
         return context
 
 
 class AIOutreachSpecialist:
-    """Sends compliant cold emails to prospects."""
+    """Sends compliant cold emails to prospects.
+
+    When an `EmailTemplate` and a leads CSV are provided, every lead whose
+    clinic is among the ``prospects`` (or every lead, if there are none) is
+    rendered and streamed into the `EmailSendingEngine` outbox batch by
+    batch; bodies rejected by the `ComplianceChecker` are not queued.
+    ``outreach_queued`` reports how many emails were queued,
+    ``outreach_rejected`` how many were dropped and ``outreach_issues`` the
+    distinct violations that dropped them. Without an
+    engine the rendered emails are only counted. Inside a run recorded by
+    an `escale_ai.eventlog.EventLog` the outbox rows carry the run's
+    idempotency key, so a resumed run does not queue them twice.
+    """
+
+    reads = ("prospects",)
+    writes = ("outreach", "outreach_queued", "outreach_rejected", "outreach_issues")
+
+    def __init__(
+        self,
+        template: Optional[EmailTemplate] = None,
+        leads_csv: Optional[str] = None,
+        engine: Optional[EmailSendingEngine] = None,
+        checker: Optional[ComplianceChecker] = None,
+    ) -> None:
+        self.template = template
+        self.leads_csv = leads_csv
+        self.engine = engine
+        self.checker = checker
 
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        # TODO: Integrate email sending via Instantly and track results
-        context["outreach"] = "emails_sent"
+        if self.template is None or not self.leads_csv:
+            # TODO: Integrate email sending via Instantly and track results
+            context["outreach"] = "emails_sent"
+            context["outreach_issues"] = []
+            return context
+        rejected = 0
+        issues: Dict[str, None] = {}
+
+        def reject(message: Any, verdict: Any) -> None:
+            nonlocal rejected
+            rejected += 1
+            issues.update(dict.fromkeys(issues_of((verdict,))))
+
+        prospects = set(context.get("prospects") or ())
+        include = (lambda lead: lead.get("clinic_name") in prospects) if prospects else None
+        messages = self.template.stream(
+            CSVLeadSource(self.leads_csv),
+            checker=self.checker or default_checker(),
+            on_reject=reject,
+            include=include,
+            extra_fields=("clinic_name",) if prospects else (),
+        )
+        if self.engine is not None:
+            from .eventlog import idempotency_key  # only needed once there is an outbox
+
+            queued = self.engine.enqueue(messages, idempotency_key("outreach_enqueue"))
+        else:
+            queued = sum(1 for _ in messages)
+        context["outreach"] = "emails_queued"
+        context["outreach_queued"] = queued
+        context["outreach_rejected"] = rejected
+        context["outreach_issues"] = list(issues)
         return context
 
 
 class AIAppointmentSetter:
-    """Schedules meetings with interested prospects via Cal.com."""
+    """Schedules meetings with interested prospects via Cal.com.
+
+    With a `LocalCalendarService`, all prospects are booked in one pass into
+    the next free, non-conflicting slots after ``schedule_after`` (an ISO
+    time in the context, defaulting to now).
+    """
+
+    reads = ("prospects", "outreach", "schedule_after")
+    writes = ("appointments",)
+
+    def __init__(self, calendar: Optional[LocalCalendarService] = None, duration_minutes: int = 30) -> None:
+        self.calendar = calendar
+        self.duration_minutes = duration_minutes
 
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        # TODO: Integrate calendar scheduling and follow-up logic
-        context["appointments"] = ["clinic1: 2026-02-10"]
+        if self.calendar is None:
+            # TODO: Integrate calendar scheduling and follow-up logic
+            context["appointments"] = ["clinic1: 2026-02-10"]
+            return context
+        bookings = self.calendar.schedule_batch(
+            context.get("prospects") or [],
+            start_after=context.get("schedule_after") or datetime.now(),
+            duration_minutes=self.duration_minutes,
+        )
+        context["appointments"] = [
+            f"{booking.invitee_email}: {booking.start:%Y-%m-%d %H:%M}" for booking in bookings
+        ]
         return context
 
 
 class AIProposalBuilder:
     """Prepares marketing proposals for prospects."""
 
+    reads = ("prospects", "appointments")
+    writes = ("proposal",)
+
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
         # TODO: Generate proposals based on prospect data and templates
         context["proposal"] = "prepared"
@@ -63,47 +210,79 @@ class AIProposalBuilder:
 
 
 class AIQACompliance:
-    """Ensures compliance with medical marketing regulations."""
+    """Ensures compliance with medical marketing regulations.
+
+    Outreach bodies are checked by the outreach specialist as they are
+    rendered; the violations that dropped some of them (``outreach_issues``)
+    are carried over here. The proposal is checked by a `ComplianceChecker`.
+    ``compliance`` is False if any outreach body was dropped or a blocking
+    rule matched the proposal, and ``compliance_issues`` lists every match.
+    """
+
+    reads = ("outreach_issues", "proposal")
+    writes = ("compliance", "compliance_issues")
+
+    def __init__(self, checker: Optional[ComplianceChecker] = None) -> None:
+        self.checker = checker or default_checker()
 
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        # TODO: Validate that messages meet compliance requirements
-        context["compliance"] = True
+        outreach_issues = list(context.get("outreach_issues") or ())
+        verdicts = self.checker.check_batch(texts_of(context, ("proposal",)))
+        context["compliance"] = not outreach_issues and all(verdict.compliant for verdict in verdicts)
+        context["compliance_issues"] = outreach_issues + issues_of(verdicts)
         return context
 
 
-class BaseTeam:
+class BaseTeam(PipelineTeam):
     """
     Represents the permanent base team.
 
-    This class instantiates each agent role and exposes a `run_pipeline`
+    This class declares each agent role and exposes a `run_pipeline`
     method to process a context dictionary through the entire pipeline.
+    Agents are built the first time their stage runs, or taken from
+    ``agent_pool`` when one is given.
     """
 
-    def __init__(self) -> None:
-        self.sales_manager = AISalesManager()
-        self.prospector = AIProspector()
-        self.outreach = AIOutreachSpecialist()
-        self.appointment_setter = AIAppointmentSetter()
-        self.proposal_builder = AIProposalBuilder()
-        self.qa_compliance = AIQACompliance()
-
-    def run_pipeline(self, context: Dict[str, Any] | None = None) -> Dict[str, Any]:
-        """
-        Execute the base team workflow.
-
-        Args:
-            context: Optional initial state. If None, an empty dict will be used.
-
-        Returns:
-            A context dictionary containing the results from each stage.
-        """
-        if context is None:
-            context = {}
-        # Execute each role in sequence. In the future, this could be a graph.
-        context = self.sales_manager.run(context)
-        context = self.prospector.run(context)
-        context = self.outreach.run(context)
-        context = self.appointment_setter.run(context)
-        context = self.proposal_builder.run(context)
-        context = self.qa_compliance.run(context)
-        return context
+    graph = StageGraph(
+        (
+            Stage.of("sales_manager", AISalesManager),
+            Stage.of("prospector", AIProspector),
+            Stage.of("outreach", AIOutreachSpecialist),
+            Stage.of("appointment_setter", AIAppointmentSetter),
+            Stage.of("proposal_builder", AIProposalBuilder),
+            Stage.of("qa_compliance", AIQACompliance),
+        )
+    )
+
+    state_model = LazyImport("escale_ai.state", "BasePipelineState")
+
+    sales_manager = LazyAgent(lambda team: AISalesManager(), key=shared)
+    prospector = LazyAgent(
+        lambda team: AIProspector(team.lead_index, team.leads_csv, team.lead_table),
+        key=lambda team: (team.lead_index, team.leads_csv, team.lead_table),
+    )
+    outreach = LazyAgent(
+        lambda team: AIOutreachSpecialist(team.outreach_template, team.leads_csv, team.email_engine),
+        key=lambda team: (team.outreach_template, team.leads_csv, team.email_engine),
+    )
+    appointment_setter = LazyAgent(lambda team: AIAppointmentSetter(team.calendar), key=lambda team: team.calendar)
+    proposal_builder = LazyAgent(lambda team: AIProposalBuilder(), key=shared)
+    qa_compliance = LazyAgent(lambda team: AIQACompliance(), key=shared)
+
+    def __init__(
+        self,
+        lead_index: Optional[LeadIndex] = None,
+        leads_csv: Optional[str] = None,
+        calendar: Optional[LocalCalendarService] = None,
+        lead_table: Optional[LeadTable] = None,
+        outreach_template: Optional[EmailTemplate] = None,
+        email_engine: Optional[EmailSendingEngine] = None,
+        agent_pool: Optional[AgentPool] = None,
+    ) -> None:
+        self.lead_index = lead_index
+        self.leads_csv = leads_csv
+        self.calendar = calendar
+        self.lead_table = lead_table
+        self.outreach_template = outreach_template
+        self.email_engine = email_engine
+        self.agent_pool = agent_pool
@@ -0,0 +1,36 @@
+"""
+Benchmarks for the AI Marketing Agency pipelines and tools.
+
+Each suite lives in its own module and exposes a ``run(**options)``
+function returning a JSON-serializable dictionary of results. Run them
+from the command line and keep the JSON output to compare releases:
+
+    python -m escale_ai.bench pipelines --clients 1000 --output bench.json
+    python -m escale_ai.bench tools --leads 1000000
+    python -m escale_ai.bench scoring --leads 1000000
+    python -m escale_ai.bench templates --renders 100000
+    python -m escale_ai.bench pipelines --baseline bench.json
+    python -m escale_ai.bench teams --clients 100
+    python -m escale_ai.bench eventlog --clients 200
+    python -m escale_ai.bench media --clients 64
+    python -m escale_ai.bench startup
+
+A suite may also list ``failures`` in its results (e.g. a blown budget);
+the command then exits with status 1.
+"""
+
+SUITES = {
+    "pipelines": "escale_ai.bench.pipelines",
+    "tools": "escale_ai.bench.tools",
+    "scoring": "escale_ai.bench.scoring",
+    "compliance": "escale_ai.bench.compliance",
+    "templates": "escale_ai.bench.templates",
+    "state": "escale_ai.bench.state",
+    "pools": "escale_ai.bench.pools",
+    "teams": "escale_ai.bench.teams",
+    "eventlog": "escale_ai.bench.eventlog",
+    "media": "escale_ai.bench.media",
+    "startup": "escale_ai.bench.startup",
+}
+
+__all__ = ["SUITES"]
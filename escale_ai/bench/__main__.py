@@ -0,0 +1,98 @@
+"""Command line entry point: ``python -m escale_ai.bench [suite ...] [options]``."""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import inspect
+import json
+import platform
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import SUITES
+
+#: Metrics compared against a baseline, and whether higher values are better.
+_TRACKED = {"p50": False, "p95": False, "p99": False, "throughput": True}
+
+
+def _metrics(results: Any, prefix: str = "") -> Iterator[Tuple[str, float, bool]]:
+    if isinstance(results, dict):
+        for key, value in results.items():
+            path = f"{prefix}.{key}" if prefix else key
+            if key in _TRACKED and isinstance(value, (int, float)):
+                yield path, float(value), _TRACKED[key]
+            else:
+                yield from _metrics(value, path)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a description of every tracked metric that regressed beyond ``tolerance``."""
+    previous = {path: value for path, value, _ in _metrics(baseline.get("suites", {}))}
+    regressions = []
+    for path, value, higher_is_better in _metrics(current["suites"]):
+        old = previous.get(path)
+        if not old:
+            continue
+        change = (value - old) / old
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{path}: {old:.4g} -> {value:.4g} ({change:+.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m escale_ai.bench", description=__doc__)
+    parser.add_argument("suites", nargs="*", metavar="suite", help=f"suites to run: {', '.join(sorted(SUITES))} (default: all)")
+    parser.add_argument("--iterations", type=int, help="iterations per latency measurement")
+    parser.add_argument("--clients", type=int, help="clients in the batch pipeline run")
+    parser.add_argument("--executor", choices=["thread", "process", "async"], help="batch executor")
+    parser.add_argument("--leads", type=int, help="synthetic leads for the tools suite")
+    parser.add_argument("--renders", type=int, help="emails rendered by the templates suite")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+
+    options = {
+        name: value
+        for name, value in vars(args).items()
+        if name in ("iterations", "clients", "executor", "leads", "renders") and value is not None
+    }
+    report: Dict[str, Any] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "suites": {},
+    }
+    for suite in args.suites or sorted(SUITES):
+        run = importlib.import_module(SUITES[suite]).run
+        accepted = inspect.signature(run).parameters
+        report["suites"][suite] = run(**{k: v for k, v in options.items() if k in accepted})
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    failures = [
+        f"{suite}: {failure}" for suite, results in report["suites"].items() for failure in results.get("failures", ())
+    ]
+    for line in failures:
+        print(f"FAILURE {line}", file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions or failures else 0
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
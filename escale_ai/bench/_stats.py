@@ -0,0 +1,69 @@
+"""Measurement helpers shared by the benchmark suites."""
+
+from __future__ import annotations
+
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence
+
+
+def percentile(sorted_samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_samples) + 0.5)) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+
+def summarize(samples: List[float], unit: float = 1e3) -> Dict[str, float]:
+    """Return count, mean and p50/p95/p99/max of ``samples`` (seconds), scaled by ``unit``."""
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        "count": count,
+        "mean": (sum(ordered) / count * unit) if count else 0.0,
+        "p50": percentile(ordered, 0.50) * unit,
+        "p95": percentile(ordered, 0.95) * unit,
+        "p99": percentile(ordered, 0.99) * unit,
+        "max": (ordered[-1] * unit) if count else 0.0,
+    }
+
+
+def timed(fn: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    """Call ``fn`` repeatedly and return latency stats (ms) and throughput (calls/s)."""
+    fn()  # warm-up
+    samples: List[float] = []
+    clock = time.perf_counter
+    start = clock()
+    for _ in range(iterations):
+        t0 = clock()
+        fn()
+        samples.append(clock() - t0)
+    total = clock() - start
+    stats = summarize(samples)
+    stats["throughput"] = iterations / total if total else 0.0
+    return stats
+
+
+def peak_memory(fn: Callable[[], Any]) -> int:
+    """Return the peak Python heap allocation (bytes) while running ``fn``.
+
+    Runs separately from the timing passes because tracing allocations slows
+    everything down.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def throughput(count: int, fn: Callable[[], Any]) -> Dict[str, float]:
+    """Run ``fn`` once over ``count`` items and report elapsed seconds and items/s."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    return {"items": count, "seconds": elapsed, "throughput": count / elapsed if elapsed else 0.0}
@@ -0,0 +1,56 @@
+"""
+Benchmark the compliance checker.
+
+Checks ``emails`` personalized outreach emails in batches, first with an
+empty verdict cache (every text is scanned) and then again with the cache
+warm, and compares the single-pass scanner with checking every rule with
+its own regular expression.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+from typing import Any, Dict, List
+
+from ..compliance import DEFAULT_RULES, ComplianceChecker
+from ._stats import throughput
+
+BODY = (
+    "Hi {name},\n\nI noticed {clinic} offers {service} in {city}. Clinics like yours use our "
+    "campaigns to book more consultations every month. {claim}\n\nWould you be open to a 15 minute "
+    "call next week?\n\nBest,\nEscale AI"
+)
+CLAIMS = ["", "", "", "Our patients love the natural look.", "Guaranteed results in one session!", "It is 100% safe."]
+
+
+def synthetic_emails(count: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        BODY.format(
+            name=f"Dr. {i}", clinic=f"Clinic {i}", service=rng.choice(["botox", "fillers", "laser"]),
+            city=f"City {i % 300}", claim=rng.choice(CLAIMS),
+        )
+        for i in range(count)
+    ]
+
+
+def run(emails: int = 50_000, batch_size: int = 1000) -> Dict[str, Any]:
+    texts = synthetic_emails(emails)
+    checker = ComplianceChecker()
+
+    def check_all() -> None:
+        for i in range(0, len(texts), batch_size):
+            checker.check_batch(texts[i : i + batch_size])
+
+    results: Dict[str, Any] = {"emails": emails, "cold": throughput(emails, check_all)}
+    results["warm_cache"] = throughput(emails, check_all)
+
+    patterns = [
+        re.compile(rule.pattern if rule.regex else r"(?<!\w)" + r"\s+".join(map(re.escape, rule.pattern.split())) + r"(?!\w)", re.IGNORECASE)
+        for rule in DEFAULT_RULES
+    ]
+    sample = texts[: min(emails, 10_000)]
+    results["per_rule_regex"] = throughput(len(sample), lambda: [[p.search(t) for p in patterns] for t in sample])
+    results["rules"] = len(DEFAULT_RULES)
+    return results
@@ -0,0 +1,56 @@
+"""
+Benchmark the cost of logging pipeline runs to an `EventLog`.
+
+``clients`` client pipelines run concurrently on one event loop, first
+without a log and then through `EventLog.run_async` with ``fsync`` on, in a
+temporary directory. Reported: the batch wall time and runs per second of
+each, the overhead of logging per run, and how many events each ``fsync``
+carried on average (the group-commit batch size). ``recovery_ms`` is the
+time a fresh `EventLog` takes to replay the resulting file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from ..client_team import ClientTeam
+from ..eventlog import EventLog
+
+
+def _batch(clients: int, log: Optional[EventLog]) -> float:
+    async def main() -> None:
+        teams = [ClientTeam(f"Clinic {i}") for i in range(clients)]
+        if log is None:
+            await asyncio.gather(*(team.run_pipeline_async() for team in teams))
+        else:
+            await asyncio.gather(*(log.run_async(team) for team in teams))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return time.perf_counter() - start
+
+
+def run(iterations: int = 5, clients: int = 200) -> Dict[str, Any]:
+    _batch(clients, None)  # warm-up
+    plain = min(_batch(clients, None) for _ in range(iterations))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.jsonl")
+        with EventLog(path, fsync=True) as log:
+            logged = min(_batch(clients, log) for _ in range(iterations))
+            stats = log.stats
+        start = time.perf_counter()
+        EventLog(path).close()
+        recovery = time.perf_counter() - start
+    return {
+        "clients": clients,
+        "plain": {"batch_ms": plain * 1e3, "throughput": clients / plain},
+        "logged": {"batch_ms": logged * 1e3, "throughput": clients / logged},
+        "overhead_ms_per_run": (logged - plain) * 1e3 / clients,
+        "events": stats.events,
+        "events_per_fsync": stats.events / stats.commits if stats.commits else 0.0,
+        "recovery_ms": recovery * 1e3,
+    }
@@ -0,0 +1,43 @@
+"""
+Benchmark the media-plan simulation.
+
+``plan`` times one `plan_media` search over ``config.MEDIA_CHANNELS``
+without a time budget and reports how many scenario-candidate pairs it
+simulates per second. ``portfolio`` plans ``clients`` budgets in the
+calling process and then over a process pool, and reports the speedup;
+``within_time_budget`` is the share of plans whose search finished inside
+the per-client time budget.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict
+
+from .. import config
+from ..media_sim import plan_media, plan_portfolio
+from ._stats import timed
+
+
+def run(iterations: int = 20, clients: int = 64) -> Dict[str, Any]:
+    latency = timed(lambda: plan_media(3000, time_budget=None, seed=0), iterations)
+    plan = plan_media(3000, time_budget=None, seed=0)
+    budgets = {f"Clinic {i}": 500.0 + 50 * i for i in range(clients)}
+    results: Dict[str, Any] = {
+        "plan": {**latency, "scenarios_per_second": plan.scenarios * plan.candidates * latency["throughput"]},
+        "portfolio": {"clients": clients},
+    }
+    for label, workers in (("sequential", 1), ("processes", None)):
+        start = time.perf_counter()
+        plans = plan_portfolio(budgets, workers=workers, seed=0)
+        elapsed = time.perf_counter() - start
+        results["portfolio"][label] = {
+            "batch_ms": elapsed * 1e3,
+            "throughput": clients / elapsed,
+            "within_time_budget": sum(p.complete for p in plans.values()) / clients,
+        }
+    results["portfolio"]["time_budget_s"] = config.MEDIA_SIM_TIME_BUDGET
+    results["portfolio"]["speedup"] = (
+        results["portfolio"]["sequential"]["batch_ms"] / results["portfolio"]["processes"]["batch_ms"]
+    )
+    return results
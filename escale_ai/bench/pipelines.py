@@ -0,0 +1,51 @@
+"""
+Benchmark the base and client pipelines.
+
+Reports per-run latency percentiles and throughput for both teams, the time
+spent in each stage (collected through a `StageTimer` hook), a batch run over
+``clients`` clinics with `AgentFactory.run_client_pipelines`, and the peak
+memory of that batch.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from ..agent_factory import AgentFactory
+from ..base_team import BaseTeam
+from ..client_team import ClientTeam
+from ..pipeline import StageTimer, register_hook, unregister_hook
+from ._stats import peak_memory, summarize, throughput, timed
+
+
+def run(iterations: int = 200, clients: int = 100, executor: str = "thread") -> Dict[str, Any]:
+    base_team = BaseTeam()
+    client_team = ClientTeam("Bench Clinic")
+
+    results: Dict[str, Any] = {
+        "base_pipeline_ms": timed(base_team.run_pipeline, iterations),
+        "client_pipeline_ms": timed(client_team.run_pipeline, iterations),
+    }
+
+    timer = StageTimer()
+    register_hook(timer)
+    try:
+        for _ in range(iterations):
+            base_team.run_pipeline()
+            client_team.run_pipeline()
+    finally:
+        unregister_hook(timer)
+    results["stages_ms"] = {
+        f"{team}.{stage}": summarize(samples) for (team, stage), samples in sorted(timer.samples.items())
+    }
+
+    names = [f"Clinic {i}" for i in range(clients)]
+
+    def batch() -> None:
+        for result in AgentFactory.run_client_pipelines(names, executor=executor):
+            if not result.ok:
+                raise RuntimeError(result.error)
+
+    results["client_batch"] = dict(throughput(clients, batch), executor=executor)
+    results["client_batch"]["peak_memory_bytes"] = peak_memory(batch)
+    return results
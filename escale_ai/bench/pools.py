@@ -0,0 +1,38 @@
+"""
+Benchmark connection pooling of the async tool services.
+
+Sends ``requests`` emails through `AsyncMockEmailService` with a simulated
+connect latency, once with keep-alive pooling and once opening a new
+connection for every call (``max_idle=0``), which is what a provider
+without a pool does.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict
+
+from .. import config
+from ..tools.email_service import AsyncMockEmailService, EmailMessage
+from ..tools.pool import ConnectionPool, local_connector
+from ._stats import throughput
+
+
+def run(requests: int = 1000, latency: float = 0.005, connect_latency: float = 0.05, concurrency: int = 50) -> Dict[str, Any]:
+    messages = [EmailMessage(f"lead{i}@example.com", "Hello", "Body") for i in range(requests)]
+    results: Dict[str, Any] = {"requests": requests, "pool_size": config.TOOL_POOL_LIMITS["email"]}
+
+    for label, max_idle in (("pooled", None), ("connection_per_call", 0)):
+        pool = ConnectionPool(
+            local_connector("email", connect_latency), max_size=config.TOOL_POOL_LIMITS["email"], max_idle=max_idle
+        )
+        service = AsyncMockEmailService(pool, latency=latency)
+
+        async def send_all() -> None:
+            await service.send_bulk(messages, concurrency=concurrency)
+            await pool.aclose()
+
+        results[label] = throughput(requests, lambda: asyncio.run(send_all()))
+        results[label]["connections_opened"] = pool.stats.created
+    results["speedup"] = results["pooled"]["throughput"] / results["connection_per_call"]["throughput"]
+    return results
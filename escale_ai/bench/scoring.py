@@ -0,0 +1,67 @@
+"""
+Benchmark lead qualification.
+
+Builds a synthetic table of ``leads`` leads and compares the vectorized
+`LeadTable.top_k` with an equivalent per-row Python loop.
+"""
+
+from __future__ import annotations
+
+import heapq
+import random
+from typing import Any, Dict, Iterator, List, Mapping
+
+from .. import config
+from ..scoring import COUNTRY_REGIONS, LeadTable, ScoringWeights
+from ._stats import throughput, timed
+
+STATES = ["FL", "TX", "CA", "NY", "AZ", "NV", "ON", "BC"]
+SERVICES = ["botox", "fillers", "laser hair removal", "microneedling", "chemical peel", "coolsculpting"]
+QUERY = {"services": "botox, fillers", "state": None}
+
+
+def synthetic_leads(count: int, seed: int = 7) -> Iterator[Dict[str, str]]:
+    rng = random.Random(seed)
+    combos = [";".join(sorted(rng.sample(SERVICES, 2))) for _ in range(64)]
+    for i in range(count):
+        yield {
+            "clinic_name": f"Clinic {i}",
+            "email": f"info@clinic{i}.com",
+            "website": f"clinic{i}.com" if rng.random() < 0.7 else "",
+            "instagram": f"@clinic{i}" if rng.random() < 0.5 else "",
+            "city": f"City {i % 500}",
+            "state": rng.choice(STATES),
+            "services": rng.choice(combos),
+        }
+
+
+def python_top_k(leads: List[Mapping[str, str]], k: int, services: str, weights: ScoringWeights = ScoringWeights()) -> List[str]:
+    """Reference implementation: score row by row and keep the best ``k``."""
+    allowed = COUNTRY_REGIONS[config.ALLOWED_COUNTRY]
+    keywords = [s.strip().lower() for s in services.split(",")]
+    scored = []
+    for row, lead in enumerate(leads):
+        if lead["state"].strip().upper() not in allowed:
+            continue
+        offered = lead["services"].lower()
+        score = weights.services * sum(kw in offered for kw in keywords) / len(keywords)
+        score += weights.website * bool(lead["website"].strip()) + weights.instagram * bool(lead["instagram"].strip())
+        scored.append((score, -row, lead["clinic_name"]))
+    return [name for _, _, name in heapq.nlargest(k, scored)]
+
+
+def run(leads: int = 1_000_000, iterations: int = 10, k: int = 50) -> Dict[str, Any]:
+    rows = list(synthetic_leads(leads))
+    holder: Dict[str, LeadTable] = {}
+
+    def load() -> None:
+        holder["table"] = LeadTable.from_leads(rows)
+
+    results: Dict[str, Any] = {"leads": leads, "load": throughput(leads, load)}
+    table = holder["table"]
+    results["vectorized_top_k_ms"] = timed(lambda: table.top_k(k, services=QUERY["services"]), iterations)
+    results["python_loop_top_k_ms"] = timed(lambda: python_top_k(rows, k, QUERY["services"]), max(iterations // 5, 1))
+    expected = python_top_k(rows, k, QUERY["services"])
+    results["same_result"] = [lead.clinic_name for lead in table.top_k(k, services=QUERY["services"])] == expected
+    results["speedup_p50"] = results["python_loop_top_k_ms"]["p50"] / results["vectorized_top_k_ms"]["p50"]
+    return results
@@ -0,0 +1,65 @@
+"""
+Benchmark import time.
+
+Imports each module in a fresh interpreter with ``python -X importtime``
+and reports the cumulative import time of the module (ms), so the numbers
+exclude interpreter start-up and ``site``. Each module also has a budget
+and a list of heavy dependencies it must not load at import time; any
+breach is reported under ``failures`` and makes the command exit with
+status 1.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ._stats import summarize
+
+#: Module -> (p50 budget in ms, modules it must not import).
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "escale_ai": (10.0, ("asyncio", "pydantic", "numpy")),
+    "escale_ai.tools": (10.0, ("sqlite3", "concurrent.futures")),
+    "escale_ai.agent_factory": (250.0, ("pydantic", "numpy", "multiprocessing")),
+    "escale_ai.demo": (250.0, ("pydantic", "numpy", "multiprocessing")),
+}
+
+
+def import_profile(module: str, python: str = sys.executable) -> Dict[str, int]:
+    """Import ``module`` in a new interpreter and return every module's cumulative time (us)."""
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile: Dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def run(iterations: int = 5, modules: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    failures: List[str] = []
+    for module in modules or list(BUDGETS):
+        samples: List[float] = []
+        loaded: set = set()
+        for _ in range(iterations):
+            profile = import_profile(module)
+            samples.append(profile[module] / 1e6)
+            loaded.update(profile)
+        stats = summarize(samples)
+        budget, forbidden = BUDGETS.get(module, (float("inf"), ()))
+        heavy = sorted(name for name in forbidden if name in loaded)
+        results[module] = {**stats, "budget_ms": budget, "heavy_imports": heavy}
+        if stats["p50"] > budget:
+            failures.append(f"{module}: {stats['p50']:.1f} ms > {budget:.0f} ms budget")
+        if heavy:
+            failures.append(f"{module}: imports {', '.join(heavy)} at import time")
+    results["failures"] = failures
+    return results
@@ -0,0 +1,73 @@
+"""
+Compare the cost of the state representations per client pipeline run.
+
+- ``dict``: untyped dict contexts, copied between stages, never validated.
+- ``pydantic``: the state is re-validated with the model at every handoff.
+- ``slotted``: validated once on entry and exit, handed between stages as
+  a `SlotState` (what the teams use).
+
+Serialization of the final state is measured separately for the standard
+``json`` module, ``model_dump_json`` and `escale_ai.state.to_json`.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Callable, Dict
+
+from ..client_team import ClientTeam
+from ..state import ClientPipelineState, enter_state, exit_state, to_json
+
+
+def _per_run_us(fn: Callable[[], Any], iterations: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run(iterations: int = 2000) -> Dict[str, Any]:
+    team = ClientTeam("Bench Clinic")
+    stages = [(stage, team.agent(stage.name)) for stage in team.graph]
+    model = ClientPipelineState
+
+    def with_dict() -> Dict[str, Any]:
+        context: Dict[str, Any] = {"client_name": "Bench Clinic"}
+        for stage, agent in stages:
+            result = agent.run(dict(context))
+            for key in stage.writes:
+                context[key] = result[key]
+        return context
+
+    def with_pydantic() -> ClientPipelineState:
+        state = model(client_name="Bench Clinic")
+        for stage, agent in stages:
+            result = agent.run(state.model_dump())
+            state = model.model_validate(result)
+        return state
+
+    def with_slots() -> ClientPipelineState:
+        state = enter_state(model, {"client_name": "Bench Clinic"})
+        for stage, agent in stages:
+            result = agent.run(state.copy())
+            for key in stage.writes:
+                state[key] = result[key]
+        return exit_state(model, state)
+
+    final = with_slots()
+    final_dict = final.model_dump()
+    return {
+        "iterations": iterations,
+        "pipeline_us_per_run": {
+            "dict": _per_run_us(with_dict, iterations),
+            "pydantic": _per_run_us(with_pydantic, iterations),
+            "slotted": _per_run_us(with_slots, iterations),
+        },
+        "serialize_us": {
+            "json.dumps": _per_run_us(lambda: json.dumps(final_dict), iterations),
+            "model_dump_json": _per_run_us(final.model_dump_json, iterations),
+            "to_json": _per_run_us(lambda: to_json(final_dict), iterations),
+        },
+    }
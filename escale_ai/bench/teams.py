@@ -0,0 +1,73 @@
+"""
+Benchmark building teams per request against sharing agents through a pool.
+
+For ``per_request`` the factory has no agent pool, so every run builds a
+team and its six agents; for ``pooled`` it uses a warmed `AgentPool` and a
+run only builds the team (the setup `AgentFactory` uses). Reported for
+each: the cost of creating a team and resolving all of its agents, the
+end-to-end client pipeline latency, the memory a request allocates for
+its team and agents, and the agents built per request.
+
+The placeholder agents are almost free to build, so ``own_checker``
+repeats the comparison for a team whose compliance agent compiles its own
+`ComplianceChecker`, the way an agent holding a model client or prompt
+templates pays for them on construction.
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Any, Dict, List, Optional, Type
+
+from ..agent_pool import AgentPool
+from ..client_team import AIQAComplianceAds, ClientTeam
+from ..compliance import ComplianceChecker
+from ..pipeline import LazyAgent, shared
+from ._stats import peak_memory, timed
+
+
+class _OwnCheckerTeam(ClientTeam):
+    qa_compliance_ads = LazyAgent(lambda team: AIQAComplianceAds(ComplianceChecker()), key=shared)
+
+
+def _compare(team_cls: Type[ClientTeam], names: List[str], iterations: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for label, pool in (("per_request", None), ("pooled", AgentPool())):
+        if pool is not None:
+            pool.warm(team_cls(names[0], agent_pool=pool))
+        cycle = itertools.cycle(names)
+
+        def setup() -> ClientTeam:
+            team = team_cls(next(cycle), agent_pool=pool)
+            for stage in team_cls.graph:
+                team.agent(stage.name)
+            return team
+
+        def request() -> None:
+            team_cls(next(cycle), agent_pool=pool).run_pipeline()
+
+        built_before = pool.stats.built if pool is not None else 0
+        results[label] = {
+            "team_setup_ms": timed(setup, iterations),
+            "client_pipeline_ms": timed(request, iterations),
+            # Teams are kept alive so the peak is what the requests allocated.
+            "setup_bytes_per_request": peak_memory(lambda: [setup() for _ in range(iterations)]) / iterations,
+        }
+        results[label]["agents_built_per_request"] = _agents_built(pool, built_before, 3 * iterations + 2)
+    results["setup_speedup"] = results["per_request"]["team_setup_ms"]["mean"] / results["pooled"]["team_setup_ms"]["mean"]
+    return results
+
+
+def _agents_built(pool: Optional[AgentPool], before: int, requests: int) -> float:
+    if pool is None:
+        return float(len(ClientTeam.graph))
+    return (pool.stats.built - before) / requests
+
+
+def run(iterations: int = 2000, clients: int = 100) -> Dict[str, Any]:
+    names = [f"Clinic {i}" for i in range(clients)]
+    return {
+        "clients": clients,
+        "client_team": _compare(ClientTeam, names, iterations),
+        "own_checker": _compare(_OwnCheckerTeam, names, max(iterations // 10, 1)),
+    }
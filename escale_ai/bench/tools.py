@@ -0,0 +1,93 @@
+"""
+Benchmark the tool services with synthetic data.
+
+Generates a leads CSV with ``leads`` rows and measures CSV streaming, lead
+index ingestion and lookups, bulk email sending through the mock provider,
+coalesced CRM upserts and batch calendar scheduling.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, Dict
+
+from ..tools.calendar_service import LocalCalendarService
+from ..tools.crm_service import Contact, CRMWriteBuffer, SQLiteCRMService
+from ..tools.email_sender import EmailSendingEngine
+from ..tools.email_service import EmailMessage, MockEmailService
+from ..tools.lead_index import LeadIndex
+from ..tools.lead_source import CSVLeadSource
+from ._stats import peak_memory, throughput
+
+STATES = ["FL", "TX", "CA", "NY", "AZ", "NV", "GA", "IL"]
+SERVICES = ["botox", "fillers", "laser hair removal", "microneedling", "chemical peel", "coolsculpting"]
+
+
+def write_leads_csv(path: str, count: int, seed: int = 7) -> None:
+    """Write a synthetic leads export with the same columns as ``data/leads.csv``."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("clinic_name,email,website,city,state,instagram,services,notes\n")
+        for i in range(count):
+            services = ";".join(rng.sample(SERVICES, 2))
+            website = f"clinic{i}.com" if rng.random() < 0.7 else ""
+            instagram = f"@clinic{i}" if rng.random() < 0.5 else ""
+            f.write(
+                f"Clinic {i},info@clinic{i}.com,{website},City {i % 50},{rng.choice(STATES)},"
+                f"{instagram},{services},\n"
+            )
+
+
+def run(leads: int = 10_000, emails: int = 2_000, contacts: int = 100_000, meetings: int = 1_000) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="escale-bench-")
+    try:
+        csv_path = os.path.join(workdir, "leads.csv")
+        write_leads_csv(csv_path, leads)
+        source = CSVLeadSource(csv_path)
+
+        def stream() -> None:
+            for _ in source.iter_leads(batch_size=5000):
+                pass
+
+        results: Dict[str, Any] = {"csv_stream": throughput(leads, stream)}
+        results["csv_stream"]["peak_memory_bytes"] = peak_memory(stream)
+
+        index = LeadIndex(os.path.join(workdir, "index"))
+        results["lead_index_ingest"] = throughput(leads, lambda: index.ingest_csv(csv_path))
+        probes = [f"info@clinic{i}.com" for i in range(0, leads, max(leads // 10_000, 1))]
+        results["lead_index_lookup"] = throughput(len(probes), lambda: [index.contains_email(p) for p in probes])
+        index.close()
+
+        engine = EmailSendingEngine(
+            MockEmailService(echo=False),
+            os.path.join(workdir, "outbox.sqlite3"),
+            daily_limit=emails,
+            rate_per_second=1e9,
+            burst=1e9,
+            max_workers=8,
+        )
+        messages = (EmailMessage(f"info@clinic{i}.com", "Hello", "Body") for i in range(emails))
+        results["email_send_bulk"] = throughput(emails, lambda: engine.send_bulk(messages))
+        engine.close()
+
+        crm = SQLiteCRMService(os.path.join(workdir, "crm.sqlite3"))
+
+        def upserts() -> None:
+            with CRMWriteBuffer(crm, max_items=5000, max_delay=None) as buffer:
+                buffer.bulk_upsert(Contact(f"info@clinic{i % (contacts // 2 or 1)}.com", f"Clinic {i}") for i in range(contacts))
+
+        results["crm_upserts"] = throughput(contacts, upserts)
+        crm.close()
+
+        calendar = LocalCalendarService()
+        invitees = [f"info@clinic{i}.com" for i in range(meetings)]
+        results["calendar_batch"] = throughput(
+            meetings, lambda: calendar.schedule_batch(invitees, datetime(2026, 2, 9, 9, 0))
+        )
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
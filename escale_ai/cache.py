@@ -0,0 +1,252 @@
+"""
+Content-addressed cache of pipeline stage results.
+
+A stage's output only depends on the context keys it ``reads`` plus
+whatever identifies its team (the client and its brand kit), so
+`stage_key` hashes exactly those inputs. A changed input produces a new
+key, which means only the stages downstream of that change are
+recomputed; stale entries simply stop being requested and age out.
+
+`StageCache` keeps a small LRU of recent results in memory in front of an
+optional SQLite file that survives restarts. Both tiers honour the same
+TTL; the disk tier is additionally capped in bytes and evicts the least
+recently used entries first. Values are stored as JSON, so every hit
+returns a fresh copy that callers may mutate freely; values that would not
+come back identical (tuples, non-string keys, other objects) are refused
+rather than converted.
+
+Usage:
+    from escale_ai.agent_factory import AgentFactory
+    from escale_ai.cache import StageCache
+
+    AgentFactory.stage_cache = StageCache(path="data/stage_cache.sqlite3")
+    AgentFactory.run_client_pipeline("Clinic A")  # computes every stage
+    AgentFactory.run_client_pipeline("Clinic A")  # served from the cache
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from . import config
+
+
+def fingerprint(value: Any) -> str:
+    """Return a stable hex digest of a JSON-like value (key order does not matter)."""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def stage_key(scope: str, stage: str, inputs: Mapping[str, Any], salt: str = "") -> str:
+    """Build the cache key of one stage run.
+
+    Args:
+        scope: what the team works for, usually the client name; used by
+            `StageCache.invalidate`
+        stage: the stage name
+        inputs: the values of the keys the stage reads
+        salt: anything else the output depends on, e.g. a brand kit fingerprint
+    """
+    return f"{scope}/{stage}/{fingerprint([salt, dict(inputs)])}"
+
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def is_json_data(value: Any) -> bool:
+    """Return whether ``value`` survives a JSON round trip unchanged.
+
+    Only dicts with string keys, lists, strings, numbers, booleans and None
+    qualify; tuples would come back as lists and other objects as nothing
+    at all.
+    """
+    kind = type(value)
+    if kind in _JSON_SCALARS:
+        return True
+    if kind is list:
+        return all(is_json_data(item) for item in value)
+    if kind is dict:
+        return all(type(key) is str and is_json_data(item) for key, item in value.items())
+    return False
+
+
+class StageCache:
+    """Two-tier (memory LRU + SQLite) cache of stage outputs.
+
+    Thread-safe. The SQLite connection is reopened after a fork so the cache
+    can be shared with process pools.
+
+    Args:
+        max_entries: entries kept in the in-memory LRU tier
+        ttl: seconds an entry stays valid; ``None`` keeps entries until evicted
+        path: SQLite file for the disk tier; ``None`` disables it
+        max_disk_bytes: size cap of the stored values in the disk tier
+        clock: wall-clock time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        max_entries: int = config.STAGE_CACHE_MAX_ENTRIES,
+        ttl: Optional[float] = config.STAGE_CACHE_TTL_SECONDS,
+        path: Optional[str] = None,
+        max_disk_bytes: int = config.STAGE_CACHE_MAX_DISK_BYTES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._memory: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        self._disk_bytes = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached value for ``key``, or None."""
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] < now:
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self.path is not None:
+                entry = self._disk_get(key, now)
+                if entry is not None:
+                    self._remember(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(entry[1])
+
+    def put(self, key: str, value: Mapping[str, Any]) -> None:
+        """Store a mapping of JSON data (see `is_json_data`) under ``key``.
+
+        Raises:
+            TypeError: if ``value`` would not come back unchanged from a hit.
+        """
+        value = dict(value)
+        if not is_json_data(value):
+            raise TypeError(f"stage cache value for {key!r} is not plain JSON data")
+        payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        expires = self._clock() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._remember(key, (expires, payload))
+            if self.path is not None:
+                self._disk_put(key, expires, payload)
+
+    def invalidate(self, scope: str) -> int:
+        """Drop every entry of ``scope`` (e.g. after a client's brief changes).
+
+        Returns:
+            Number of entries removed from the memory tier.
+        """
+        prefix = scope + "/"
+        with self._lock:
+            stale = [key for key in self._memory if key.startswith(prefix)]
+            for key in stale:
+                del self._memory[key]
+            if self.path is not None:
+                conn = self._connection()
+                conn.execute("DELETE FROM stage_cache WHERE scope = ?", (scope,))
+                self._disk_bytes = self._stored_bytes(conn)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self.path is not None:
+                self._connection().execute("DELETE FROM stage_cache")
+                self._disk_bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _remember(self, key: str, entry: Tuple[float, bytes]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        if self._conn is None or self._pid != pid:
+            assert self.path is not None
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stage_cache ("
+                " key TEXT PRIMARY KEY, scope TEXT NOT NULL, value BLOB NOT NULL,"
+                " expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS stage_cache_accessed ON stage_cache (accessed)")
+            conn.execute("CREATE INDEX IF NOT EXISTS stage_cache_scope ON stage_cache (scope)")
+            self._conn, self._pid = conn, pid
+            self._disk_bytes = self._stored_bytes(conn)
+        return self._conn
+
+    @staticmethod
+    def _stored_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM stage_cache").fetchone()[0]
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, bytes]]:
+        conn = self._connection()
+        row = conn.execute("SELECT expires, value FROM stage_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[0] < now:
+            conn.execute("DELETE FROM stage_cache WHERE key = ?", (key,))
+            self._disk_bytes -= len(row[1])
+            return None
+        conn.execute("UPDATE stage_cache SET accessed = ? WHERE key = ?", (now, key))
+        return row[0], bytes(row[1])
+
+    def _disk_put(self, key: str, expires: float, payload: bytes) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            previous = conn.execute("SELECT LENGTH(value) FROM stage_cache WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO stage_cache (key, scope, value, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, key.rsplit("/", 2)[0], payload, expires, self._clock()),
+            )
+            self._disk_bytes += len(payload) - (previous[0] if previous else 0)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM stage_cache WHERE expires < ?", (self._clock(),))
+        self._disk_bytes = self._stored_bytes(conn)
+        # Drop the least recently used entries until we are back under the cap.
+        target = self.max_disk_bytes * 0.9
+        for key, size in conn.execute("SELECT key, LENGTH(value) FROM stage_cache ORDER BY accessed").fetchall():
+            if self._disk_bytes <= target:
+                break
+            conn.execute("DELETE FROM stage_cache WHERE key = ?", (key,))
+            self._disk_bytes -= size
+
+
+__all__ = ["StageCache", "stage_key", "fingerprint", "is_json_data"]
@@ -12,12 +12,29 @@ with LangGraph and other external services.
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import copy
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional
+
+from . import config
+from .cache import StageCache, fingerprint, stage_key
+from .compliance import ComplianceChecker, default_checker, issues_of, texts_of
+from .pipeline import LazyAgent, LazyImport, PipelineTeam, Stage, StageGraph, shared
+from .scheduler import PRIORITY_ONBOARDING, PRIORITY_ROUTINE, FairScheduler, Ticket
+
+if TYPE_CHECKING:
+    from .agent_pool import AgentPool
+    from .assets import AssetStore
+    from .workspace import Workspace
 
 
 class AIAccountManager:
     """Onboards the client and manages ongoing communication."""
 
+    reads = ()
+    writes = ("account_manager",)
+
     def __init__(self, client_name: str) -> None:
         self.client_name = client_name
 
@@ -29,6 +46,9 @@ class AIAccountManager:
 class AIGrowthStrategist:
     """Drafts the high-level growth strategy for the client."""
 
+    reads = ("account_manager",)
+    writes = ("growth_strategy",)
+
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
         context["growth_strategy"] = "drafted"
         return context
@@ -37,62 +57,280 @@ class AIGrowthStrategist:
 class AIFunnelArchitect:
     """Designs marketing funnels for the client."""
 
+    reads = ("growth_strategy",)
+    writes = ("funnel",)
+
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
         context["funnel"] = "designed"
         return context
 
 
 class AICreativeDirector:
-    """Creates image-based creatives for ad campaigns."""
+    """Creates image-based creatives for ad campaigns.
+
+    With an `escale_ai.assets.AssetStore` the creatives are saved there and
+    ``creatives`` holds their references (``"<sha256>.png"``); the brand
+    kit is applied when they are served, once per client. ``ad_copy``
+    holds the headline and body that run with each creative.
+    """
+
+    reads = ("growth_strategy",)
+    writes = ("creatives", "ad_copy")
+
+    def __init__(self, asset_store: Optional["AssetStore"] = None) -> None:
+        self.asset_store = asset_store
+        self._refs: Optional[List[str]] = None
+
+    def config_fingerprint(self) -> str:
+        """Identify the store the references point into (if any)."""
+        if self.asset_store is None:
+            return ""
+        return fingerprint(["assets", os.path.abspath(self.asset_store.root)])
 
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        # In a real implementation, image assets would be generated here
-        context["creatives"] = ["image1.png", "image2.png"]
+        if self.asset_store is None:
+            context["creatives"] = ["image1.png", "image2.png"]
+            context["ad_copy"] = _ad_copy(context["creatives"])
+            return context
+        if self._refs is None:
+            # In a real implementation, image assets would be generated here;
+            # the placeholders are identical for every client, so stored once.
+            from .assets import solid_png
+
+            self._refs = [
+                self.asset_store.put(solid_png(1080, 1080, color)).name for color in ("#F4E1D2", "#D9E8F5")
+            ]
+        context["creatives"] = list(self._refs)
+        context["ad_copy"] = _ad_copy(context["creatives"])
         return context
 
 
+def _ad_copy(creatives: List[str]) -> List[Dict[str, str]]:
+    # TODO: Write the copy for each creative instead of cycling placeholders
+    return [
+        {"creative": creative, **config.AD_COPY[i % len(config.AD_COPY)]} for i, creative in enumerate(creatives)
+    ]
+
+
 class AIMediaBuyer:
-    """Simulates media planning and buying without executing real ad spend."""
+    """Simulates media planning and buying without executing real ad spend.
+
+    The ``media_budget_usd`` of the run (the client's daily ad budget by
+    default) is split across the ``media_channels`` assumptions, or
+    ``config.MEDIA_CHANNELS``, by `escale_ai.media_sim.plan_media`; the
+    resulting plan is stored as a dict of JSON data in ``media_plan``.
+
+    Scenarios are drawn with a fixed seed, so the same budget and
+    assumptions always give the same complete plan; the last ``memo_size``
+    complete plans are reused, as clients on the same tier usually share
+    both. A plan cut short by the time budget is returned but neither
+    memoized nor stored in the stage cache. Thread-safe.
+    """
+
+    reads = ("growth_strategy", "funnel", "media_budget_usd", "media_channels")
+    writes = ("media_plan",)
+
+    def __init__(self, time_budget: Optional[float] = None, memo_size: int = 256) -> None:
+        self.time_budget = config.MEDIA_SIM_TIME_BUDGET if time_budget is None else time_budget
+        self.memo_size = memo_size
+        self._plans: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def config_fingerprint(self) -> str:
+        """The time budget bounds how many splits are tried, so it shapes the plan."""
+        return fingerprint(["media", self.time_budget])
 
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
         # This agent only proposes plans; it does not execute buys
-        context["media_plan"] = "simulated_plan"
+        budget = context.get("media_budget_usd") or config.DEFAULT_CLIENT_LIMITS["daily_ad_budget_usd"]
+        channels = context.get("media_channels")
+        key = fingerprint([budget, channels])
+        with self._lock:
+            plan = self._plans.get(key)
+        if plan is None:
+            from .media_sim import plan_media  # imports numpy
+
+            plan = plan_media(budget, channels, time_budget=self.time_budget, seed=0)._asdict()
+            # Intervals as lists, so a stage cache hit returns the same plan.
+            plan = {name: list(value) if isinstance(value, tuple) else value for name, value in plan.items()}
+            if plan["complete"]:
+                with self._lock:
+                    if len(self._plans) >= self.memo_size:
+                        self._plans.pop(next(iter(self._plans)), None)
+                    self._plans[key] = plan
+        context["media_plan"] = copy.deepcopy(plan)
         return context
 
 
 class AIQAComplianceAds:
-    """Ensures compliance of ads with medical regulations."""
+    """Ensures compliance of ads with medical regulations.
+
+    The headline and body of every entry of ``ad_copy`` are checked in one
+    batch by a `ComplianceChecker`; violations are listed in
+    ``ads_compliance_issues``. The creatives themselves are images and are
+    not checked.
+    """
+
+    reads = ("ad_copy",)
+    writes = ("ads_compliance", "ads_compliance_issues")
+
+    def __init__(self, checker: Optional[ComplianceChecker] = None) -> None:
+        self.checker = checker or default_checker()
+        self._config: Optional[str] = None
+
+    def config_fingerprint(self) -> str:
+        """Fingerprint of the checker's rules."""
+        if self._config is None:
+            self._config = fingerprint(["rules", self.checker.rules])
+        return self._config
 
     def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        context["ads_compliance"] = True
+        texts = [text for ad in context.get("ad_copy") or () for text in texts_of(ad, ("headline", "body"))]
+        verdicts = self.checker.check_batch(texts)
+        context["ads_compliance"] = all(verdict.compliant for verdict in verdicts)
+        context["ads_compliance_issues"] = issues_of(verdicts)
         return context
 
 
-class ClientTeam:
+class ClientTeam(PipelineTeam):
     """
     Encapsulates the operational team for a single client.
 
     Each team is created by the AgentFactory and is responsible for
     producing marketing assets and strategies for that client. The
-    `run_pipeline` method executes all roles in sequence.
+    `run_pipeline` method executes all roles, running the funnel and
+    creative work in parallel once the growth strategy is drafted, and
+    checking ad compliance as soon as the creatives exist.
+
+    With a ``stage_cache`` every stage is looked up by the client name, the
+    values it reads and the fingerprint of the effective brand kit, so a
+    rerun with the same inputs is served from the cache and editing the
+    brand kit (or ``config.DEFAULT_BRAND_KIT``) recomputes everything.
+    Agents whose output also depends on how they were built (an asset
+    store, a ruleset...) add their ``config_fingerprint()`` to the key, so
+    the lookup builds (or takes from the pool) the stage's agent.
+
+    A team attached to a `escale_ai.workspace.Workspace` uses the brand kit
+    stored there and saves the result of every run back to it.
+
+    Agents are built the first time their stage runs or is looked up in
+    the stage cache, so creating a team stays cheap. With an
+    ``agent_pool`` they are shared with the other teams instead; the
+    account manager is shared by the teams of the same client.
+
+    With a ``scheduler`` each stage waits for a fair-share slot, weighted
+    and capped by the client's ``scheduler_weight`` and
+    ``max_concurrent_stages`` limits. The first run of a workspace without
+    saved state counts as onboarding and goes before routine runs.
+
+    Args:
+        client_name: The client the team works for.
+        brand_kit: Client overrides of ``config.DEFAULT_BRAND_KIT``.
+        stage_cache: Optional cache of stage results.
+        workspace: Optional persistent workspace of the client.
+        agent_pool: Optional pool of shared agents.
+        scheduler: Optional `FairScheduler` shared with the other teams.
+        priority: Scheduling priority overriding the onboarding/routine one.
+        deadline: ``time.monotonic()`` value by which the run should finish.
+        asset_store: Optional `escale_ai.assets.AssetStore` for the creatives.
     """
 
-    def __init__(self, client_name: str) -> None:
+    graph = StageGraph(
+        (
+            Stage.of("account_manager", AIAccountManager),
+            Stage.of("growth_strategist", AIGrowthStrategist),
+            Stage.of("funnel_architect", AIFunnelArchitect),
+            Stage.of("creative_director", AICreativeDirector),
+            Stage.of("media_buyer", AIMediaBuyer),
+            Stage.of("qa_compliance_ads", AIQAComplianceAds),
+        )
+    )
+
+    state_model = LazyImport("escale_ai.state", "ClientPipelineState")
+
+    account_manager = LazyAgent(lambda team: AIAccountManager(team.client_name), key=lambda team: team.client_name)
+    growth_strategist = LazyAgent(lambda team: AIGrowthStrategist(), key=shared)
+    funnel_architect = LazyAgent(lambda team: AIFunnelArchitect(), key=shared)
+    creative_director = LazyAgent(lambda team: AICreativeDirector(team.asset_store), key=lambda team: team.asset_store)
+    media_buyer = LazyAgent(lambda team: AIMediaBuyer(), key=shared)
+    qa_compliance_ads = LazyAgent(lambda team: AIQAComplianceAds(), key=shared)
+
+    def __init__(
+        self,
+        client_name: str,
+        brand_kit: Optional[Mapping[str, str]] = None,
+        stage_cache: Optional[StageCache] = None,
+        workspace: Optional["Workspace"] = None,
+        agent_pool: Optional["AgentPool"] = None,
+        scheduler: Optional[FairScheduler] = None,
+        priority: Optional[int] = None,
+        deadline: Optional[float] = None,
+        asset_store: Optional["AssetStore"] = None,
+    ) -> None:
         self.client_name = client_name
-        self.account_manager = AIAccountManager(client_name)
-        self.growth_strategist = AIGrowthStrategist()
-        self.funnel_architect = AIFunnelArchitect()
-        self.creative_director = AICreativeDirector()
-        self.media_buyer = AIMediaBuyer()
-        self.qa_compliance_ads = AIQAComplianceAds()
-
-    def run_pipeline(self, context: Dict[str, Any] | None = None) -> Dict[str, Any]:
-        if context is None:
-            context = {}
-        context = self.account_manager.run(context)
-        context = self.growth_strategist.run(context)
-        context = self.funnel_architect.run(context)
-        context = self.creative_director.run(context)
-        context = self.media_buyer.run(context)
-        context = self.qa_compliance_ads.run(context)
-        return context
+        self.workspace = workspace
+        if workspace is not None:
+            self.brand_kit_overrides = workspace.brand_kit_overrides
+            if brand_kit:
+                workspace.update_brand_kit(brand_kit)
+        else:
+            self.brand_kit_overrides = dict(brand_kit or {})
+        self.stage_cache = stage_cache
+        self.agent_pool = agent_pool
+        self.scheduler = scheduler
+        self.priority = priority
+        self.deadline = deadline
+        self.asset_store = asset_store
+
+    @property
+    def brand_kit(self) -> Dict[str, str]:
+        """The default brand kit with this client's overrides applied."""
+        return {**config.DEFAULT_BRAND_KIT, **self.brand_kit_overrides}
+
+    @property
+    def limits(self) -> Dict[str, Any]:
+        """The client's workspace limits, or ``config.DEFAULT_CLIENT_LIMITS``."""
+        if self.workspace is not None:
+            return self.workspace.limits
+        return dict(config.DEFAULT_CLIENT_LIMITS)
+
+    def ticket(self) -> Ticket:
+        priority = self.priority
+        if priority is None:
+            onboarding = self.workspace is not None and self.workspace.state is None
+            priority = PRIORITY_ONBOARDING if onboarding else PRIORITY_ROUTINE
+        limits = self.limits
+        return Ticket(
+            self.client_name,
+            priority,
+            self.deadline,
+            limits.get("scheduler_weight", 1),
+            limits.get("max_concurrent_stages"),
+        )
+
+    def cache_key(self, stage: Stage, context: Mapping[str, Any]) -> Optional[str]:
+        inputs = {key: context.get(key) for key in stage.reads}
+        salt = fingerprint(self.brand_kit)
+        config_fingerprint = getattr(self.agent(stage.name), "config_fingerprint", None)
+        if config_fingerprint is not None:
+            salt = f"{salt}:{config_fingerprint()}"
+        return stage_key(self.client_name, stage.name, inputs, salt)
+
+    def cacheable(self, stage: Stage, result: Mapping[str, Any]) -> bool:
+        # A media plan cut short by the time budget is only good for this run.
+        plan = result.get("media_plan") if "media_plan" in stage.writes else None
+        return not plan or plan.get("complete", True)
+
+    def _enter(self, context):
+        work = super()._enter(context)
+        if not work.get("client_name"):
+            work["client_name"] = self.client_name
+        if not work.get("media_budget_usd"):
+            work["media_budget_usd"] = self.limits.get("daily_ad_budget_usd")
+        return work
+
+    def _exit(self, context, work):
+        result = super()._exit(context, work)
+        if self.workspace is not None:
+            self.workspace.record_run(result)
+        return result
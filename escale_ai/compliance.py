@@ -0,0 +1,327 @@
+"""
+Compliance rule engine for outreach emails and ad creatives.
+
+Medical aesthetics marketing must avoid a long list of banned phrases
+("guaranteed results", "no downtime", ...) and unsubstantiated claim
+patterns. `ComplianceChecker` compiles the whole ruleset once into a single
+regular expression: plain phrases are merged into a word-level trie (so
+"miracle" and "miracle cure" share their common prefix and the engine never
+re-tries a common prefix for every phrase), and regex rules are appended as
+extra alternatives. Every rule is anchored at the start of a word, so the
+scanner only attempts a match there. Texts are lower-cased before the scan,
+which lets the phrase trie match without case-insensitive comparisons.
+Checking a text is then one linear scan, whatever the number of rules.
+
+`ComplianceChecker.check_batch` concatenates every text that is not in the
+verdict cache and scans them in one pass. Verdicts are cached by content
+hash, so the same template rendered for thousands of leads, or the same
+creative reviewed twice, is only scanned once.
+
+Usage:
+    from escale_ai.compliance import ComplianceChecker
+
+    checker = ComplianceChecker()
+    verdict = checker.check("Guaranteed results with zero downtime!")
+    if not verdict.compliant:
+        print([v.rule_id for v in verdict.violations])
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+#: Severity that makes a text non-compliant; other severities are reported only.
+BLOCK = "block"
+WARN = "warn"
+
+# Separates texts scanned together. No rule can match across it: phrases
+# only skip whitespace between words and ``.`` does not match newlines.
+_SEPARATOR = "\n\x00\n"
+
+
+class Rule(NamedTuple):
+    """A banned phrase or claim pattern.
+
+    Attributes:
+        rule_id: Stable identifier reported in violations.
+        pattern: A phrase (matched case-insensitively, any whitespace between
+            words) or, when ``regex`` is true, a case-insensitive regular
+            expression. Both only match starting at the beginning of a word.
+        severity: ``"block"`` or ``"warn"``.
+        message: Explanation shown to reviewers.
+        regex: Whether ``pattern`` is a regular expression.
+    """
+
+    rule_id: str
+    pattern: str
+    severity: str = BLOCK
+    message: str = ""
+    regex: bool = False
+
+
+class Violation(NamedTuple):
+    """A rule match inside a checked text."""
+
+    rule_id: str
+    severity: str
+    text: str
+    start: int
+    message: str
+
+
+class Verdict(NamedTuple):
+    """Result of checking one text."""
+
+    compliant: bool
+    violations: Tuple[Violation, ...]
+
+
+def _phrase(rule_id: str, pattern: str, message: str, severity: str = BLOCK) -> Rule:
+    return Rule(rule_id, pattern, severity, message)
+
+
+def _claim(rule_id: str, pattern: str, message: str, severity: str = BLOCK) -> Rule:
+    return Rule(rule_id, pattern, severity, message, regex=True)
+
+
+_OUTCOME = "Outcome guarantees are not allowed for medical treatments."
+_SAFETY = "Absolute safety claims are not allowed."
+_CURE = "Treatments may not be presented as cures."
+_FDA = "Regulatory status must be stated exactly and substantiated."
+_PRESSURE = "Avoid high-pressure or misleading sales language."
+_SUPERLATIVE = "Unsubstantiated superlatives need evidence."
+
+DEFAULT_RULES: Tuple[Rule, ...] = (
+    _phrase("guaranteed-results", "guaranteed results", _OUTCOME),
+    _phrase("results-guaranteed", "results guaranteed", _OUTCOME),
+    _phrase("guarantee-results", "we guarantee", _OUTCOME),
+    _phrase("money-back", "money back guarantee", _OUTCOME),
+    _phrase("permanent-results", "permanent results", _OUTCOME),
+    _phrase("instant-results", "instant results", _OUTCOME),
+    _phrase("look-years-younger", "look 10 years younger", _OUTCOME),
+    _phrase("risk-free", "risk free", _SAFETY),
+    _phrase("risk-free-hyphen", "risk-free", _SAFETY),
+    _phrase("no-risk", "no risk", _SAFETY),
+    _phrase("completely-safe", "completely safe", _SAFETY),
+    _phrase("100-safe", "100% safe", _SAFETY),
+    _phrase("no-side-effects", "no side effects", _SAFETY),
+    _phrase("side-effect-free", "side effect free", _SAFETY),
+    _phrase("painless", "painless", _SAFETY, WARN),
+    _phrase("no-downtime", "no downtime", _SAFETY, WARN),
+    _phrase("zero-downtime", "zero downtime", _SAFETY, WARN),
+    _phrase("cure", "cure", _CURE),
+    _phrase("cures", "cures", _CURE),
+    _phrase("miracle", "miracle", _CURE),
+    _phrase("miracle-cure", "miracle cure", _CURE),
+    _phrase("fountain-of-youth", "fountain of youth", _CURE),
+    _phrase("reverse-aging", "reverse aging", _CURE),
+    _phrase("fda-approved", "fda approved", _FDA, WARN),
+    _phrase("fda-approved-hyphen", "fda-approved", _FDA, WARN),
+    _phrase("clinically-proven", "clinically proven", _SUPERLATIVE, WARN),
+    _phrase("best-in-town", "best in town", _SUPERLATIVE, WARN),
+    _phrase("number-one", "#1 clinic", _SUPERLATIVE, WARN),
+    _phrase("act-now", "act now", _PRESSURE, WARN),
+    _phrase("limited-time-only", "limited time only", _PRESSURE, WARN),
+    _phrase("once-in-a-lifetime", "once in a lifetime", _PRESSURE, WARN),
+    _phrase("free-botox", "free botox", "Free prescription treatments may not be offered as inducements."),
+    _claim("percent-success", r"\d{2,3}\s*%\s+(?:success|effective|satisfaction|guaranteed)", _SUPERLATIVE),
+    _claim("lose-weight-fast", r"lose\s+\d+\s*(?:lbs?|pounds|kg|inches)\s+in\s+\d+\s+(?:days?|weeks?)\b", _OUTCOME),
+    _claim("years-younger", r"look\s+\d+\s+years\s+younger\b", _OUTCOME),
+    _claim("no-needles-no-pain", r"no\s+(?:needles|pain)\s*,?\s+no\s+(?:pain|needles)\b", _SAFETY, WARN),
+)
+
+
+def load_rules(path: str) -> List[Rule]:
+    """Load rules from a JSON list of objects with the `Rule` field names."""
+    with open(path, encoding="utf-8") as f:
+        return [Rule(**entry) for entry in json.load(f)]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _trie_pattern(phrases: Iterable[str]) -> Optional[str]:
+    """Compile phrases into one alternation that shares common word prefixes."""
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for word in phrase.split():
+            node = node.setdefault(word, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> Optional[str]:
+        alternatives = []
+        # Longer words first so "cures" is tried before its prefix "cure".
+        for word in sorted((w for w in node if w), key=lambda w: (-len(w), w)):
+            child = node[word]
+            rest = build(child)
+            if rest is None:
+                alternatives.append(re.escape(word))
+            elif "" in child:
+                alternatives.append(rf"{re.escape(word)}(?:\s+{rest})?")
+            else:
+                alternatives.append(rf"{re.escape(word)}\s+{rest}")
+        if not alternatives:
+            return None
+        return alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+
+    return build(trie)
+
+
+class ComplianceChecker:
+    """Check texts against a ruleset compiled into a single scanner.
+
+    Thread-safe.
+
+    Args:
+        rules: the ruleset; defaults to `DEFAULT_RULES`
+        cache_size: verdicts kept in the content-hash LRU cache
+    """
+
+    def __init__(self, rules: Sequence[Rule] = DEFAULT_RULES, cache_size: int = 100_000) -> None:
+        self.rules = tuple(rules)
+        self.cache_size = cache_size
+        self.scanned = 0
+        self._phrases: Dict[str, Rule] = {}
+        self._claims: List[Tuple[Rule, "re.Pattern[str]"]] = []
+        for rule in self.rules:
+            if rule.regex:
+                self._claims.append((rule, re.compile(rule.pattern, re.IGNORECASE)))
+            else:
+                self._phrases[_normalize(rule.pattern)] = rule
+        parts = []
+        trie = _trie_pattern(self._phrases)
+        if trie is not None:
+            parts.append(rf"{trie}(?!\w)")
+        parts.extend(f"(?i:{rule.pattern})" for rule, _ in self._claims)
+        # Matched against lower-cased text; the fallback handles the rare
+        # characters whose lower-case form has a different length.
+        combined = r"(?<!\w)(?:" + "|".join(parts) + ")"
+        self._scanner = re.compile(combined) if parts else None
+        self._scanner_ci = re.compile(combined, re.IGNORECASE) if parts else None
+        self._cache: "OrderedDict[bytes, Verdict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ComplianceChecker":
+        return cls(load_rules(path), **kwargs)
+
+    def check(self, text: str) -> Verdict:
+        """Check one text."""
+        return self.check_batch([text])[0]
+
+    def check_batch(self, texts: Sequence[str]) -> List[Verdict]:
+        """Check many texts, scanning all uncached ones in a single pass.
+
+        Returns:
+            One `Verdict` per input text, in order.
+        """
+        keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() for text in texts]
+        verdicts: List[Optional[Verdict]] = [None] * len(texts)
+        pending: Dict[bytes, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    verdicts[i] = cached
+                else:
+                    pending.setdefault(key, []).append(i)
+        if pending:
+            scanned = self._scan([texts[positions[0]] for positions in pending.values()])
+            with self._lock:
+                for (key, positions), verdict in zip(pending.items(), scanned):
+                    for i in positions:
+                        verdicts[i] = verdict
+                    self._cache[key] = verdict
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return verdicts  # type: ignore[return-value]
+
+    def is_compliant(self, texts: Iterable[str]) -> bool:
+        return all(verdict.compliant for verdict in self.check_batch(list(texts)))
+
+    def _scan(self, texts: List[str]) -> List[Verdict]:
+        found: List[List[Violation]] = [[] for _ in texts]
+        if self._scanner is not None:
+            starts = []
+            position = 0
+            for text in texts:
+                starts.append(position)
+                position += len(text) + len(_SEPARATOR)
+            joined = _SEPARATOR.join(texts)
+            lowered = joined.lower()
+            if len(lowered) == len(joined):
+                matches = self._scanner.finditer(lowered)
+            else:
+                matches = self._scanner_ci.finditer(joined)
+            for match in matches:
+                start, end = match.span()
+                doc = bisect.bisect_right(starts, start) - 1
+                text = joined[start:end]
+                rule = self._attribute(text)
+                if rule is not None:
+                    found[doc].append(Violation(rule.rule_id, rule.severity, text, start - starts[doc], rule.message))
+        self.scanned += len(texts)
+        return [
+            Verdict(all(v.severity != BLOCK for v in violations), tuple(violations)) for violations in found
+        ]
+
+    def _attribute(self, matched: str) -> Optional[Rule]:
+        rule = self._phrases.get(_normalize(matched))
+        if rule is not None:
+            return rule
+        for rule, pattern in self._claims:
+            if pattern.fullmatch(matched):
+                return rule
+        return None
+
+
+def texts_of(context: Mapping[str, Any], keys: Iterable[str]) -> List[str]:
+    """Collect the text values (strings or lists of strings) stored under ``keys``."""
+    texts: List[str] = []
+    for key in keys:
+        value = context.get(key)
+        if isinstance(value, str):
+            texts.append(value)
+        elif isinstance(value, (list, tuple)):
+            texts.extend(item for item in value if isinstance(item, str))
+    return texts
+
+
+def issues_of(verdicts: Iterable[Verdict]) -> List[str]:
+    """Flatten verdicts into ``"rule_id: matched text"`` strings."""
+    return [f"{v.rule_id}: {v.text}" for verdict in verdicts for v in verdict.violations]
+
+
+_default_checker: Optional[ComplianceChecker] = None
+
+
+def default_checker() -> ComplianceChecker:
+    """Return the shared checker built from `DEFAULT_RULES`."""
+    global _default_checker
+    if _default_checker is None:
+        _default_checker = ComplianceChecker()
+    return _default_checker
+
+
+__all__ = [
+    "ComplianceChecker",
+    "Rule",
+    "Verdict",
+    "Violation",
+    "DEFAULT_RULES",
+    "BLOCK",
+    "WARN",
+    "default_checker",
+    "load_rules",
+    "texts_of",
+    "issues_of",
+]
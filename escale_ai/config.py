@@ -5,9 +5,88 @@ Centralizing these values makes it easy to adjust sending limits,
 allowed countries and default brand settings in one place.
 """
 
+from typing import Optional
+
 # Maximum number of cold emails the base team should send per day
 EMAIL_LIMIT_PER_DAY: int = 50
 
+# Sustained sending rate (emails per second) and burst size of the email engine
+EMAIL_SEND_RATE_PER_SECOND: float = 1.0
+EMAIL_SEND_BURST: int = 5
+
+# SQLite file holding the outgoing email queue and the persisted daily quota
+EMAIL_OUTBOX_PATH: str = "data/outbox.sqlite3"
+
+# Cold email templates rendered for every lead (see escale_ai.templates)
+OUTREACH_SUBJECT_TEMPLATE: str = "More {{ services | first | default: \"aesthetic\" }} patients for {{ clinic_name }}"
+OUTREACH_BODY_TEMPLATE: str = (
+    "Hi {{ clinic_name }} team,\n\n"
+    "We help med spas in {{ city | title | default: \"your area\" }} book more "
+    "{{ services | first | lower | default: \"aesthetic\" }} consultations with paid social campaigns.\n\n"
+    "Would you be open to a 15 minute call next week?\n\n"
+    "Best,\nEscale AI"
+)
+
+# Async tool services: connections open at once per provider, limit for
+# providers not listed, and seconds an idle connection is kept alive
+TOOL_POOL_LIMITS: dict[str, int] = {"email": 10, "calendar": 5, "crm": 10, "leads": 4}
+TOOL_POOL_DEFAULT_LIMIT: int = 8
+TOOL_POOL_IDLE_TIMEOUT: float = 60.0
+
+# Chat server background jobs: concurrent pipeline runs, queued runs before
+# answering 429, and finished jobs kept for status polling
+WEB_JOB_WORKERS: int = 8
+WEB_JOB_QUEUE_SIZE: int = 100
+WEB_JOB_RETENTION: int = 1000
+
+# Maximum Server-Sent Events pipeline streams open at the same time
+WEB_STREAM_LIMIT: int = 200
+
+# Metrics and tracing (escale_ai.metrics) in the chat server, and an
+# optional JSONL file receiving every trace span
+WEB_METRICS_ENABLED: bool = True
+METRICS_SPANS_PATH: Optional[str] = None
+
+# Agents kept by the shared agent pool of AgentFactory (stateless agents
+# plus one account manager per client)
+AGENT_POOL_MAX_AGENTS: int = 1024
+
+# Event log of pipeline runs: file, seconds the committer waits to batch
+# more events into one fsync, and whether to fsync at all
+EVENTLOG_PATH: str = "data/events.jsonl"
+EVENTLOG_COMMIT_DELAY: float = 0.001
+EVENTLOG_FSYNC: bool = True
+
+# Stage result cache: in-memory entries, entry lifetime and disk tier size
+STAGE_CACHE_MAX_ENTRIES: int = 1024
+STAGE_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+STAGE_CACHE_MAX_DISK_BYTES: int = 64 * 1024 * 1024
+STAGE_CACHE_PATH: str = "data/stage_cache.sqlite3"
+
+# Client workspaces: SQLite file, workspaces kept in memory and runs kept per client
+WORKSPACE_DB_PATH: str = "data/workspaces.sqlite3"
+WORKSPACE_HOT_TEAMS: int = 256
+WORKSPACE_HISTORY_LIMIT: int = 50
+
+# Creative assets (escale_ai.assets): content-addressed store directory,
+# whether the chat server stores creatives there and serves them under
+# /assets, and the ad formats variants are rendered in, as (width, height)
+ASSET_STORE_PATH: str = "data/assets"
+WEB_ASSETS_ENABLED: bool = True
+AD_FORMATS: dict[str, tuple[int, int]] = {
+    "thumbnail": (256, 256),
+    "square": (1080, 1080),
+    "portrait": (1080, 1350),
+    "story": (1080, 1920),
+    "landscape": (1200, 628),
+}
+
+# Placeholder ad copy written next to each creative, checked by the ads QA stage
+AD_COPY: list[dict[str, str]] = [
+    {"headline": "Refreshed, natural-looking results", "body": "Book a consultation with our licensed injectors."},
+    {"headline": "Smooth lines, your way", "body": "Ask our team which treatment fits your goals."},
+]
+
 # Country where operations are allowed; clients must be within this region
 ALLOWED_COUNTRY: str = "United States"
 
@@ -17,3 +96,37 @@ DEFAULT_BRAND_KIT: dict[str, str] = {
     "primary_color": "#0066CC",
     "secondary_color": "#CCCCCC",
 }
+
+# Default per-client limits stored in every new workspace; the scheduler
+# weight is the client's share of the stage capacity (its paying tier)
+DEFAULT_CLIENT_LIMITS: dict[str, int] = {
+    "max_creatives_per_run": 10,
+    "daily_ad_budget_usd": 100,
+    "scheduler_weight": 1,
+    "max_concurrent_stages": 2,
+}
+
+# Fair-share scheduler (escale_ai.scheduler): stages running at once across
+# clients, seconds before a deadline at which a stage jumps the queue, and
+# wait times kept per client for the stats
+SCHEDULER_CAPACITY: int = 8
+SCHEDULER_DEADLINE_SLACK: float = 1.0
+SCHEDULER_WAIT_SAMPLES: int = 1024
+
+# Media-plan simulation (escale_ai.media_sim): assumptions per channel (USD
+# per 1000 impressions, click-through rate, click-to-lead rate, people the
+# channel can reach and the relative uncertainty of those rates), scenarios
+# simulated per plan, budget split granularity, confidence level of the
+# reported intervals, seconds a client's plan may take and the portfolio
+# size from which plans are spread over processes
+MEDIA_CHANNELS: dict[str, dict[str, float]] = {
+    "meta": {"cpm": 12.0, "ctr": 0.012, "cvr": 0.08, "audience": 60000, "noise": 0.3},
+    "instagram": {"cpm": 9.0, "ctr": 0.008, "cvr": 0.06, "audience": 40000, "noise": 0.3},
+    "google_search": {"cpm": 40.0, "ctr": 0.05, "cvr": 0.12, "audience": 6000, "noise": 0.2},
+    "tiktok": {"cpm": 7.0, "ctr": 0.006, "cvr": 0.04, "audience": 80000, "noise": 0.4},
+}
+MEDIA_SIM_SCENARIOS: int = 2000
+MEDIA_SIM_STEP: float = 0.1
+MEDIA_SIM_CONFIDENCE: float = 0.9
+MEDIA_SIM_TIME_BUDGET: float = 0.5
+MEDIA_SIM_PROCESS_THRESHOLD: int = 32
@@ -0,0 +1,576 @@
+"""
+Durable, event-sourced log of pipeline runs with crash recovery.
+
+`EventLog` appends one JSON line per event to a file that is only ever
+appended to:
+
+* ``run_started``: the run id, the team and the initial context;
+* ``stage``: a completed stage with a fingerprint of what it read and the
+  keys it wrote (its delta);
+* ``effect``: a side effect that already happened (an email sent, a
+  meeting booked) under an idempotency key, with its result. The key is the
+  run, the stage and the position of the call among the stage's effects,
+  so two identical calls are still two effects;
+* ``run_finished`` / ``run_failed``.
+
+Writes use group commit: callers enqueue their line and a single
+committer thread writes every pending line and calls ``fsync`` once for the
+whole batch, so concurrent runs share the cost of each flush. Stage events
+are not waited for (a stage whose event is lost is simply run again);
+side effects and the end of a run wait until they are on disk.
+
+After a crash, a new `EventLog` on the same file finds the runs that
+neither finished nor failed. `EventLog.recover` rebuilds each one's context
+from its initial context and committed deltas and runs only the stages
+that had not committed. Services wrapped in `JournaledEmailService` or
+`JournaledCalendarService` look every call up in the run's effects first,
+so emails and bookings that already went out are not repeated (skipped
+bookings are put back into a `LocalCalendarService`); a crash between a
+call and its record being written can still repeat that one call. Code
+with its own durable store asks `idempotency_key` for a key instead: the
+outreach specialist stores it on every outbox row, so a resumed run does
+not queue its emails twice.
+
+Usage:
+    from escale_ai.eventlog import EventLog
+
+    with EventLog("data/events.jsonl") as log:
+        log.recover(lambda record: BaseTeam())   # finish interrupted runs
+        context = log.run(BaseTeam(), {"prospect_filters": {"state": "CA"}})
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, TypeVar
+
+from . import config
+from .cache import fingerprint
+from .pipeline import PipelineHook, Stage
+from .tools.calendar_service import BaseCalendarService, Booking, parse_meeting_time
+from .tools.email_service import BaseEmailService
+
+if TYPE_CHECKING:
+    from .pipeline import PipelineTeam
+
+T = TypeVar("T")
+
+
+class RunRecord(NamedTuple):
+    """A run that started but neither finished nor failed.
+
+    Attributes:
+        run_id: Identifier of the run.
+        team: Class name of the team that ran it.
+        context: The initial context with every committed delta applied.
+        completed: Stages whose result was committed.
+        effects: Idempotency key -> result of the side effects that ran.
+    """
+
+    run_id: str
+    team: str
+    context: Dict[str, Any]
+    completed: FrozenSet[str]
+    effects: Dict[str, Any]
+
+
+class EventLogStats(NamedTuple):
+    """Counters of an `EventLog`.
+
+    Attributes:
+        events: lines appended since the log was opened
+        commits: ``fsync`` batches written
+        pending_runs: runs in flight (or interrupted)
+    """
+
+    events: int
+    commits: int
+    pending_runs: int
+
+
+class _Run:
+    __slots__ = ("team", "context", "completed", "effects")
+
+    def __init__(self, team: str, context: Dict[str, Any]) -> None:
+        self.team = team
+        self.context = context
+        self.completed: List[str] = []
+        self.effects: Dict[str, Any] = {}
+
+
+class _Journal:
+    """Run (and stage) bound to the current context: what `effect` consults."""
+
+    __slots__ = ("log", "run_id", "stage", "_calls")
+
+    def __init__(self, log: "EventLog", run_id: str, stage: str = "") -> None:
+        self.log = log
+        self.run_id = run_id
+        self.stage = stage
+        self._calls = itertools.count()
+
+    def next_key(self, operation: str) -> str:
+        # A rerun stage makes its calls in the same order, so it gets the same keys.
+        return f"{self.run_id}/{self.stage}/{next(self._calls)}/{operation}"
+
+
+_current_run: "contextvars.ContextVar[Optional[_Journal]]" = contextvars.ContextVar("escale_run", default=None)
+
+
+class EventLog:
+    """Append-only JSONL log of pipeline runs with group commit.
+
+    Args:
+        path: log file; created if missing, replayed if it exists
+        commit_delay: seconds the committer waits for more events before a
+            flush, trading a little latency for larger batches
+        fsync: call ``os.fsync`` after every batch; disable only for tests
+            or benchmarks that do not need durability
+    """
+
+    def __init__(
+        self,
+        path: str = config.EVENTLOG_PATH,
+        commit_delay: float = config.EVENTLOG_COMMIT_DELAY,
+        fsync: bool = config.EVENTLOG_FSYNC,
+    ) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.commit_delay = commit_delay
+        self.fsync = fsync
+        self._runs: Dict[str, _Run] = {}
+        self._lock = threading.Lock()
+        self._committed = threading.Condition(self._lock)
+        self._pending: List[str] = []
+        self._async_waiters: List[Tuple[int, asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = []
+        self._seq = 0
+        self._durable = 0
+        self._events = 0
+        self._commits = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._replay()
+        self._file = open(path, "a", encoding="utf-8")
+        self._committer = threading.Thread(target=self._commit_loop, name="escale-eventlog", daemon=True)
+        self._committer.start()
+
+    # -- writing -----------------------------------------------------------
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """Queue ``event`` for the next commit and return its sequence number."""
+        line = json.dumps(event, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("event log is closed")
+            self._apply(event)
+            self._seq += 1
+            self._events += 1
+            self._pending.append(line)
+            self._committed.notify_all()
+            return self._seq
+
+    def wait(self, seq: int) -> None:
+        """Block until event ``seq`` is on disk."""
+        with self._lock:
+            while self._durable < seq and self._error is None:
+                self._committed.wait()
+            if self._error is not None:
+                raise self._error
+
+    async def wait_async(self, seq: int) -> None:
+        """Wait until event ``seq`` is on disk without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._durable >= seq or self._error is not None:
+                future = None
+            else:
+                future = loop.create_future()
+                self._async_waiters.append((seq, loop, future))
+        if future is not None:
+            await future
+        if self._error is not None:
+            raise self._error
+
+    def _commit_loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._committed.wait()
+                if not self._pending and self._closed:
+                    return
+            if self.commit_delay:
+                time.sleep(self.commit_delay)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                last = self._seq
+            try:
+                self._file.write("\n".join(batch) + "\n")
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            except BaseException as exc:  # the disk is gone: fail every waiter
+                with self._lock:
+                    self._error = exc
+                    self._committed.notify_all()
+                    waiters, self._async_waiters = self._async_waiters, []
+                for _, loop, future in waiters:
+                    loop.call_soon_threadsafe(_resolve, future)
+                return
+            with self._lock:
+                self._durable = last
+                self._commits += 1
+                self._committed.notify_all()
+                ready = [w for w in self._async_waiters if w[0] <= last]
+                self._async_waiters = [w for w in self._async_waiters if w[0] > last]
+            for _, loop, future in ready:
+                loop.call_soon_threadsafe(_resolve, future)
+
+    def close(self) -> None:
+        """Write everything still queued and close the file."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._committed.notify_all()
+        self._committer.join()
+        self._file.close()
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # -- state ---------------------------------------------------------------
+
+    @property
+    def stats(self) -> EventLogStats:
+        return EventLogStats(self._events, self._commits, len(self._runs))
+
+    def pending(self) -> List[RunRecord]:
+        """Runs that started but neither finished nor failed, oldest first."""
+        with self._lock:
+            return [
+                RunRecord(run_id, run.team, dict(run.context), frozenset(run.completed), dict(run.effects))
+                for run_id, run in self._runs.items()
+            ]
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        kind = event["type"]
+        run_id = event["run"]
+        if kind == "run_started":
+            self._runs[run_id] = _Run(event["team"], dict(event["context"] or {}))
+            return
+        run = self._runs.get(run_id)
+        if run is None:
+            return
+        if kind == "stage":
+            run.context.update(event["delta"])
+            run.completed.append(event["stage"])
+        elif kind == "effect":
+            run.effects[event["key"]] = event["result"]
+        elif kind in ("run_finished", "run_failed"):
+            del self._runs[run_id]
+
+    def _replay(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        good = 0
+        with open(self.path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn write at the tail
+                try:
+                    event = json.loads(raw)
+                except ValueError:
+                    break
+                self._apply(event)
+                good += len(raw)
+        if good != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+    def compact(self) -> int:
+        """Rewrite the file keeping only what the pending runs need.
+
+        Call it while no run is in progress, e.g. at start-up after
+        `recover`.
+
+        Returns:
+            Number of events kept.
+        """
+        self.wait(self._seq)
+        with self._lock:
+            lines: List[str] = []
+            for run_id, run in self._runs.items():
+                # The committed deltas are folded into the initial context.
+                events: List[Dict[str, Any]] = [{"type": "run_started", "run": run_id, "team": run.team, "context": run.context}]
+                events.extend({"type": "effect", "run": run_id, "key": k, "result": v} for k, v in run.effects.items())
+                events.extend(
+                    {"type": "stage", "run": run_id, "stage": name, "inputs": None, "delta": {}} for name in run.completed
+                )
+                lines.extend(json.dumps(event, separators=(",", ":"), default=str) for event in events)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write("".join(line + "\n" for line in lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            return len(lines)
+
+    # -- runs ----------------------------------------------------------------
+
+    def run(self, team: "PipelineTeam", context: Optional[Dict[str, Any]] = None, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Run ``team``'s pipeline and record it; see `run_async`.
+
+        Inside a running event loop the stages run in declaration order,
+        like `PipelineTeam.run_pipeline`.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.run_async(team, context, run_id))
+        return self._drive_sync(team, self._start(team, context, run_id), context, ())
+
+    async def run_async(
+        self, team: "PipelineTeam", context: Optional[Dict[str, Any]] = None, run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run ``team``'s pipeline, logging every committed stage.
+
+        Returns:
+            The context produced by the run.
+        """
+        return await self._drive(team, self._start(team, context, run_id), context, ())
+
+    def recover(self, team_for: Callable[[RunRecord], "PipelineTeam"]) -> Dict[str, Dict[str, Any]]:
+        """Finish every interrupted run; see `recover_async`.
+
+        Inside a running event loop the stages run in declaration order,
+        like `PipelineTeam.run_pipeline`.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.recover_async(team_for))
+        return {
+            record.run_id: self._drive_sync(team_for(record), record.run_id, record.context, record.completed)
+            for record in self.pending()
+        }
+
+    async def recover_async(self, team_for: Callable[[RunRecord], "PipelineTeam"]) -> Dict[str, Dict[str, Any]]:
+        """Finish every interrupted run, one after the other.
+
+        Args:
+            team_for: returns a team configured like the one that started
+                the run (e.g. from ``record.team`` and its context)
+
+        Returns:
+            Run id -> context of every run that was resumed. A run that
+            fails again is recorded as failed and its error re-raised.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        for record in self.pending():
+            results[record.run_id] = await self._drive(team_for(record), record.run_id, record.context, record.completed)
+        return results
+
+    def _start(self, team: "PipelineTeam", context: Optional[Dict[str, Any]], run_id: Optional[str]) -> str:
+        run_id = run_id or uuid.uuid4().hex
+        self.append({"type": "run_started", "run": run_id, "team": type(team).__name__, "context": context})
+        return run_id
+
+    async def _drive(
+        self, team: "PipelineTeam", run_id: str, context: Optional[Dict[str, Any]], completed: Iterable[str]
+    ) -> Dict[str, Any]:
+        token = _current_run.set(_Journal(self, run_id))
+        try:
+            result = await team.resume_run_async(context, completed, (_StageLogHook(self, run_id),))
+        except Exception as exc:
+            # Cancellation and interpreter shutdown leave the run pending.
+            await self.wait_async(self._failed(run_id, exc))
+            raise
+        finally:
+            _current_run.reset(token)
+        await self.wait_async(self.append({"type": "run_finished", "run": run_id}))
+        return result
+
+    def _drive_sync(
+        self, team: "PipelineTeam", run_id: str, context: Optional[Dict[str, Any]], completed: Iterable[str]
+    ) -> Dict[str, Any]:
+        token = _current_run.set(_Journal(self, run_id))
+        try:
+            result = team.resume_run(context, completed, (_StageLogHook(self, run_id),))
+        except Exception as exc:
+            self.wait(self._failed(run_id, exc))
+            raise
+        finally:
+            _current_run.reset(token)
+        self.wait(self.append({"type": "run_finished", "run": run_id}))
+        return result
+
+    def _failed(self, run_id: str, exc: BaseException) -> int:
+        return self.append({"type": "run_failed", "run": run_id, "error": f"{type(exc).__name__}: {exc}"})
+
+    def _effect_result(self, run_id: str, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None and key in run.effects:
+                return True, run.effects[key]
+        return False, None
+
+
+class _StageLogHook(PipelineHook):
+    def __init__(self, log: EventLog, run_id: str) -> None:
+        self.log = log
+        self.run_id = run_id
+        self.inputs: Dict[str, str] = {}
+
+    def before_stage(self, team, stage: Stage, context) -> None:
+        self.inputs[stage.name] = fingerprint([context.get(key) for key in stage.reads])
+        # Stages run in their own task (or one after the other), so the
+        # agent's effects see the journal of its stage.
+        _current_run.set(_Journal(self.log, self.run_id, stage.name))
+
+    def after_stage(self, team, stage: Stage, result, elapsed, error=None) -> None:
+        if error is not None:
+            return
+        delta = {key: result[key] for key in stage.writes if key in result}
+        self.log.append(
+            {"type": "stage", "run": self.run_id, "stage": stage.name, "inputs": self.inputs.pop(stage.name, None), "delta": delta}
+        )
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def idempotency_key(operation: str) -> Optional[str]:
+    """Return a key for the next effect of the current stage, or None outside a logged run.
+
+    For effects whose target deduplicates by key on its own, e.g. the
+    outbox of `escale_ai.tools.email_sender.EmailSendingEngine`. The key
+    is the same when a resumed run repeats the stage.
+    """
+    journal = _current_run.get()
+    return None if journal is None else journal.next_key(operation)
+
+
+def effect(
+    operation: str,
+    call: Callable[[], T],
+    encode: Callable[[T], Any] = _identity,
+    decode: Callable[[Any], T] = _identity,
+    replay: Optional[Callable[[T], Any]] = None,
+) -> T:
+    """Run a side effect at most once per logged run.
+
+    Outside a run started by an `EventLog` the call is simply made. Inside
+    one, the effect is identified by its stage and its position among the
+    stage's effects (see `idempotency_key`), not by its arguments.
+
+    Args:
+        operation: name of the effect, e.g. ``"send_email"``
+        call: performs the effect
+        encode: turns the result into JSON-compatible data for the log
+        decode: rebuilds the result from the logged data when skipping
+        replay: called with the decoded result when the effect is skipped,
+            to bring in-memory state back in line with it
+    """
+    journal = _current_run.get()
+    if journal is None:
+        return call()
+    effect_key = journal.next_key(operation)
+    done, logged = journal.log._effect_result(journal.run_id, effect_key)
+    if done:
+        result = decode(logged)
+        if replay is not None:
+            replay(result)
+        return result
+    result = call()
+    journal.log.wait(journal.log.append({"type": "effect", "run": journal.run_id, "key": effect_key, "result": encode(result)}))
+    return result
+
+
+class JournaledEmailService(BaseEmailService):
+    """`BaseEmailService` wrapper that sends each email at most once per logged run."""
+
+    # The wrapped service already times its calls.
+    instrumented = ()
+
+    def __init__(self, service: BaseEmailService) -> None:
+        self.service = service
+
+    def send_email(self, to_address: str, subject: str, body: str) -> None:
+        effect("send_email", lambda: self.service.send_email(to_address, subject, body))
+
+
+class JournaledCalendarService(BaseCalendarService):
+    """`BaseCalendarService` wrapper that books each meeting at most once per logged run.
+
+    ``schedule_batch`` is forwarded (and journaled) when the wrapped
+    service has it, e.g. a `LocalCalendarService`. When a resumed run skips
+    a booking that was already made, it is put back into the wrapped
+    service if it has a ``restore`` method, so a calendar rebuilt after a
+    crash does not offer those slots again.
+    """
+
+    # The wrapped service already times its calls.
+    instrumented = ()
+
+    def __init__(self, service: BaseCalendarService) -> None:
+        self.service = service
+
+    def schedule_meeting(self, invitee_email: str, meeting_time: str, duration_minutes: int = 30) -> str:
+        def replay(link: str) -> None:
+            start = parse_meeting_time(meeting_time)
+            self._restore([Booking(start, start + timedelta(minutes=duration_minutes), invitee_email, link)])
+
+        return effect(
+            "schedule_meeting",
+            lambda: self.service.schedule_meeting(invitee_email, meeting_time, duration_minutes),
+            replay=replay,
+        )
+
+    def schedule_batch(self, invitee_emails: Iterable[str], start_after: Any, duration_minutes: int = 30) -> List[Booking]:
+        emails = list(invitee_emails)
+        return effect(
+            "schedule_batch",
+            lambda: self.service.schedule_batch(emails, start_after, duration_minutes),
+            encode=lambda bookings: [[b.start.isoformat(), b.end.isoformat(), b.invitee_email, b.link] for b in bookings],
+            decode=lambda rows: [
+                Booking(datetime.fromisoformat(start), datetime.fromisoformat(end), email, link) for start, end, email, link in rows
+            ],
+            replay=self._restore,
+        )
+
+    def _restore(self, bookings: List[Booking]) -> None:
+        restore = getattr(self.service, "restore", None)
+        if restore is not None:
+            restore(bookings)
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+__all__ = [
+    "EventLog",
+    "EventLogStats",
+    "RunRecord",
+    "effect",
+    "idempotency_key",
+    "JournaledEmailService",
+    "JournaledCalendarService",
+]
@@ -0,0 +1,297 @@
+"""
+Monte Carlo simulation and budget allocation of media plans.
+
+`AIMediaBuyer` never buys media: it proposes how to split a client's ad
+budget across channels. `plan_media` evaluates candidate splits under
+thousands of scenarios at once as NumPy arrays and keeps the one with the
+most expected leads.
+
+Every `Channel` carries its assumptions: cost per thousand impressions,
+click-through rate, click-to-lead rate, the audience it can reach and the
+relative uncertainty (``noise``) of those rates. Each scenario draws a
+lognormal multiplier for the CPM and the response rate of every channel;
+the same draws are shared by all candidates, so they are compared on equal
+terms. For a spend ``s`` on a channel in one scenario::
+
+    impressions = 1000 * s / cpm
+    reach       = audience * (1 - exp(-impressions / audience))
+    leads       = reach * ctr * cvr
+
+so each channel saturates as its audience is exhausted and the best split
+is usually spread over several channels. Audiences of different channels
+are assumed not to overlap.
+
+The candidates are every split in multiples of ``step`` of the budget,
+after the even split. They are enumerated lazily and evaluated in chunks,
+and when the time budget runs out the best split found so far is returned
+with ``complete=False``, however many channels there are. `plan_portfolio` plans many clients, spreading them
+over worker processes once there are ``config.MEDIA_SIM_PROCESS_THRESHOLD``
+or more.
+
+Usage:
+    from escale_ai.media_sim import plan_media
+
+    plan = plan_media(3000)
+    print(plan.allocation, plan.expected_leads, plan.cpl_ci)
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import time
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import config
+
+#: Cells (candidates x scenarios x channels) evaluated per chunk.
+_CHUNK_CELLS = 1 << 20
+
+
+class Channel(NamedTuple):
+    """Assumptions about one advertising channel.
+
+    Attributes:
+        name: Channel name, e.g. ``"meta"``.
+        cpm: USD per thousand impressions.
+        ctr: Share of impressions that click.
+        cvr: Share of clicks that become leads.
+        audience: People the channel can reach in the targeted area.
+        noise: Relative standard deviation of the CPM and the response rate.
+    """
+
+    name: str
+    cpm: float
+    ctr: float
+    cvr: float
+    audience: float
+    noise: float = 0.3
+
+
+class MediaPlan(NamedTuple):
+    """Best budget split found by `plan_media` and its simulated outcome.
+
+    Intervals are ``(low, high)`` percentiles at the requested confidence.
+
+    Attributes:
+        budget: Total budget (USD).
+        allocation: Channel -> USD.
+        expected_reach: Mean people reached.
+        reach_ci: Interval of the people reached.
+        expected_leads: Mean leads.
+        leads_ci: Interval of the leads.
+        expected_cpl: Budget divided by the mean leads.
+        cpl_ci: Interval of the cost per lead.
+        scenarios: Scenarios simulated per candidate.
+        candidates: Splits evaluated.
+        complete: False when the time budget cut the search short.
+    """
+
+    budget: float
+    allocation: Dict[str, float]
+    expected_reach: float
+    reach_ci: Tuple[float, float]
+    expected_leads: float
+    leads_ci: Tuple[float, float]
+    expected_cpl: float
+    cpl_ci: Tuple[float, float]
+    scenarios: int
+    candidates: int
+    complete: bool
+
+
+ChannelSpec = Union[Channel, Mapping[str, Any]]
+
+
+def channels_from(spec: Union[Mapping[str, Mapping[str, Any]], Sequence[ChannelSpec], None] = None) -> List[Channel]:
+    """Build channels from ``config.MEDIA_CHANNELS``-style data.
+
+    Args:
+        spec: a mapping of channel name to assumptions, a sequence of
+            `Channel` objects or of dicts with a ``name``, or None for
+            ``config.MEDIA_CHANNELS``
+    """
+    if spec is None:
+        spec = config.MEDIA_CHANNELS
+    if isinstance(spec, Mapping):
+        return [Channel(name, **assumptions) for name, assumptions in spec.items()]
+    return [item if isinstance(item, Channel) else Channel(**item) for item in spec]
+
+
+def splits(channels: int, step: float) -> "np.ndarray":
+    """Every split of 1 across ``channels`` in multiples of ``step``, even split first."""
+    return np.vstack(list(_split_chunks(channels, step, _CHUNK_CELLS)))
+
+
+def _split_count(channels: int, step: float) -> int:
+    """Number of rows `splits` returns, without building them."""
+    units = max(int(round(1 / step)), 1)
+    return math.comb(units + channels - 1, channels - 1) + 1
+
+
+def _split_chunks(channels: int, step: float, size: int) -> Iterator["np.ndarray"]:
+    """The rows of `splits`, built ``size`` at a time as they are consumed."""
+    units = max(int(round(1 / step)), 1)
+    first = [np.full(channels, 1.0 / channels)]
+    # Stars and bars: the bar positions delimit each channel's units.
+    bars = itertools.combinations(range(units + channels - 1), channels - 1)
+    while True:
+        batch = list(itertools.islice(bars, size - len(first)))
+        if not batch and not first:
+            return
+        edges = np.empty((len(batch), channels + 1), dtype=np.int64)
+        edges[:, 0] = -1
+        edges[:, -1] = units + channels - 1
+        edges[:, 1:-1] = np.array(batch, dtype=np.int64).reshape(len(batch), channels - 1)
+        rows = (np.diff(edges, axis=1) - 1) / units
+        yield np.vstack(first + [rows]) if first else rows
+        first = []
+
+
+def plan_media(
+    budget: float,
+    channels: Union[Mapping[str, Mapping[str, Any]], Sequence[ChannelSpec], None] = None,
+    scenarios: int = config.MEDIA_SIM_SCENARIOS,
+    step: float = config.MEDIA_SIM_STEP,
+    confidence: float = config.MEDIA_SIM_CONFIDENCE,
+    time_budget: Optional[float] = config.MEDIA_SIM_TIME_BUDGET,
+    seed: Optional[int] = None,
+) -> MediaPlan:
+    """Find the split of ``budget`` with the most expected leads.
+
+    Args:
+        budget: total USD to spend
+        channels: channel assumptions, see `channels_from`
+        scenarios: Monte Carlo scenarios per candidate
+        step: granularity of the candidate splits, as a share of the budget
+        confidence: coverage of the reported intervals
+        time_budget: seconds the search may take; None for no limit. The
+            even split is always evaluated.
+        seed: seed of the scenario draws, for reproducible plans
+
+    Returns:
+        The best `MediaPlan` found.
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    chans = channels_from(channels)
+    if not chans:
+        raise ValueError("at least one channel is required")
+    cpm, rate, audience = _draw(chans, scenarios, np.random.default_rng(seed))
+    total = _split_count(len(chans), step)
+    chunk = max(_CHUNK_CELLS // (scenarios * len(chans)), 1)
+
+    best_mean = -1.0
+    best_split = None
+    evaluated = 0
+    for candidates in _split_chunks(len(chans), step, chunk):
+        _, leads = _simulate(budget * candidates, cpm, rate, audience)
+        means = leads.mean(axis=1)
+        row = int(means.argmax())
+        if means[row] > best_mean:
+            best_mean, best_split = float(means[row]), candidates[row]
+        evaluated += len(candidates)
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+    spend = budget * best_split
+    reach, leads = _simulate(spend[None, :], cpm, rate, audience)
+    reach, leads = reach[0], leads[0]
+    cpl = np.where(leads > 0, budget / np.maximum(leads, 1e-12), np.inf)
+    mean_leads = float(leads.mean())
+    return MediaPlan(
+        budget=float(budget),
+        allocation={channel.name: float(amount) for channel, amount in zip(chans, spend)},
+        expected_reach=float(reach.mean()),
+        reach_ci=_interval(reach, confidence),
+        expected_leads=mean_leads,
+        leads_ci=_interval(leads, confidence),
+        expected_cpl=float(budget / mean_leads) if mean_leads > 0 else float("inf"),
+        cpl_ci=_interval(cpl, confidence),
+        scenarios=scenarios,
+        candidates=evaluated,
+        complete=evaluated == total,
+    )
+
+
+def plan_portfolio(
+    budgets: Mapping[str, float],
+    channels: Union[Mapping[str, Mapping[str, Any]], Sequence[ChannelSpec], None] = None,
+    workers: Optional[int] = None,
+    **options: Any,
+) -> Dict[str, MediaPlan]:
+    """Plan the media of many clients.
+
+    Each client gets its own ``time_budget``. With
+    ``config.MEDIA_SIM_PROCESS_THRESHOLD`` clients or more (and ``workers``
+    other than 1) the plans run in a process pool, since the simulation
+    holds the GIL between NumPy calls.
+
+    Args:
+        budgets: client name -> budget (USD)
+        channels: channel assumptions shared by every client
+        workers: worker processes; defaults to the CPU count
+        **options: passed to `plan_media`
+
+    Returns:
+        Client name -> `MediaPlan`, in the order of ``budgets``.
+    """
+    chans = channels_from(channels)
+    names = list(budgets)
+    if workers == 1 or len(names) < config.MEDIA_SIM_PROCESS_THRESHOLD:
+        return {name: plan_media(budgets[name], chans, **options) for name in names}
+    from concurrent.futures import ProcessPoolExecutor  # pulls in multiprocessing
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = pool.map(_plan_job, ((budgets[name], chans, options) for name in names), chunksize=_chunksize(len(names), pool))
+        return dict(zip(names, jobs))
+
+
+def _plan_job(job: Tuple[float, List[Channel], Dict[str, Any]]) -> MediaPlan:
+    """Module-level so it can be pickled for process pools."""
+    budget, chans, options = job
+    return plan_media(budget, chans, **options)
+
+
+def _chunksize(jobs: int, pool: Any) -> int:
+    return max(jobs // (4 * getattr(pool, "_max_workers", 1)), 1)
+
+
+def _draw(chans: Sequence[Channel], scenarios: int, rng: "np.random.Generator") -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Scenario draws: CPM and response rate (scenarios x channels), audiences."""
+    noise = np.array([channel.noise for channel in chans])
+    # Lognormal multipliers with mean 1 and the given relative spread.
+    sigma = np.sqrt(np.log1p(noise**2))
+    shape = (scenarios, len(chans))
+    cpm_factor = np.exp(rng.standard_normal(shape) * sigma - sigma**2 / 2)
+    rate_factor = np.exp(rng.standard_normal(shape) * sigma - sigma**2 / 2)
+    cpm = np.array([channel.cpm for channel in chans]) * cpm_factor
+    rate = np.array([channel.ctr * channel.cvr for channel in chans]) * rate_factor
+    audience = np.array([float(channel.audience) for channel in chans])
+    return cpm, rate, audience
+
+
+def _simulate(
+    spend: "np.ndarray", cpm: "np.ndarray", rate: "np.ndarray", audience: "np.ndarray"
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Reach and leads (candidates x scenarios) of each spend row (candidates x channels)."""
+    impressions = 1000.0 * spend[:, None, :] / cpm[None, :, :]
+    reach = -audience * np.expm1(-impressions / audience)
+    return reach.sum(axis=2), (reach * rate).sum(axis=2)
+
+
+def _interval(samples: "np.ndarray", confidence: float) -> Tuple[float, float]:
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(samples, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+__all__ = [
+    "Channel",
+    "MediaPlan",
+    "channels_from",
+    "splits",
+    "plan_media",
+    "plan_portfolio",
+]
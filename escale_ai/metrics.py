@@ -0,0 +1,493 @@
+"""
+Counters, histograms and trace spans for agents and tool calls.
+
+Instrumentation is off by default and costs a single flag check per
+instrumented call until `enable` is called. Once enabled:
+
+* every pipeline stage is timed by a `escale_ai.pipeline.MetricsHook`
+  (``escale_stage_duration_seconds{team, stage}`` and
+  ``escale_stage_errors_total``);
+* every call to a tool service method (``send_email``, ``bulk_upsert``,
+  ``schedule_meeting``, ...) is timed as
+  ``escale_tool_call_duration_seconds{service, operation}`` with
+  ``escale_tool_errors_total`` for failures;
+* each of those calls is a trace span. Spans nest through a context
+  variable, so a tool call made by an agent points at its stage and the
+  stage at its pipeline run; with ``spans_path`` they are appended to a
+  JSONL file.
+
+`render_prometheus` returns everything in the Prometheus text exposition
+format, which ``web_chat`` serves on ``GET /metrics``.
+
+Usage:
+    from escale_ai import metrics
+
+    metrics.enable(spans_path="data/spans.jsonl")
+    AgentFactory.run_base_pipeline()
+    print(metrics.render_prometheus())
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+#: Default histogram buckets, in seconds.
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = False
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, labels: Tuple[str, ...] = ()) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def total(self, labels: Tuple[str, ...] = ()) -> float:
+        series = self._series.get(labels)
+        return series[1][0] if series else 0.0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._series.items())
+        lines: List[str] = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, documentation, labels)
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, documentation, labels, buckets)
+
+    def _get(self, cls: type, name: str, *args: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = "escale_stage_duration_seconds"
+STAGE_ERRORS = "escale_stage_errors_total"
+TOOL_SECONDS = "escale_tool_call_duration_seconds"
+TOOL_ERRORS = "escale_tool_errors_total"
+
+
+def stage_metrics() -> Tuple[Histogram, Counter]:
+    return (
+        REGISTRY.histogram(STAGE_SECONDS, "Time spent in each pipeline stage.", ("team", "stage")),
+        REGISTRY.counter(STAGE_ERRORS, "Pipeline stages that raised.", ("team", "stage")),
+    )
+
+
+def tool_metrics() -> Tuple[Histogram, Counter]:
+    return (
+        REGISTRY.histogram(TOOL_SECONDS, "Time spent in tool service calls.", ("service", "operation")),
+        REGISTRY.counter(TOOL_ERRORS, "Tool service calls that raised.", ("service", "operation")),
+    )
+
+
+class Span:
+    """A timed operation in a trace.
+
+    Attributes:
+        name: What ran, e.g. ``"BaseTeam/prospector"``.
+        kind: ``"pipeline"``, ``"stage"``, ``"tool"`` or any other label.
+        trace_id: Shared by every span of one trace.
+        span_id: Identifier of this span.
+        parent_id: ``span_id`` of the enclosing span, if any.
+        start: Wall-clock start time (epoch seconds).
+        duration: Seconds, set when the span finishes.
+        attributes: Extra key/values.
+        error: ``"ExceptionType: message"`` if the operation raised.
+    """
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start", "duration", "attributes", "error", "_t0", "_token")
+
+    def __init__(self, name: str, kind: str, attributes: Dict[str, Any]) -> None:
+        parent = _current_span.get()
+        self.name = name
+        self.kind = kind
+        self.span_id = os.urandom(8).hex()
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.duration = 0.0
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self._token = _current_span.set(self)
+
+    def finish(self, error: Optional[BaseException] = None) -> float:
+        """Close the span, export it and return its duration."""
+        self.duration = time.perf_counter() - self._t0
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Finished from another context (e.g. a hook on another task).
+            pass
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(self)
+        return self.duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("escale_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class _SpanContext:
+    __slots__ = ("name", "kind", "attributes", "span")
+
+    def __init__(self, name: str, kind: str, attributes: Dict[str, Any]) -> None:
+        self.name, self.kind, self.attributes = name, kind, attributes
+        self.span: Optional[Span] = None
+
+    def __enter__(self) -> Optional[Span]:
+        if _enabled:
+            self.span = Span(self.name, self.kind, self.attributes)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.span is not None:
+            self.span.finish(exc)
+
+
+def span(name: str, kind: str = "internal", **attributes: Any) -> _SpanContext:
+    """``with span("name"):`` records a span when instrumentation is enabled."""
+    return _SpanContext(name, kind, attributes)
+
+
+class JsonlSpanExporter:
+    """Append finished spans to a JSONL file, one object per line.
+
+    Spans are buffered and written in batches of ``flush_every`` lines;
+    `close` (called by `disable`) writes the rest.
+    """
+
+    def __init__(self, path: str, flush_every: int = 256) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), separators=(",", ":"), default=str)
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.flush_every:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer and not self._file.closed:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._file.flush()
+        self._buffer = []
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._file.close()
+
+
+_exporter: Optional[JsonlSpanExporter] = None
+_hook: Any = None
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(spans_path: Optional[str] = None) -> None:
+    """Start recording metrics for every team and tool call.
+
+    Args:
+        spans_path: optional JSONL file receiving every finished span
+    """
+    global _enabled, _exporter, _hook
+    from .pipeline import MetricsHook, register_hook
+
+    if _exporter is not None:
+        _exporter.close()
+    _exporter = JsonlSpanExporter(spans_path) if spans_path else None
+    if _hook is None:
+        _hook = MetricsHook()
+        register_hook(_hook)
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop recording; metrics collected so far are kept."""
+    global _enabled, _exporter, _hook
+    _enabled = False
+    if _hook is not None:
+        from .pipeline import unregister_hook
+
+        unregister_hook(_hook)
+        _hook = None
+    if _exporter is not None:
+        _exporter.close()
+        _exporter = None
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
+
+
+def instrument(cls: type, operations: Iterable[str]) -> None:
+    """Time the given methods defined on ``cls`` as tool calls.
+
+    Used through `InstrumentedTool`, so every provider implementation is
+    covered. Abstract and already wrapped methods are left alone.
+    """
+    for operation in operations:
+        fn = cls.__dict__.get(operation)
+        if fn is None or getattr(fn, "__isabstractmethod__", False) or getattr(fn, "_instrumented", False):
+            continue
+        setattr(cls, operation, _wrap_tool(fn, operation))
+
+
+def _wrap_tool(fn: Callable[..., Any], operation: str) -> Callable[..., Any]:
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(self, *args, **kwargs):
+            if not _enabled:
+                return await fn(self, *args, **kwargs)
+            call = _ToolCall(type(self).__name__, operation)
+            try:
+                result = await fn(self, *args, **kwargs)
+            except BaseException as exc:
+                call.finish(exc)
+                raise
+            call.finish(None)
+            return result
+
+        async_wrapper._instrumented = True  # type: ignore[attr-defined]
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if not _enabled:
+            return fn(self, *args, **kwargs)
+        call = _ToolCall(type(self).__name__, operation)
+        try:
+            result = fn(self, *args, **kwargs)
+        except BaseException as exc:
+            call.finish(exc)
+            raise
+        call.finish(None)
+        return result
+
+    wrapper._instrumented = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+class InstrumentedTool:
+    """Mixin of the tool base classes: times the methods named in ``instrumented``.
+
+    The methods are wrapped on the base class and again on every subclass
+    that overrides them.
+    """
+
+    instrumented: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        instrument(cls, cls.instrumented)
+
+
+class _ToolCall:
+    __slots__ = ("labels", "span")
+
+    def __init__(self, service: str, operation: str) -> None:
+        self.labels = (service, operation)
+        self.span = Span(f"{service}.{operation}", "tool", {})
+
+    def finish(self, error: Optional[BaseException]) -> None:
+        elapsed = self.span.finish(error)
+        seconds, errors = tool_metrics()
+        seconds.observe(self.labels, elapsed)
+        if error is not None:
+            errors.inc(self.labels)
+
+
+class TraceRecord(NamedTuple):
+    """A span read back from a JSONL trace file."""
+
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    duration_ms: float
+    error: Optional[str]
+
+
+def read_spans(path: str) -> List[TraceRecord]:
+    """Load the spans written by `JsonlSpanExporter`."""
+    records: List[TraceRecord] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                records.append(TraceRecord(*(data[field] for field in TraceRecord._fields)))
+    return records
+
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "Registry",
+    "REGISTRY",
+    "Span",
+    "span",
+    "current_span",
+    "JsonlSpanExporter",
+    "TraceRecord",
+    "read_spans",
+    "enable",
+    "disable",
+    "enabled",
+    "instrument",
+    "InstrumentedTool",
+    "render_prometheus",
+]
@@ -0,0 +1,803 @@
+"""
+Declarative stage graph and executor shared by the agent teams.
+
+Every agent declares the context keys it ``reads`` and ``writes``. A team
+lists its agents as `Stage` objects in their logical order; `StageGraph`
+derives the dependencies between them from those declarations, and the
+asyncio executor starts each stage as soon as the stages it depends on are
+done. Independent stages therefore run concurrently and the end-to-end
+latency of a run is bounded by the critical path rather than by the sum of
+all stages.
+
+Agents may expose an ``async def arun(context)`` coroutine for native async
+I/O; plain ``run(context)`` methods are executed on a shared thread pool.
+Each stage receives a shallow snapshot of the context and only the keys it
+declares in ``writes`` are merged back, so concurrent stages never see each
+other's partial results.
+
+Stage timings can be observed by registering a `PipelineHook` (for example
+`StageTimer`), either for every team or for a single team. To react to each
+stage as it completes, iterate over `PipelineTeam.stream_pipeline_async`,
+which yields the keys every stage wrote.
+
+Every run checkpoints the context after each stage together with a
+fingerprint of what each stage read. `PipelineTeam.resume_from` and
+`PipelineTeam.rerun_dirty` then replay only the stages downstream of a
+change, e.g. after a compliance check rejected some output.
+
+Teams that set ``stage_cache`` (an `escale_ai.cache.StageCache`) and
+implement `PipelineTeam.cache_key` reuse the stored output of any stage
+whose inputs did not change instead of running its agent. Teams that set
+``agent_pool`` share their stateless agents with every other team, and
+teams that set ``scheduler`` (an `escale_ai.scheduler.FairScheduler`) wait
+for a fair-share slot before running each agent. The in-order fallback
+used inside a running event loop does not wait: blocking that loop could
+keep the slots it is waiting for from being released.
+
+Usage:
+    class MyTeam(PipelineTeam):
+        graph = StageGraph([
+            Stage.of("first", FirstAgent),
+            Stage.of("second", SecondAgent),
+        ])
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from . import metrics
+from .cache import fingerprint
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+    from .agent_pool import AgentPool
+    from .cache import StageCache
+    from .scheduler import FairScheduler, Ticket
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _stage_executor() -> ThreadPoolExecutor:
+    """Return the thread pool used to run synchronous agents.
+
+    The pool is shared across runs so short pipelines do not pay for
+    spawning and joining threads on every call.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(thread_name_prefix="escale-stage")
+    return _executor
+
+
+def _reset_executor() -> None:
+    # A forked child inherits the pool object but not its threads.
+    global _executor
+    _executor = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A single pipeline step.
+
+    Attributes:
+        name: Name of the stage; also the team attribute holding the agent.
+        reads: Context keys the agent consumes.
+        writes: Context keys the agent produces.
+    """
+
+    name: str
+    reads: Tuple[str, ...] = ()
+    writes: Tuple[str, ...] = ()
+
+    @classmethod
+    def of(cls, name: str, agent_cls: type) -> "Stage":
+        """Build a stage from the ``reads``/``writes`` declared by an agent class."""
+        return cls(name, tuple(getattr(agent_cls, "reads", ())), tuple(getattr(agent_cls, "writes", ())))
+
+
+class StageGraph:
+    """Dependency graph derived from the keys each stage reads and writes.
+
+    A stage depends on every earlier stage that writes a key it reads
+    (read-after-write), writes a key it also writes (write-after-write) or
+    reads a key it overwrites (write-after-read). Declaration order is
+    therefore always a valid topological order.
+    """
+
+    def __init__(self, stages: Iterable[Stage]) -> None:
+        self.stages: Tuple[Stage, ...] = tuple(stages)
+        self.by_name: Dict[str, Stage] = {}
+        dependencies: Dict[str, FrozenSet[str]] = {}
+        for position, stage in enumerate(self.stages):
+            if stage.name in self.by_name:
+                raise ValueError(f"duplicate stage name: {stage.name}")
+            reads, writes = set(stage.reads), set(stage.writes)
+            dependencies[stage.name] = frozenset(
+                earlier.name
+                for earlier in self.stages[:position]
+                if reads & set(earlier.writes)
+                or writes & set(earlier.writes)
+                or writes & set(earlier.reads)
+            )
+            self.by_name[stage.name] = stage
+        self.dependencies = dependencies
+
+    def __iter__(self):
+        return iter(self.stages)
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    def downstream(self, names: Iterable[str]) -> FrozenSet[str]:
+        """Return ``names`` plus every stage that transitively depends on them."""
+        selected = set(names)
+        unknown = selected - set(self.by_name)
+        if unknown:
+            raise KeyError(f"unknown stage(s): {', '.join(sorted(unknown))}")
+        for stage in self.stages:
+            if self.dependencies[stage.name] & selected:
+                selected.add(stage.name)
+        return frozenset(selected)
+
+    def levels(self) -> Tuple[Tuple[str, ...], ...]:
+        """Group stage names into waves that can run concurrently."""
+        depth: Dict[str, int] = {}
+        for stage in self.stages:
+            deps = self.dependencies[stage.name]
+            depth[stage.name] = 1 + max((depth[d] for d in deps), default=-1)
+        waves: Dict[int, list] = {}
+        for name, level in depth.items():
+            waves.setdefault(level, []).append(name)
+        return tuple(tuple(waves[level]) for level in sorted(waves))
+
+
+class LazyAgent:
+    """Team attribute that builds its agent the first time it is used.
+
+    Teams declare their agents as class attributes; each one is constructed
+    from the team on first access and then stored on the instance, so
+    creating a team is cheap and stages that never run (or are served from
+    the stage cache) never build their agent. Assigning the attribute
+    replaces the agent as usual.
+
+    Agents declared with a ``key`` are shared: when the team has an
+    ``agent_pool`` (an `escale_ai.agent_pool.AgentPool`) the agent is taken
+    from it, so every team returning the same key reuses one instance.
+    Such agents must keep no per-run state; everything a run produces goes
+    into its context.
+
+    Args:
+        factory: called with the team, returns the agent
+        key: called with the team, returns what the agent is built from
+            (e.g. the client name or the services it uses); None means the
+            agent is never shared
+    """
+
+    def __init__(self, factory: Callable[[Any], Any], key: Optional[Callable[[Any], Any]] = None) -> None:
+        self.factory = factory
+        self.key = key
+        self.name = ""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, team: Any, owner: Optional[type] = None) -> Any:
+        if team is None:
+            return self
+        pool = team.agent_pool if self.key is not None else None
+        agent = self.factory(team) if pool is None else pool.get(team, self)
+        team.__dict__[self.name] = agent
+        return agent
+
+
+def shared(team: Any) -> Tuple[()]:
+    """`LazyAgent` key of agents that do not depend on the team at all."""
+    return ()
+
+
+class LazyImport:
+    """Class attribute imported from ``module`` on first access.
+
+    Used for ``state_model`` so defining a team does not import pydantic;
+    the model is loaded when the first run validates its state.
+    """
+
+    def __init__(self, module: str, name: str) -> None:
+        self.module = module
+        self.name = name
+        self.attribute = ""
+        self.owner: Optional[type] = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.owner, self.attribute = owner, name
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        value = getattr(importlib.import_module(self.module), self.name)
+        if self.owner is not None:
+            setattr(self.owner, self.attribute, value)
+        return value
+
+
+def _merge(context: MutableMapping[str, Any], stage: Stage, result: Mapping[str, Any]) -> None:
+    for key in stage.writes:
+        if key in result:
+            context[key] = result[key]
+
+
+async def _call_agent(agent: Any, context: MutableMapping[str, Any]) -> Mapping[str, Any]:
+    arun = getattr(agent, "arun", None)
+    if arun is not None:
+        return await arun(context)
+    loop = asyncio.get_running_loop()
+    # Run in a copy of the current context so spans opened by the agent's
+    # tool calls nest under the stage span.
+    call = functools.partial(contextvars.copy_context().run, agent.run, context)
+    return await loop.run_in_executor(_stage_executor(), call)
+
+
+class PipelineHook:
+    """Per-stage callbacks invoked by `PipelineTeam` runs.
+
+    Subclass it and override either method. Hooks run on the event loop
+    thread (or the caller's thread for sequential runs), so they should be
+    cheap. Register them for every team with `register_hook` or for a single
+    team with `PipelineTeam.add_hook`.
+    """
+
+    def before_stage(self, team: "PipelineTeam", stage: Stage, context: Mapping[str, Any]) -> None:
+        """Called right before a stage's agent runs, with its input snapshot."""
+
+    def after_stage(
+        self,
+        team: "PipelineTeam",
+        stage: Stage,
+        result: Optional[Mapping[str, Any]],
+        elapsed: float,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Called when a stage finishes.
+
+        Args:
+            team: the team running the pipeline
+            stage: the stage that ran
+            result: the agent's output, or None if it raised
+            elapsed: seconds spent in the agent
+            error: the exception raised by the agent, if any
+        """
+
+
+class StageTimer(PipelineHook):
+    """Hook that records the duration of every stage, keyed by team class and stage."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def after_stage(self, team, stage, result, elapsed, error=None) -> None:
+        with self._lock:
+            self.samples.setdefault((type(team).__name__, stage.name), []).append(elapsed)
+
+
+class MetricsHook(PipelineHook):
+    """Hook feeding `escale_ai.metrics`: a stage span plus duration and error metrics.
+
+    Registered for every team by `escale_ai.metrics.enable`.
+    """
+
+    def before_stage(self, team, stage, context) -> None:
+        metrics.Span(f"{type(team).__name__}/{stage.name}", "stage", {"team": type(team).__name__, "stage": stage.name})
+
+    def after_stage(self, team, stage, result, elapsed, error=None) -> None:
+        span = metrics.current_span()
+        if span is not None and span.kind == "stage":
+            span.finish(error)
+        seconds, errors = metrics.stage_metrics()
+        labels = (type(team).__name__, stage.name)
+        seconds.observe(labels, elapsed)
+        if error is not None:
+            errors.inc(labels)
+
+
+class StageDelta(NamedTuple):
+    """Output of one completed stage, as yielded by `PipelineTeam.stream_pipeline_async`.
+
+    Attributes:
+        stage: Name of the stage.
+        delta: The declared ``writes`` keys the stage produced.
+        elapsed: Seconds spent in the agent.
+    """
+
+    stage: str
+    delta: Dict[str, Any]
+    elapsed: float
+
+
+class _DeltaHook(PipelineHook):
+    def __init__(self, queue: "asyncio.Queue[Optional[StageDelta]]") -> None:
+        self.queue = queue
+
+    def after_stage(self, team, stage, result, elapsed, error=None) -> None:
+        if error is None:
+            delta = {key: result[key] for key in stage.writes if key in result}
+            self.queue.put_nowait(StageDelta(stage.name, delta, elapsed))
+
+
+_global_hooks: Tuple[PipelineHook, ...] = ()
+
+
+def register_hook(hook: PipelineHook) -> None:
+    """Call ``hook`` for the stages of every team."""
+    global _global_hooks
+    _global_hooks = _global_hooks + (hook,)
+
+
+def unregister_hook(hook: PipelineHook) -> None:
+    """Stop calling a hook added with `register_hook`."""
+    global _global_hooks
+    _global_hooks = tuple(h for h in _global_hooks if h is not hook)
+
+
+class PipelineTeam:
+    """Base class for teams whose agents are executed through a `StageGraph`.
+
+    Subclasses set the ``graph`` class attribute and store each agent in an
+    attribute named after its stage, usually a `LazyAgent`. When
+    ``state_model`` is set, the context is validated against it once on
+    entry and once on exit, and travels between stages as the model's
+    slotted `SlotState` counterpart.
+
+    A team instance carries the state of the run in progress (checkpoint,
+    stage fingerprints), so concurrent runs each need their own team. The
+    agents, which only read their inputs from the context, can be shared
+    between teams through ``agent_pool``.
+    """
+
+    graph: StageGraph = StageGraph(())
+    state_model: Optional[Type[BaseModel]] = None
+    hooks: Tuple[PipelineHook, ...] = ()
+    stage_cache: Optional["StageCache"] = None
+    agent_pool: Optional["AgentPool"] = None
+    scheduler: Optional["FairScheduler"] = None
+    _checkpoint: Optional[MutableMapping[str, Any]] = None
+
+    def agent(self, name: str) -> Any:
+        """Return the agent that executes stage ``name``."""
+        return getattr(self, name)
+
+    def add_hook(self, hook: PipelineHook) -> None:
+        """Call ``hook`` for the stages run by this team only."""
+        self.hooks = self.hooks + (hook,)
+
+    def ticket(self) -> "Ticket":
+        """Return what the stages of this run ask ``scheduler`` for.
+
+        The default schedules every team of a class as one tenant with
+        routine priority; client teams override it with their own limits.
+        """
+        from .scheduler import Ticket
+
+        return Ticket(type(self).__name__)
+
+    def cache_key(self, stage: Stage, context: Mapping[str, Any]) -> Optional[str]:
+        """Return the `stage_cache` key of ``stage`` run on ``context``.
+
+        The key must capture everything the stage output depends on. The
+        default returns None, which disables caching; teams whose agents are
+        deterministic in their inputs override it (see `escale_ai.cache.stage_key`).
+        """
+        return None
+
+    def cacheable(self, stage: Stage, result: Mapping[str, Any]) -> bool:
+        """Return whether ``stage``'s ``result`` may be stored in `stage_cache`.
+
+        The default stores every result; teams override it for best-effort
+        outputs, e.g. a search cut short by a time budget.
+        """
+        return True
+
+    def run_pipeline(self, context: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """
+        Execute the team workflow.
+
+        This is a thin synchronous wrapper around `run_pipeline_async`. When
+        called from a thread that already runs an event loop (for example an
+        async web handler) the stages are executed in declaration order,
+        since blocking on a nested loop is not possible there.
+
+        Args:
+            context: Optional initial state. If None, an empty dict will be used.
+
+        Returns:
+            A context dictionary containing the results from each stage.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.run_pipeline_async(context))
+        work = self._enter(context)
+        self._execute_sequential(work)
+        return self._exit(context, work)
+
+    async def run_pipeline_async(self, context: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """
+        Execute the team workflow, running independent stages concurrently.
+
+        Args:
+            context: Optional initial state. If None, an empty dict will be used.
+
+        Returns:
+            A context dictionary containing the results from each stage.
+        """
+        work = self._enter(context)
+        await self._execute_async(work)
+        return self._exit(context, work)
+
+    async def stream_pipeline_async(self, context: Dict[str, Any] | None = None) -> AsyncIterator[StageDelta]:
+        """
+        Execute the team workflow, yielding each stage's output as soon as it completes.
+
+        Stages run concurrently exactly as in `run_pipeline_async`; only the
+        keys a stage declares in ``writes`` are yielded. When iteration
+        finishes, ``context`` (if given) has been filled in like
+        `run_pipeline` does. Closing the iterator early cancels the run.
+
+        Args:
+            context: Optional initial state. If None, an empty dict will be used.
+
+        Yields:
+            StageDelta objects in completion order.
+
+        Raises:
+            Exception: whatever the first failing agent raised.
+        """
+        queue: "asyncio.Queue[Optional[StageDelta]]" = asyncio.Queue()
+        work = self._enter(context)
+
+        async def drive() -> None:
+            try:
+                await self._execute_async(work, (_DeltaHook(queue),))
+            finally:
+                queue.put_nowait(None)
+
+        task = asyncio.ensure_future(drive())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+            await task
+            self._exit(context, work)
+        finally:
+            if not task.done():
+                task.cancel()
+
+    def resume_run(
+        self,
+        context: Optional[Dict[str, Any]],
+        completed: Iterable[str] = (),
+        hooks: Iterable[PipelineHook] = (),
+    ) -> Dict[str, Any]:
+        """
+        Finish a run that was interrupted, e.g. one replayed from an event log.
+
+        Synchronous wrapper around `resume_run_async`, falling back to
+        declaration order inside a running event loop like `run_pipeline`.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.resume_run_async(context, completed, hooks))
+        work = self._enter(context)
+        self._execute_sequential(work, self._remaining(completed), tuple(hooks))
+        return self._exit(context, work)
+
+    async def resume_run_async(
+        self,
+        context: Optional[Dict[str, Any]],
+        completed: Iterable[str] = (),
+        hooks: Iterable[PipelineHook] = (),
+    ) -> Dict[str, Any]:
+        """
+        Run only the stages of the pipeline not in ``completed``.
+
+        Unlike `resume_from`, this needs no checkpoint on the team: a fresh
+        team finishes the run from ``context`` alone. With nothing completed
+        it is a plain run.
+
+        Args:
+            context: The run's initial context with the outputs of the
+                ``completed`` stages already merged in.
+            completed: Names of the stages whose output is in ``context``.
+            hooks: Extra hooks called for the stages of this run only.
+
+        Returns:
+            The full context after the run.
+        """
+        work = self._enter(context)
+        await self._execute_async(work, tuple(hooks), self._remaining(completed))
+        return self._exit(context, work)
+
+    def _remaining(self, completed: Iterable[str]) -> Optional[FrozenSet[str]]:
+        done = frozenset(completed)
+        if not done:
+            return None
+        return frozenset(stage.name for stage in self.graph) - done
+
+    def resume_from(self, stage: str, updates: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Rerun ``stage`` and every stage downstream of it on the last checkpoint.
+
+        Use it after replacing or reconfiguring an agent, for example to
+        regenerate the creatives rejected by a compliance check. Stages whose
+        inputs are changed by ``updates`` are rerun as well.
+
+        Args:
+            stage: Name of the first stage to replay.
+            updates: Optional context values to change before replaying.
+
+        Returns:
+            The full context after the replay.
+
+        Raises:
+            RuntimeError: if the team has not completed a run yet.
+        """
+        work = self._resume_state(updates)
+        return self._replay(work, self.graph.downstream({stage} | self._dirty(work)))
+
+    def rerun_dirty(self, updates: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Apply ``updates`` to the last checkpoint and rerun only what they affect.
+
+        A stage is dirty when a value it reads differs from what it read in
+        the previous run; it is rerun together with everything downstream.
+        Stages that produce an updated key are not rerun, so a manual fix
+        (e.g. corrected ad copy) is kept.
+
+        Args:
+            updates: Context values to change before replaying.
+
+        Returns:
+            The full context after the replay.
+
+        Raises:
+            RuntimeError: if the team has not completed a run yet.
+        """
+        work = self._resume_state(updates)
+        return self._replay(work, self.graph.downstream(self._dirty(work)))
+
+    def dirty_stages(self, updates: Optional[Mapping[str, Any]] = None) -> FrozenSet[str]:
+        """Return the stages `rerun_dirty` would replay for ``updates``."""
+        return self.graph.downstream(self._dirty(self._resume_state(updates)))
+
+    def _resume_state(self, updates: Optional[Mapping[str, Any]]) -> MutableMapping[str, Any]:
+        if self._checkpoint is None:
+            raise RuntimeError(f"{type(self).__name__} has no checkpoint; run the pipeline first")
+        work = self._checkpoint.copy()
+        if updates:
+            work.update(updates)
+        return work
+
+    def _dirty(self, context: Mapping[str, Any]) -> set:
+        recorded = self._stage_inputs
+        return {
+            stage.name
+            for stage in self.graph
+            if recorded.get(stage.name) != fingerprint([context.get(key) for key in stage.reads])
+        }
+
+    def _replay(self, work: MutableMapping[str, Any], only: FrozenSet[str]) -> Dict[str, Any]:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self._execute_async(work, only=only))
+        else:
+            self._execute_sequential(work, only=only)
+        return self._exit(None, work)
+
+    def run_state(self, state: BaseModel) -> BaseModel:
+        """Run the pipeline on a typed state and return the validated result."""
+        if self.state_model is None:
+            raise TypeError(f"{type(self).__name__} has no state model")
+        work = self._enter(state)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self._execute_async(work))
+        else:
+            self._execute_sequential(work)
+        from .state import exit_state
+
+        return exit_state(self.state_model, work)
+
+    def _enter(self, context: Optional[Mapping[str, Any]]) -> MutableMapping[str, Any]:
+        if self.state_model is None:
+            return context if context is not None else {}
+        from .state import enter_state
+
+        return enter_state(self.state_model, context)
+
+    def _exit(self, context: Optional[Dict[str, Any]], work: MutableMapping[str, Any]) -> Dict[str, Any]:
+        if self.state_model is None:
+            return work
+        from .state import exit_state
+
+        result = exit_state(self.state_model, work).model_dump()
+        if context is None:
+            return result
+        # Callers have always received their own dict back, filled in.
+        context.update(result)
+        return context
+
+    def _cached(self, stage: Stage, context: Mapping[str, Any]) -> Tuple[Optional[str], Optional[Mapping[str, Any]]]:
+        if self.stage_cache is None:
+            return None, None
+        key = self.cache_key(stage, context)
+        if key is None:
+            return None, None
+        return key, self.stage_cache.get(key)
+
+    def _store(self, key: Optional[str], stage: Stage, result: Mapping[str, Any]) -> None:
+        if key is not None and self.stage_cache is not None and self.cacheable(stage, result):
+            try:
+                self.stage_cache.put(key, {k: result[k] for k in stage.writes if k in result})
+            except TypeError:
+                # Not plain JSON: a hit would hand back a different value.
+                pass
+
+    async def _cache_io(self, call: Callable[..., Any], *args: Any) -> Any:
+        """Run a stage cache lookup or store, off the event loop if it touches disk."""
+        if self.stage_cache is None or self.stage_cache.path is None:
+            return call(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_stage_executor(), functools.partial(call, *args))
+
+    async def _run_stage_async(self, stage: Stage, context: MutableMapping[str, Any]) -> Mapping[str, Any]:
+        inputs = fingerprint([context.get(key) for key in stage.reads])
+        key, result = await self._cache_io(self._cached, stage, context)
+        if result is None:
+            if self.scheduler is None:
+                result = await _call_agent(self.agent(stage.name), context)
+            else:
+                async with self.scheduler.slot(self.ticket()):
+                    result = await _call_agent(self.agent(stage.name), context)
+            await self._cache_io(self._store, key, stage, result)
+        # Only completed stages count as clean, so a failed run can be resumed.
+        self._stage_inputs[stage.name] = inputs
+        return result
+
+    def _run_stage(self, stage: Stage, context: MutableMapping[str, Any]) -> Mapping[str, Any]:
+        inputs = fingerprint([context.get(key) for key in stage.reads])
+        key, result = self._cached(stage, context)
+        if result is None:
+            result = self.agent(stage.name).run(context)
+            self._store(key, stage, result)
+        self._stage_inputs[stage.name] = inputs
+        return result
+
+    def _start_checkpoint(self, context: MutableMapping[str, Any], only: Optional[FrozenSet[str]]) -> None:
+        # The working state itself is the checkpoint: stages merge into it as they finish.
+        if only is None or not hasattr(self, "_stage_inputs"):
+            # A partial run on a fresh team (e.g. a recovered one) starts clean.
+            self._stage_inputs: Dict[str, str] = {}
+        self._checkpoint = context
+
+    async def _execute_async(
+        self,
+        context: MutableMapping[str, Any],
+        extra_hooks: Tuple[PipelineHook, ...] = (),
+        only: Optional[FrozenSet[str]] = None,
+    ) -> None:
+        tasks: Dict[str, asyncio.Future] = {}
+        hooks = _global_hooks + self.hooks + extra_hooks
+        self._start_checkpoint(context, only)
+
+        async def run_stage(stage: Stage) -> None:
+            if only is not None and stage.name not in only:
+                return
+            deps = self.graph.dependencies[stage.name]
+            if deps:
+                await asyncio.gather(*(tasks[name] for name in deps))
+            snapshot = context.copy()
+            if not hooks:
+                _merge(context, stage, await self._run_stage_async(stage, snapshot))
+                return
+            for hook in hooks:
+                hook.before_stage(self, stage, snapshot)
+            start = time.perf_counter()
+            try:
+                result = await self._run_stage_async(stage, snapshot)
+            except BaseException as exc:
+                for hook in hooks:
+                    hook.after_stage(self, stage, None, time.perf_counter() - start, exc)
+                raise
+            elapsed = time.perf_counter() - start
+            for hook in hooks:
+                hook.after_stage(self, stage, result, elapsed)
+            _merge(context, stage, result)
+
+        with metrics.span(type(self).__name__, "pipeline"):
+            for stage in self.graph:
+                tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+            try:
+                await asyncio.gather(*tasks.values())
+            except BaseException:
+                for task in tasks.values():
+                    task.cancel()
+                raise
+
+    def _execute_sequential(
+        self,
+        context: MutableMapping[str, Any],
+        only: Optional[FrozenSet[str]] = None,
+        extra_hooks: Tuple[PipelineHook, ...] = (),
+    ) -> None:
+        hooks = _global_hooks + self.hooks + extra_hooks
+        self._start_checkpoint(context, only)
+        with metrics.span(type(self).__name__, "pipeline"):
+            for stage in self.graph:
+                if only is not None and stage.name not in only:
+                    continue
+                snapshot = context.copy()
+                if not hooks:
+                    _merge(context, stage, self._run_stage(stage, snapshot))
+                    continue
+                for hook in hooks:
+                    hook.before_stage(self, stage, snapshot)
+                start = time.perf_counter()
+                try:
+                    result = self._run_stage(stage, snapshot)
+                except BaseException as exc:
+                    for hook in hooks:
+                        hook.after_stage(self, stage, None, time.perf_counter() - start, exc)
+                    raise
+                elapsed = time.perf_counter() - start
+                for hook in hooks:
+                    hook.after_stage(self, stage, result, elapsed)
+                _merge(context, stage, result)
+
+
+__all__ = [
+    "Stage",
+    "StageGraph",
+    "PipelineTeam",
+    "PipelineHook",
+    "StageTimer",
+    "MetricsHook",
+    "StageDelta",
+    "LazyAgent",
+    "LazyImport",
+    "shared",
+    "register_hook",
+    "unregister_hook",
+]
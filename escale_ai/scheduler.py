@@ -0,0 +1,336 @@
+"""
+Fair-share scheduling of stage executions across clients.
+
+When many client pipelines run at once, a `FairScheduler` decides which
+stage runs next so one large clinic cannot starve the others:
+
+* at most ``capacity`` stages run at the same time overall, and at most
+  ``max_concurrent`` per client (the ``max_concurrent_stages`` limit of
+  its workspace);
+* clients share that capacity in proportion to their ``weight`` (the
+  ``scheduler_weight`` limit, i.e. the paying tier) through weighted fair
+  queuing: every client has a virtual clock advanced by the time its stages
+  actually took divided by its weight, and the waiting client with the
+  earliest clock goes next, so heavy creative or media stages are charged
+  for what they use;
+* among waiting stages a higher ``priority`` goes first
+  (`PRIORITY_ONBOARDING` before `PRIORITY_ROUTINE`);
+* a stage whose run has a ``deadline`` closer than ``deadline_slack``
+  seconds jumps ahead of everything else, earliest deadline first.
+
+Teams that set ``scheduler`` ask it for a slot before running each agent,
+with the `Ticket` returned by `PipelineTeam.ticket`. The scheduler is
+thread-safe and works across event loops, so runs fanned out over threads
+(`AgentFactory.run_client_pipelines`) share it too. `FairScheduler.stats`
+reports queue depths and wait-time percentiles per client; with
+`escale_ai.metrics` enabled waits are also recorded as
+``escale_scheduler_wait_seconds{tenant}``.
+
+Usage:
+    from escale_ai.scheduler import FairScheduler
+
+    AgentFactory.scheduler = FairScheduler(capacity=8)
+    AgentFactory.run_client_pipeline("Clinic A", within=2.0)
+    print(AgentFactory.scheduler.stats().tenants["Clinic A"])
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from . import config, metrics
+
+PRIORITY_ROUTINE = 0
+PRIORITY_ONBOARDING = 1
+
+
+class Ticket(NamedTuple):
+    """What a stage execution asks the scheduler for.
+
+    Attributes:
+        tenant: The client (or team) the stage runs for.
+        priority: Higher runs first among waiting stages.
+        deadline: ``time.monotonic()`` value by which the run should be done.
+        weight: The tenant's share of the capacity relative to the others.
+        max_concurrent: Stages of the tenant allowed to run at once; None
+            means only ``capacity`` applies.
+    """
+
+    tenant: str
+    priority: int = PRIORITY_ROUTINE
+    deadline: Optional[float] = None
+    weight: float = 1.0
+    max_concurrent: Optional[int] = None
+
+
+class TenantStats(NamedTuple):
+    """Scheduling counters of one tenant; wait times cover the recent grants."""
+
+    queued: int
+    running: int
+    completed: int
+    wait_p50_ms: float
+    wait_p95_ms: float
+    wait_max_ms: float
+    deadline_misses: int
+
+
+class SchedulerStats(NamedTuple):
+    """Snapshot of a `FairScheduler`."""
+
+    capacity: int
+    running: int
+    queued: int
+    tenants: Dict[str, TenantStats]
+
+
+class Slot:
+    """A granted stage execution; hand it back with `FairScheduler.release`."""
+
+    __slots__ = ("ticket", "seq", "enqueued", "started", "granted", "_wake")
+
+    def __init__(self, ticket: Ticket, seq: int, enqueued: float, wake: Optional[Callable[[], None]]) -> None:
+        self.ticket = ticket
+        self.seq = seq
+        self.enqueued = enqueued
+        self.started = 0.0
+        self.granted = False
+        self._wake = wake
+
+    @property
+    def waited(self) -> float:
+        """Seconds spent queued."""
+        return self.started - self.enqueued
+
+
+class _Tenant:
+    __slots__ = ("name", "weight", "max_concurrent", "vtime", "running", "waiting", "completed", "waits", "misses")
+
+    def __init__(self, name: str, samples: int) -> None:
+        self.name = name
+        self.weight = 1.0
+        self.max_concurrent: Optional[int] = None
+        self.vtime = 0.0
+        self.running = 0
+        self.waiting: List[Slot] = []
+        self.completed = 0
+        self.waits: Deque[float] = deque(maxlen=samples)
+        self.misses = 0
+
+    def has_room(self) -> bool:
+        return self.max_concurrent is None or self.running < self.max_concurrent
+
+
+class FairScheduler:
+    """Weighted fair queue of stage executions with priorities and deadlines.
+
+    Args:
+        capacity: stages allowed to run at the same time across all tenants
+        deadline_slack: seconds before its deadline at which a stage is
+            served ahead of everything else
+        wait_samples: recent wait times kept per tenant for `stats`
+        clock: monotonic time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        capacity: int = config.SCHEDULER_CAPACITY,
+        deadline_slack: float = config.SCHEDULER_DEADLINE_SLACK,
+        wait_samples: int = config.SCHEDULER_WAIT_SAMPLES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.deadline_slack = deadline_slack
+        self.wait_samples = wait_samples
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tenants: Dict[str, _Tenant] = {}
+        self._backlogged: Dict[str, _Tenant] = {}
+        self._running = 0
+        self._queued = 0
+        self._seq = 0
+        # Virtual time of the last grant; idle tenants rejoin at it, so time
+        # spent idle is not saved up as credit.
+        self._vtime = 0.0
+
+    async def acquire(self, ticket: Ticket) -> Slot:
+        """Wait for a slot for ``ticket``; cancelling the wait leaves the queue."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        slot = self._enqueue(ticket, lambda: loop.call_soon_threadsafe(_resolve, future))
+        if slot.granted:
+            return slot
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._abandon(slot)
+            raise
+        return slot
+
+    def acquire_blocking(self, ticket: Ticket) -> Slot:
+        """Block the calling thread until a slot for ``ticket`` is free."""
+        event = threading.Event()
+        slot = self._enqueue(ticket, event.set)
+        if not slot.granted:
+            event.wait()
+        return slot
+
+    def release(self, slot: Slot) -> None:
+        """Return a slot and charge its tenant for the time it was held."""
+        now = self._clock()
+        with self._lock:
+            tenant = self._tenants[slot.ticket.tenant]
+            tenant.running -= 1
+            self._running -= 1
+            tenant.completed += 1
+            tenant.vtime += (now - slot.started) / tenant.weight
+            if slot.ticket.deadline is not None and now > slot.ticket.deadline:
+                tenant.misses += 1
+            wake = self._dispatch(now)
+        for fn in wake:
+            fn()
+
+    @asynccontextmanager
+    async def slot(self, ticket: Ticket) -> AsyncIterator[Slot]:
+        """``async with scheduler.slot(ticket):`` runs the block in a slot."""
+        granted = await self.acquire(ticket)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+    @contextmanager
+    def blocking_slot(self, ticket: Ticket) -> Iterator[Slot]:
+        """Synchronous counterpart of `slot`."""
+        granted = self.acquire_blocking(ticket)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+    def stats(self) -> SchedulerStats:
+        with self._lock:
+            tenants = {
+                name: TenantStats(
+                    len(tenant.waiting),
+                    tenant.running,
+                    tenant.completed,
+                    *_wait_summary(sorted(tenant.waits)),
+                    tenant.misses,
+                )
+                for name, tenant in self._tenants.items()
+            }
+            return SchedulerStats(self.capacity, self._running, self._queued, tenants)
+
+    def _enqueue(self, ticket: Ticket, wake: Callable[[], None]) -> Slot:
+        now = self._clock()
+        with self._lock:
+            tenant = self._tenants.get(ticket.tenant)
+            if tenant is None:
+                tenant = self._tenants[ticket.tenant] = _Tenant(ticket.tenant, self.wait_samples)
+            tenant.weight = max(float(ticket.weight), 1e-9)
+            tenant.max_concurrent = ticket.max_concurrent
+            self._seq += 1
+            slot = Slot(ticket, self._seq, now, wake)
+            if not self._backlogged and self._running < self.capacity and tenant.has_room():
+                # Nobody is waiting: take the slot without queueing.
+                self._grant(tenant, slot, now)
+                return slot
+            if not tenant.waiting:
+                tenant.vtime = max(tenant.vtime, self._vtime)
+                self._backlogged[tenant.name] = tenant
+            tenant.waiting.append(slot)
+            self._queued += 1
+            wake_up = self._dispatch(now)
+        for fn in wake_up:
+            fn()
+        return slot
+
+    def _abandon(self, slot: Slot) -> None:
+        with self._lock:
+            tenant = self._tenants[slot.ticket.tenant]
+            if not slot.granted:
+                tenant.waiting.remove(slot)
+                self._queued -= 1
+                if not tenant.waiting:
+                    del self._backlogged[tenant.name]
+                return
+        # Granted while being cancelled: give the slot back unused.
+        slot.started = self._clock()
+        self.release(slot)
+
+    def _dispatch(self, now: float) -> List[Callable[[], None]]:
+        """Grant slots while capacity allows; return the waiters to wake."""
+        wake: List[Callable[[], None]] = []
+        while self._running < self.capacity and self._backlogged:
+            best: Optional[Tuple[Tuple, _Tenant, Slot]] = None
+            for tenant in self._backlogged.values():
+                if not tenant.has_room():
+                    continue
+                for slot in tenant.waiting:
+                    key = self._order(tenant, slot, now)
+                    if best is None or key < best[0]:
+                        best = (key, tenant, slot)
+            if best is None:
+                break
+            _, tenant, slot = best
+            tenant.waiting.remove(slot)
+            self._queued -= 1
+            if not tenant.waiting:
+                del self._backlogged[tenant.name]
+            self._grant(tenant, slot, now)
+            if slot._wake is not None:
+                wake.append(slot._wake)
+        return wake
+
+    def _order(self, tenant: _Tenant, slot: Slot, now: float) -> Tuple:
+        deadline = slot.ticket.deadline
+        if deadline is not None and deadline - now <= self.deadline_slack:
+            return (0, deadline, slot.seq)
+        return (1, -slot.ticket.priority, tenant.vtime, slot.seq)
+
+    def _grant(self, tenant: _Tenant, slot: Slot, now: float) -> None:
+        slot.granted = True
+        slot.started = now
+        tenant.running += 1
+        self._running += 1
+        self._vtime = max(self._vtime, tenant.vtime)
+        tenant.waits.append(now - slot.enqueued)
+        if metrics.enabled():
+            metrics.REGISTRY.histogram(
+                "escale_scheduler_wait_seconds", "Time stages waited for a scheduler slot.", ("tenant",)
+            ).observe((tenant.name,), now - slot.enqueued)
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _wait_summary(ordered: List[float]) -> Tuple[float, float, float]:
+    if not ordered:
+        return 0.0, 0.0, 0.0
+    last = len(ordered) - 1
+    return (
+        ordered[min(int(0.50 * len(ordered)), last)] * 1000,
+        ordered[min(int(0.95 * len(ordered)), last)] * 1000,
+        ordered[last] * 1000,
+    )
+
+
+__all__ = [
+    "FairScheduler",
+    "Ticket",
+    "Slot",
+    "TenantStats",
+    "SchedulerStats",
+    "PRIORITY_ROUTINE",
+    "PRIORITY_ONBOARDING",
+]
@@ -0,0 +1,253 @@
+"""
+Vectorized lead qualification.
+
+`LeadTable` loads leads once into columnar NumPy arrays. Low-cardinality
+text columns (state, city, services) are factorized: each row stores a
+small integer code and the distinct values are kept once. Scoring a query
+then evaluates string predicates only on the distinct values and gathers
+the per-row result with a single array index, so every row costs a handful
+of vectorized arithmetic operations instead of a Python loop iteration.
+
+A lead is qualified when its state belongs to ``config.ALLOWED_COUNTRY``
+(and matches the optional ``state``/``city`` filters). Its score is::
+
+    weights.services  * share of requested service keywords it offers
+  + weights.website   * has a website
+  + weights.instagram * has an Instagram account
+
+`LeadTable.top_k` selects the best leads with ``numpy.argpartition``.
+
+Usage:
+    from escale_ai.scoring import LeadTable
+
+    table = LeadTable.from_csv("data/leads.csv")
+    for lead in table.top_k(50, services="botox, fillers", state="FL"):
+        print(lead.clinic_name, lead.score)
+"""
+
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from . import config
+from .tools.lead_source import CSVLeadSource
+
+US_STATES: FrozenSet[str] = frozenset(
+    "AL AK AZ AR CA CO CT DE DC FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN MS MO MT NE NV NH NJ NM NY "
+    "NC ND OH OK OR PA RI SC SD TN TX UT VT VA WA WV WI WY".split()
+)
+
+#: State/region codes accepted for each supported ``config.ALLOWED_COUNTRY``.
+COUNTRY_REGIONS: Dict[str, FrozenSet[str]] = {"United States": US_STATES}
+
+Keywords = Union[str, Sequence[str], None]
+
+
+class ScoringWeights(NamedTuple):
+    """Weight of each qualification signal."""
+
+    services: float = 3.0
+    website: float = 1.0
+    instagram: float = 1.0
+
+
+class ScoredLead(NamedTuple):
+    """A qualified lead returned by `LeadTable.top_k`."""
+
+    clinic_name: str
+    email: str
+    score: float
+    row: int
+
+
+def _keywords(value: Keywords) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace(";", ",").split(",")
+    return [k.strip().lower() for k in value if k and k.strip()]
+
+
+class _Factorizer:
+    """Map repeated strings to dense integer codes."""
+
+    def __init__(self, normalize=lambda value: value) -> None:
+        self.normalize = normalize
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(self.normalize(value))
+        return code
+
+
+class LeadTable:
+    """Immutable columnar table of leads ready for vectorized scoring.
+
+    Build it with `from_leads` or `from_csv`; rows without an email are
+    skipped.
+    """
+
+    COLUMNS = ("clinic_name", "email", "website", "city", "state", "instagram", "services")
+
+    def __init__(
+        self,
+        clinic_names: np.ndarray,
+        emails: np.ndarray,
+        has_website: np.ndarray,
+        has_instagram: np.ndarray,
+        state_codes: np.ndarray,
+        states: Sequence[str],
+        city_codes: np.ndarray,
+        cities: Sequence[str],
+        service_codes: np.ndarray,
+        services: Sequence[str],
+    ) -> None:
+        self.clinic_names = clinic_names
+        self.emails = emails
+        self.has_website = has_website
+        self.has_instagram = has_instagram
+        self.state_codes = state_codes
+        self.states = np.asarray(states, dtype=str)
+        self.city_codes = city_codes
+        self.cities = np.asarray(cities, dtype=str)
+        self.service_codes = service_codes
+        self.services = np.asarray(services, dtype=str)
+
+    @classmethod
+    def from_leads(cls, leads: Iterable[Mapping[str, str]]) -> "LeadTable":
+        """Build the table from dicts with the ``data/leads.csv`` columns."""
+        names: List[str] = []
+        emails: List[str] = []
+        website: List[bool] = []
+        instagram: List[bool] = []
+        states, cities = _Factorizer(str.upper), _Factorizer(str.lower)
+        services = _Factorizer(str.lower)
+        state_codes: List[int] = []
+        city_codes: List[int] = []
+        service_codes: List[int] = []
+        for lead in leads:
+            email = (lead.get("email") or "").strip()
+            if not email:
+                continue
+            names.append(lead.get("clinic_name") or email)
+            emails.append(email)
+            website.append(bool((lead.get("website") or "").strip()))
+            instagram.append(bool((lead.get("instagram") or "").strip()))
+            state_codes.append(states.code((lead.get("state") or "").strip()))
+            city_codes.append(cities.code((lead.get("city") or "").strip()))
+            service_codes.append(services.code(lead.get("services") or ""))
+        return cls(
+            np.array(names, dtype=object),
+            np.array(emails, dtype=object),
+            np.array(website, dtype=bool),
+            np.array(instagram, dtype=bool),
+            np.array(state_codes, dtype=np.int32),
+            states.values,
+            np.array(city_codes, dtype=np.int32),
+            cities.values,
+            np.array(service_codes, dtype=np.int32),
+            services.values,
+        )
+
+    @classmethod
+    def from_csv(cls, csv_path: str, batch_size: int = 50_000) -> "LeadTable":
+        """Stream a leads CSV into a table, reading only the scored columns."""
+        source = CSVLeadSource(csv_path)
+        return cls.from_leads(
+            lead
+            for batch in source.iter_leads(batch_size=batch_size, columns=cls.COLUMNS)
+            for lead in batch.leads
+        )
+
+    def __len__(self) -> int:
+        return len(self.emails)
+
+    def qualified(
+        self,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        country: str = config.ALLOWED_COUNTRY,
+    ) -> np.ndarray:
+        """Boolean mask of the rows inside ``country`` and the optional filters."""
+        regions = COUNTRY_REGIONS.get(country)
+        if regions is None:
+            raise ValueError(f"no region list for country {country!r}")
+        allowed = np.isin(self.states, sorted(regions))
+        if state:
+            allowed &= self.states == state.strip().upper()
+        mask = allowed[self.state_codes] if len(allowed) else np.zeros(len(self), dtype=bool)
+        if city:
+            mask &= (self.cities == city.strip().lower())[self.city_codes]
+        return mask
+
+    def score(
+        self,
+        services: Keywords = None,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        weights: ScoringWeights = ScoringWeights(),
+        country: str = config.ALLOWED_COUNTRY,
+    ) -> np.ndarray:
+        """Score every row in one vectorized pass; disqualified rows get ``-inf``."""
+        scores = weights.website * self.has_website + weights.instagram * self.has_instagram
+        keywords = _keywords(services)
+        if keywords and len(self.services):
+            matched = np.zeros(len(self.services), dtype=np.float64)
+            for keyword in keywords:
+                matched += np.char.find(self.services, keyword) >= 0
+            scores = scores + (weights.services / len(keywords)) * matched[self.service_codes]
+        return np.where(self.qualified(state, city, country), scores, -np.inf)
+
+    def top_k(
+        self,
+        k: int,
+        services: Keywords = None,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        weights: ScoringWeights = ScoringWeights(),
+        country: str = config.ALLOWED_COUNTRY,
+    ) -> List[ScoredLead]:
+        """Return the ``k`` best qualified leads, best first (ties keep file order)."""
+        scores = self.score(services, state, city, weights, country)
+        rows = self._top_rows(scores, k)
+        return [
+            ScoredLead(self.clinic_names[i], self.emails[i], float(scores[i]), int(i)) for i in rows
+        ]
+
+    @staticmethod
+    def _top_rows(scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, int(np.count_nonzero(scores > -np.inf)))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k < len(scores):
+            # argpartition picks arbitrary rows among those tied with the
+            # k-th score; keep the earliest ones so results are stable.
+            threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            above = np.flatnonzero(scores > threshold)
+            ties = np.flatnonzero(scores == threshold)[: k - len(above)]
+            candidates = np.concatenate((above, ties))
+        else:
+            candidates = np.arange(len(scores))
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order]
+
+
+def qualify(leads: Iterable[Mapping[str, str]], k: int, **query) -> List[ScoredLead]:
+    """Score an iterable of lead dicts and return the top ``k`` (see `LeadTable.top_k`)."""
+    return LeadTable.from_leads(leads).top_k(k, **query)
+
+
+__all__ = [
+    "LeadTable",
+    "ScoredLead",
+    "ScoringWeights",
+    "qualify",
+    "US_STATES",
+    "COUNTRY_REGIONS",
+]
@@ -4,17 +4,34 @@ This module defines Pydantic models representing the mutable
 state passed between agents in the base and client pipelines.
 Each class provides type hints and sensible defaults for the
 expected data collected or produced by the agents.
+
+Pipelines validate the state once when a run starts and once when it
+ends. Between stages the state travels as a `SlotState`, a lightweight
+``__slots__`` object generated from the model fields that behaves like a
+dict, so agents keep using ``context["key"]`` without paying for
+validation or per-instance ``__dict__`` allocation at every handoff.
 """
 from __future__ import annotations
 
-from typing import List, Optional
+import json
+from abc import abstractmethod
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict, Field
 
-from pydantic import BaseModel, Field
+try:  # Optional fast JSON encoder
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
 
 
 class BasePipelineState(BaseModel):
     """State object passed through the Base Team pipeline.
 
+    Keys that are not declared below (for example ``prospect_filters``) are
+    kept as extra fields.
+
     Attributes:
         sales_manager: Status or result from the sales manager agent.
         prospects: A list of prospect identifiers sourced by the prospector.
@@ -24,6 +41,8 @@ class BasePipelineState(BaseModel):
         compliance: Result of QA/compliance check (True if compliant, False otherwise).
     """
 
+    model_config = ConfigDict(extra="allow")
+
     sales_manager: Optional[str] = None
     prospects: List[str] = Field(default_factory=list)
     outreach: Optional[str] = None
@@ -35,23 +54,198 @@ class BasePipelineState(BaseModel):
 class ClientPipelineState(BaseModel):
     """State object passed through the Client Team pipeline.
 
+    Keys that are not declared below are kept as extra fields.
+
     Attributes:
         client_name: Name of the client associated with this pipeline.
         account_manager: Status or actions taken by the account manager.
         growth_strategy: Strategy drafted by the growth strategist.
         funnel: Funnel architecture designed by the funnel architect.
         creatives: List of creative assets produced by the creative director.
-        media_plan: Media plan created or simulated by the media buyer.
+        ad_copy: Headline and body that run with each creative.
+        media_plan: Media plan simulated by the media buyer (see
+            `escale_ai.media_sim.MediaPlan`).
         ads_compliance: Result of ads compliance QA (True if compliant).
     """
 
+    model_config = ConfigDict(extra="allow")
+
     client_name: Optional[str] = None
     account_manager: Optional[str] = None
     growth_strategy: Optional[str] = None
     funnel: Optional[str] = None
     creatives: List[str] = Field(default_factory=list)
-    media_plan: Optional[str] = None
+    ad_copy: List[Dict[str, str]] = Field(default_factory=list)
+    media_plan: Optional[Dict[str, Any]] = None
     ads_compliance: Optional[bool] = None
 
 
-__all__ = ["BasePipelineState", "ClientPipelineState"]
+class SlotState(MutableMapping):
+    """Dict-like, ``__slots__``-backed state used between pipeline stages.
+
+    Subclasses are generated by `slots_for`; declared model fields live in
+    slots and any other key in a small ``_extra`` dict. The accessors below
+    are abstract, so only generated subclasses can be instantiated.
+    """
+
+    __slots__ = ("_extra",)
+    _fields: Tuple[str, ...] = ()
+    _field_set: frozenset = frozenset()
+    _slot_of: Dict[str, str] = {}
+
+    def __init__(self, values: Mapping[str, Any] = ()) -> None:
+        """Build an unvalidated state; fields missing from ``values`` are None."""
+        self._extra: Dict[str, Any] = {}
+        for slot in self._slot_of.values():
+            setattr(self, slot, None)
+        for key, value in dict(values).items():
+            self[key] = value
+
+    @classmethod
+    @abstractmethod
+    def from_model(cls, model: BaseModel) -> "SlotState":
+        """Build the slotted state from an already validated model."""
+        raise NotImplementedError("generated by slots_for")
+
+    def __getitem__(self, key: str) -> Any:
+        slot = self._slot_of.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        slot = self._slot_of.get(key)
+        if slot is not None:
+            setattr(self, slot, value)
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._field_set:
+            raise KeyError(f"cannot delete declared field {key!r}")
+        del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._field_set or key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return len(self._fields) + len(self._extra)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        slot = self._slot_of.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        return self._extra.get(key, default)
+
+    @abstractmethod
+    def copy(self) -> "SlotState":
+        """Return a shallow copy (generated by `slots_for`)."""
+        raise NotImplementedError("generated by slots_for")
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the state as a plain dict (generated by `slots_for`)."""
+        raise NotImplementedError("generated by slots_for")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+_slot_classes: Dict[Type[BaseModel], Type[SlotState]] = {}
+
+
+def _compile_accessors(fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Generate straight-line ``from_model``/``copy``/``to_dict`` methods.
+
+    Unrolling the field loops (as `dataclasses` does for ``__init__``)
+    makes the per-stage handoff a handful of attribute copies.
+    """
+    names = [f"f{i}" for i in range(len(fields))]
+    lines = [
+        "def from_model(cls, model):",
+        "    state = cls.__new__(cls)",
+        "    values = model.__dict__",
+        *[f"    state.{name} = values[{field!r}]" for name, field in zip(names, fields)],
+        "    extra = model.__pydantic_extra__",
+        "    state._extra = dict(extra) if extra else {}",
+        "    return state",
+        "def copy(self):",
+        "    clone = self.__class__.__new__(self.__class__)",
+        *[f"    clone.{name} = self.{name}" for name in names],
+        "    clone._extra = dict(self._extra)",
+        "    return clone",
+        "def to_dict(self):",
+        "    values = {" + ", ".join(f"{field!r}: self.{name}" for name, field in zip(names, fields)) + "}",
+        "    values.update(self._extra)",
+        "    return values",
+    ]
+    namespace: Dict[str, Any] = {}
+    exec("\n".join(lines), namespace)
+    return {
+        "from_model": classmethod(namespace["from_model"]),
+        "copy": namespace["copy"],
+        "to_dict": namespace["to_dict"],
+    }
+
+
+def slots_for(model_cls: Type[BaseModel]) -> Type[SlotState]:
+    """Return (and cache) the `SlotState` subclass mirroring ``model_cls``."""
+    slot_cls = _slot_classes.get(model_cls)
+    if slot_cls is None:
+        fields = tuple(model_cls.model_fields)
+        # Slots get positional names so any field name is a valid identifier.
+        slot_names = tuple(f"f{i}" for i in range(len(fields)))
+        namespace: Dict[str, Any] = {
+            "__slots__": slot_names,
+            "_fields": fields,
+            "_field_set": frozenset(fields),
+            "_slot_of": dict(zip(fields, slot_names)),
+        }
+        namespace.update(_compile_accessors(fields))
+        slot_cls = type(model_cls.__name__ + "Slots", (SlotState,), namespace)
+        _slot_classes[model_cls] = slot_cls
+    return slot_cls
+
+
+def enter_state(model_cls: Type[BaseModel], context: Optional[Mapping[str, Any]]) -> SlotState:
+    """Validate the initial context once and return the slotted working state."""
+    if isinstance(context, model_cls):
+        model = context
+    else:
+        model = model_cls.model_validate(context or {})
+    return slots_for(model_cls).from_model(model)
+
+
+def exit_state(model_cls: Type[BaseModel], state: SlotState) -> BaseModel:
+    """Validate the final state once and return it as a model."""
+    return model_cls.model_validate(state.to_dict())
+
+
+def to_json(value: Any) -> str:
+    """Serialize a pipeline state or context to compact JSON.
+
+    Models use pydantic's native ``model_dump_json``; plain contexts use
+    ``orjson`` when it is installed and the standard library otherwise.
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    if isinstance(value, SlotState):
+        value = value.to_dict()
+    if orjson is not None:
+        return orjson.dumps(value, default=str).decode("utf-8")
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+__all__ = [
+    "BasePipelineState",
+    "ClientPipelineState",
+    "SlotState",
+    "slots_for",
+    "enter_state",
+    "exit_state",
+    "to_json",
+]
@@ -0,0 +1,255 @@
+"""
+Compiled templates for personalized outreach emails.
+
+A template is plain text with ``{{ field }}`` placeholders, optionally
+followed by filters: ``{{ city | title }}``, ``{{ services | first }}`` or
+``{{ name | default: "there" }}``. `Template` parses the source once and
+compiles it into a single Python function that joins the literal chunks
+with the lead's values, so rendering a lead costs one function call and
+one ``str.join`` instead of re-scanning the template text.
+
+Filter chains are memoized by input value. Lead batches repeat a handful
+of cities, states and service lists, so a batch only computes each
+distinct filtered value once and every other lead reuses it.
+
+`EmailTemplate` pairs a subject and a body template and renders lead
+batches into `EmailMessage` objects lazily. `EmailTemplate.stream` reads a
+`CSVLeadSource` batch by batch (only the columns the templates use) and
+yields messages one at a time, so they can be handed straight to
+`EmailSendingEngine.enqueue` or `send_bulk` without ever being collected in
+a list. An optional `ComplianceChecker` drops non-compliant bodies, one
+batch scan at a time.
+
+Usage:
+    from escale_ai.templates import EmailTemplate
+    from escale_ai.tools import CSVLeadSource, EmailSendingEngine, MockEmailService
+
+    template = EmailTemplate(
+        "Quick idea for {{ clinic_name }}",
+        "Hi {{ clinic_name }},\\n\\nMore {{ services | first }} patients in {{ city | title }}?",
+    )
+    engine = EmailSendingEngine(MockEmailService())
+    engine.enqueue(template.stream(CSVLeadSource("data/leads.csv")))
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from . import config
+from .compliance import ComplianceChecker, Verdict
+from .tools.email_service import EmailMessage
+from .tools.lead_source import CSVLeadSource
+
+Lead = Mapping[str, Any]
+
+_PLACEHOLDER = re.compile(r"{{(.*?)}}", re.DOTALL)
+_FIELD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+_FILTER = re.compile(r"\s*([A-Za-z_]+)\s*(?::\s*(\"[^\"]*\"|'[^']*'))?\s*\Z")
+_FILTER_CACHE_SIZE = 4096
+
+
+class TemplateError(ValueError):
+    """Raised when a template cannot be parsed."""
+
+
+def _first(value: str) -> str:
+    for separator in (";", ","):
+        if separator in value:
+            return value.split(separator, 1)[0].strip()
+    return value.strip()
+
+
+#: Filters available in placeholders; each maps a string to a string.
+FILTERS: Dict[str, Callable[[str], str]] = {
+    "upper": str.upper,
+    "lower": str.lower,
+    "title": str.title,
+    "capitalize": str.capitalize,
+    "strip": str.strip,
+    "first": _first,
+}
+
+
+def _default(fallback: str) -> Callable[[str], str]:
+    def apply(value: str) -> str:
+        return value if value.strip() else fallback
+
+    return apply
+
+
+def _chain(filters: Sequence[Callable[[str], str]]) -> Callable[[str], str]:
+    if len(filters) == 1:
+        return filters[0]
+
+    def apply(value: str) -> str:
+        for fn in filters:
+            value = fn(value)
+        return value
+
+    return apply
+
+
+class Template:
+    """A text template compiled into a render function.
+
+    Args:
+        source: template text with ``{{ field | filter }}`` placeholders
+        name: label used in error messages
+
+    Raises:
+        TemplateError: on unknown filters, invalid field names or unbalanced braces.
+    """
+
+    def __init__(self, source: str, name: str = "template") -> None:
+        self.source = source
+        self.name = name
+        chunks, placeholders = self._parse(source)
+        self.fields: Tuple[str, ...] = tuple(dict.fromkeys(field for field, _ in placeholders))
+        self.render: Callable[[Lead], str] = self._compile(chunks, placeholders)
+
+    def __call__(self, lead: Lead) -> str:
+        return self.render(lead)
+
+    def __repr__(self) -> str:
+        return f"Template({self.name!r}, fields={list(self.fields)})"
+
+    def _parse(self, source: str) -> Tuple[List[str], List[Tuple[str, Optional[Callable[[str], str]]]]]:
+        chunks: List[str] = []
+        placeholders: List[Tuple[str, Optional[Callable[[str], str]]]] = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            chunks.append(source[position : match.start()])
+            placeholders.append(self._placeholder(match.group(1)))
+            position = match.end()
+        chunks.append(source[position:])
+        if any("{{" in chunk or "}}" in chunk for chunk in chunks):
+            raise TemplateError(f"{self.name}: unbalanced '{{{{' or '}}}}'")
+        return chunks, placeholders
+
+    def _placeholder(self, expression: str) -> Tuple[str, Optional[Callable[[str], str]]]:
+        field, *specs = expression.split("|")
+        field = field.strip()
+        if not _FIELD.match(field):
+            raise TemplateError(f"{self.name}: invalid field name {field!r}")
+        filters: List[Callable[[str], str]] = []
+        for spec in specs:
+            match = _FILTER.match(spec)
+            if match is None:
+                raise TemplateError(f"{self.name}: invalid filter {spec.strip()!r}")
+            filter_name, argument = match.groups()
+            if filter_name == "default":
+                if argument is None:
+                    raise TemplateError(f"{self.name}: default needs a value, e.g. default: \"there\"")
+                filters.append(_default(argument[1:-1]))
+            elif filter_name in FILTERS and argument is None:
+                filters.append(FILTERS[filter_name])
+            else:
+                raise TemplateError(f"{self.name}: unknown filter {spec.strip()!r}")
+        if not filters:
+            return field, None
+        return field, functools.lru_cache(maxsize=_FILTER_CACHE_SIZE)(_chain(filters))
+
+    def _compile(
+        self, chunks: List[str], placeholders: List[Tuple[str, Optional[Callable[[str], str]]]]
+    ) -> Callable[[Lead], str]:
+        # Generate ``"".join((chunk0, value0, chunk1, ...))`` as real code so
+        # rendering runs without interpreting the parsed template.
+        namespace: Dict[str, Any] = {}
+        parts: List[str] = []
+        for i, (field, transform) in enumerate(placeholders):
+            if chunks[i]:
+                parts.append(repr(chunks[i]))
+            value = f"(_get({field!r}) or '')"
+            if transform is not None:
+                namespace[f"_f{i}"] = transform
+                value = f"_f{i}({value})"
+            parts.append(value)
+        if chunks[-1]:
+            parts.append(repr(chunks[-1]))
+        if not placeholders:
+            body = repr(chunks[0])
+        elif len(parts) == 1:
+            body = parts[0]
+        else:
+            body = "''.join((" + ", ".join(parts) + ",))"
+        code = f"def render(lead):\n    _get = lead.get\n    return {body}\n"
+        exec(compile(code, f"<{self.name}>", "exec"), namespace)
+        return namespace["render"]
+
+
+class EmailTemplate:
+    """Subject and body templates rendered into `EmailMessage` objects.
+
+    Args:
+        subject: subject template
+        body: body template
+        to_field: lead field holding the recipient address
+    """
+
+    def __init__(self, subject: str, body: str, to_field: str = "email") -> None:
+        self.subject = Template(subject, "subject")
+        self.body = Template(body, "body")
+        self.to_field = to_field
+        self.fields: Tuple[str, ...] = tuple(dict.fromkeys((to_field, *self.subject.fields, *self.body.fields)))
+
+    def render(self, lead: Lead) -> EmailMessage:
+        return EmailMessage(lead.get(self.to_field) or "", self.subject.render(lead), self.body.render(lead))
+
+    def render_batch(self, leads: Iterable[Lead]) -> Iterator[EmailMessage]:
+        """Lazily render every lead that has a recipient address."""
+        to_field, subject, body = self.to_field, self.subject.render, self.body.render
+        for lead in leads:
+            address = lead.get(to_field)
+            if address:
+                yield EmailMessage(address, subject(lead), body(lead))
+
+    def stream(
+        self,
+        source: CSVLeadSource,
+        batch_size: int = 1000,
+        offset: int = 0,
+        checker: Optional[ComplianceChecker] = None,
+        on_reject: Optional[Callable[[EmailMessage, Verdict], None]] = None,
+        include: Optional[Callable[[Lead], bool]] = None,
+        extra_fields: Sequence[str] = (),
+    ) -> Iterator[EmailMessage]:
+        """Render a CSV lead source batch by batch.
+
+        Only the columns used by the templates (and ``extra_fields``) are
+        read from the file. Pass
+        the result straight to `EmailSendingEngine.enqueue`; memory stays
+        bounded by ``batch_size``.
+
+        Args:
+            source: the leads CSV
+            batch_size: leads read and rendered at a time
+            offset: byte offset to resume from (see `CSVLeadSource.iter_leads`)
+            checker: drop messages whose body is not compliant
+            on_reject: called with each dropped message and its verdict
+            include: optional predicate selecting the leads to render
+            extra_fields: other columns to read, e.g. those ``include`` uses
+        """
+        columns = tuple(dict.fromkeys((*self.fields, *extra_fields)))
+        for batch in source.iter_leads(batch_size=batch_size, offset=offset, columns=columns):
+            leads = batch.leads if include is None else filter(include, batch.leads)
+            if checker is None:
+                yield from self.render_batch(leads)
+                continue
+            messages = list(self.render_batch(leads))
+            verdicts = checker.check_batch([message.body for message in messages])
+            for message, verdict in zip(messages, verdicts):
+                if verdict.compliant:
+                    yield message
+                elif on_reject is not None:
+                    on_reject(message, verdict)
+
+
+def default_outreach_template() -> EmailTemplate:
+    """Return the cold email template configured in ``config``."""
+    return EmailTemplate(config.OUTREACH_SUBJECT_TEMPLATE, config.OUTREACH_BODY_TEMPLATE)
+
+
+__all__ = ["Template", "EmailTemplate", "TemplateError", "FILTERS", "default_outreach_template"]
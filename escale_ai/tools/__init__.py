@@ -4,11 +4,84 @@ This package defines base interfaces for services such as lead sourcing,
 email sending, calendar scheduling, and CRM interactions. Concrete
 implementations can subclass these interfaces to integrate with
 real providers.
+
+The names below are imported lazily (PEP 562): ``from escale_ai.tools
+import LeadIndex`` only loads the module that defines it, so importing one
+service does not pay for SQLite, thread pools or the other providers.
 """
-from .lead_source import BaseLeadSource, MockLeadSource, CSVLeadSource
-from .email_service import BaseEmailService, MockEmailService
-from .calendar_service import BaseCalendarService, MockCalendarService
-from .crm_service import BaseCRMService, MockCRMService
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
+
+#: Public name -> submodule defining it.
+_EXPORTS: Dict[str, str] = {
+    "BaseLeadSource": "lead_source",
+    "MockLeadSource": "lead_source",
+    "CSVLeadSource": "lead_source",
+    "LeadBatch": "lead_source",
+    "BaseEmailService": "email_service",
+    "MockEmailService": "email_service",
+    "EmailMessage": "email_service",
+    "EmailSendingEngine": "email_sender",
+    "BaseCalendarService": "calendar_service",
+    "MockCalendarService": "calendar_service",
+    "LocalCalendarService": "calendar_service",
+    "BaseCRMService": "crm_service",
+    "MockCRMService": "crm_service",
+    "SQLiteCRMService": "crm_service",
+    "CRMWriteBuffer": "crm_service",
+    "Contact": "crm_service",
+    "LeadIndex": "lead_index",
+    "AsyncBaseLeadSource": "lead_source",
+    "AsyncMockLeadSource": "lead_source",
+    "AsyncBaseEmailService": "email_service",
+    "AsyncMockEmailService": "email_service",
+    "AsyncBaseCalendarService": "calendar_service",
+    "AsyncMockCalendarService": "calendar_service",
+    "AsyncBaseCRMService": "crm_service",
+    "AsyncMockCRMService": "crm_service",
+    "ConnectionPool": "pool",
+    "PoolManager": "pool",
+}
+
+if TYPE_CHECKING:
+    from .calendar_service import (
+        AsyncBaseCalendarService,
+        AsyncMockCalendarService,
+        BaseCalendarService,
+        LocalCalendarService,
+        MockCalendarService,
+    )
+    from .crm_service import (
+        AsyncBaseCRMService,
+        AsyncMockCRMService,
+        BaseCRMService,
+        Contact,
+        CRMWriteBuffer,
+        MockCRMService,
+        SQLiteCRMService,
+    )
+    from .email_sender import EmailSendingEngine
+    from .email_service import AsyncBaseEmailService, AsyncMockEmailService, BaseEmailService, EmailMessage, MockEmailService
+    from .lead_index import LeadIndex
+    from .lead_source import AsyncBaseLeadSource, AsyncMockLeadSource, BaseLeadSource, CSVLeadSource, LeadBatch, MockLeadSource
+    from .pool import ConnectionPool, PoolManager
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "BaseLeadSource",
@@ -20,5 +93,22 @@ __all__ = [
     "MockCalendarService",
     "MockCRMService",
     "CSVLeadSource",
+    "LeadBatch",
+    "LeadIndex",
+    "EmailMessage",
+    "EmailSendingEngine",
+    "SQLiteCRMService",
+    "CRMWriteBuffer",
+    "Contact",
+    "LocalCalendarService",
+    "AsyncBaseLeadSource",
+    "AsyncBaseEmailService",
+    "AsyncBaseCalendarService",
+    "AsyncBaseCRMService",
+    "AsyncMockLeadSource",
+    "AsyncMockEmailService",
+    "AsyncMockCalendarService",
+    "AsyncMockCRMService",
+    "ConnectionPool",
+    "PoolManager",
 ]
-    
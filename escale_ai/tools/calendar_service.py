@@ -9,14 +9,36 @@ Usage:
     from escale_ai.tools.calendar_service import MockCalendarService
     calendar_service = MockCalendarService()
     link = calendar_service.schedule_meeting(invitee_email="client@example.com", meeting_time="2026-01-01 10:00")
+
+`LocalCalendarService` keeps booked meetings in a sorted structure so it can
+reject conflicts, find the next free slot and book a whole batch of invitees
+in a single pass:
+
+    calendar = LocalCalendarService()
+    bookings = calendar.schedule_batch(["a@clinic.com", "b@clinic.com"], start_after="2026-02-10 09:00")
+
+`AsyncBaseCalendarService` is the async interface for hosted calendars;
+`AsyncMockCalendarService` simulates one behind a connection pool.
 """
 
+import time
 from abc import ABC, abstractmethod
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from heapq import merge
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from ..metrics import InstrumentedTool
+from .pool import LocalProvider
 
+TimeLike = Union[str, datetime]
 
-class BaseCalendarService(ABC):
+
+class BaseCalendarService(InstrumentedTool, ABC):
     """Abstract base class for calendar scheduling services."""
 
+    instrumented = ("schedule_meeting", "schedule_batch")
+
     @abstractmethod
     def schedule_meeting(self, invitee_email: str, meeting_time: str, duration_minutes: int = 30) -> str:
         """Schedule a meeting and return a meeting link or ID.
@@ -33,7 +55,14 @@ class BaseCalendarService(ABC):
 
 
 class MockCalendarService(BaseCalendarService):
-    """Mock calendar service that returns a dummy meeting link."""
+    """Mock calendar service that returns a dummy meeting link.
+
+    Args:
+        latency: seconds each call blocks for, to emulate a provider round-trip
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
 
     def schedule_meeting(self, invitee_email: str, meeting_time: str, duration_minutes: int = 30) -> str:
         """Return a dummy meeting link for demonstration.
@@ -46,10 +75,241 @@ class MockCalendarService(BaseCalendarService):
         Returns:
             A string representing a mock meeting link.
         """
-        # Replace characters that might not be URL-safe
-        sanitized_email = invitee_email.replace("@", "_at_").replace(".", "_")
-        sanitized_time = meeting_time.replace(" ", "_").replace(":", "-")
-        return f"https://cal.mock/{sanitized_email}/{sanitized_time}"
+        if self.latency:
+            time.sleep(self.latency)
+        return _meeting_link("https://cal.mock", invitee_email, meeting_time)
+
+
+class AsyncBaseCalendarService(InstrumentedTool, ABC):
+    """Async counterpart of `BaseCalendarService`."""
+
+    instrumented = ("schedule_meeting",)
+
+    @abstractmethod
+    async def schedule_meeting(self, invitee_email: str, meeting_time: str, duration_minutes: int = 30) -> str:
+        """Schedule a meeting and return a meeting link or ID (see `BaseCalendarService`)."""
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Release the service's connections."""
+
+
+class AsyncMockCalendarService(LocalProvider, AsyncBaseCalendarService):
+    """Local stand-in for a hosted calendar; each call is one pooled request."""
+
+    provider = "calendar"
+
+    async def schedule_meeting(self, invitee_email: str, meeting_time: str, duration_minutes: int = 30) -> str:
+        await self._request()
+        return _meeting_link("https://cal.mock", invitee_email, meeting_time)
+
+
+def _meeting_link(base_url: str, invitee_email: str, meeting_time: str) -> str:
+    # Replace characters that might not be URL-safe
+    sanitized_email = invitee_email.replace("@", "_at_").replace(".", "_")
+    sanitized_time = meeting_time.replace(" ", "_").replace(":", "-")
+    return f"{base_url}/{sanitized_email}/{sanitized_time}"
+
+
+def parse_meeting_time(meeting_time: TimeLike) -> datetime:
+    """Parse an ISO-like meeting time (``"2026-02-10 09:30"``) into a datetime."""
+    if isinstance(meeting_time, datetime):
+        return meeting_time
+    try:
+        return datetime.fromisoformat(meeting_time.strip())
+    except ValueError:
+        raise ValueError(f"unrecognized meeting time: {meeting_time!r}") from None
+
+
+class SlotUnavailableError(ValueError):
+    """Raised when a requested meeting overlaps an existing booking."""
+
+
+class Booking(NamedTuple):
+    """A meeting booked on a `LocalCalendarService`."""
+
+    start: datetime
+    end: datetime
+    invitee_email: str
+    link: str
+
+
+class LocalCalendarService(BaseCalendarService):
+    """In-process calendar engine with conflict detection.
+
+    Bookings never overlap and are kept sorted by start time, so checking a
+    slot is a binary search (O(log n)) and finding the next free slot only
+    walks the bookings that are actually in the way. Automatic slot search
+    respects working hours; explicitly requested times are only checked for
+    conflicts.
+
+    Args:
+        day_start: first bookable hour of a working day
+        day_end: hour at which the working day ends
+        weekdays_only: skip Saturdays and Sundays when searching for slots
+        slot_minutes: granularity that searched slots are aligned to
+        base_url: prefix of generated meeting links
+    """
+
+    def __init__(
+        self,
+        day_start: int = 9,
+        day_end: int = 17,
+        weekdays_only: bool = True,
+        slot_minutes: int = 15,
+        base_url: str = "https://cal.local",
+    ) -> None:
+        if not 0 <= day_start < day_end <= 24:
+            raise ValueError("working hours must satisfy 0 <= day_start < day_end <= 24")
+        self.day_start = day_start
+        self.day_end = day_end
+        self.weekdays_only = weekdays_only
+        self.slot = timedelta(minutes=slot_minutes)
+        self.base_url = base_url
+        self._starts: List[datetime] = []
+        self._bookings: List[Booking] = []
+
+    def __len__(self) -> int:
+        return len(self._bookings)
+
+    @property
+    def bookings(self) -> Tuple[Booking, ...]:
+        return tuple(self._bookings)
+
+    def is_free(self, start: TimeLike, duration_minutes: int = 30) -> bool:
+        """Return True if ``[start, start + duration)`` overlaps no booking."""
+        start = parse_meeting_time(start)
+        return self._conflict(start, start + timedelta(minutes=duration_minutes)) is None
+
+    def schedule_meeting(self, invitee_email: str, meeting_time: str, duration_minutes: int = 30) -> str:
+        """Book a meeting at an explicit time.
+
+        Raises:
+            SlotUnavailableError: if the meeting overlaps an existing booking.
+            ValueError: if ``meeting_time`` cannot be parsed.
+        """
+        start = parse_meeting_time(meeting_time)
+        end = start + timedelta(minutes=duration_minutes)
+        conflict = self._conflict(start, end)
+        if conflict is not None:
+            raise SlotUnavailableError(
+                f"{start:%Y-%m-%d %H:%M} overlaps the meeting with {conflict.invitee_email}"
+                f" at {conflict.start:%Y-%m-%d %H:%M}"
+            )
+        booking = self._booking(invitee_email, start, end)
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._bookings.insert(position, booking)
+        return booking.link
+
+    def next_free_slot(self, after: TimeLike, duration_minutes: int = 30) -> datetime:
+        """Return the earliest working-hours slot of the given length at or after ``after``."""
+        start, _ = self._find_slot(parse_meeting_time(after), timedelta(minutes=duration_minutes))
+        return start
+
+    def schedule_batch(
+        self,
+        invitee_emails: Iterable[str],
+        start_after: TimeLike,
+        duration_minutes: int = 30,
+    ) -> List[Booking]:
+        """Book consecutive free slots for many invitees in one pass.
+
+        The search sweeps forward through the existing bookings once, so a
+        batch of k invitees costs O(log n + n + k) instead of k independent
+        searches and inserts.
+
+        Returns:
+            The new bookings, in invitee order.
+        """
+        duration = timedelta(minutes=duration_minutes)
+        cursor = parse_meeting_time(start_after)
+        position = bisect_right(self._starts, cursor)
+        booked: List[Booking] = []
+        for email in invitee_emails:
+            start, position = self._find_slot(cursor, duration, position)
+            booked.append(self._booking(email, start, start + duration))
+            cursor = start + duration
+        if booked:
+            self._bookings = list(merge(self._bookings, booked))
+            self._starts = [b.start for b in self._bookings]
+        return booked
+
+    def restore(self, bookings: Iterable[Booking]) -> int:
+        """Put back bookings made earlier, e.g. replayed from an event log.
+
+        Bookings already in the calendar are skipped; the others are not
+        checked for conflicts, since they were valid when they were made.
+
+        Returns:
+            Number of bookings added.
+        """
+        present = set(self._bookings)
+        missing = sorted({booking for booking in bookings if booking not in present})
+        if missing:
+            self._bookings = list(merge(self._bookings, missing))
+            self._starts = [b.start for b in self._bookings]
+        return len(missing)
+
+    def _booking(self, invitee_email: str, start: datetime, end: datetime) -> Booking:
+        link = _meeting_link(self.base_url, invitee_email, start.strftime("%Y-%m-%d %H:%M"))
+        return Booking(start, end, invitee_email, link)
+
+    def _conflict(self, start: datetime, end: datetime) -> Optional[Booking]:
+        position = bisect_right(self._starts, start)
+        if position and self._bookings[position - 1].end > start:
+            return self._bookings[position - 1]
+        if position < len(self._bookings) and self._bookings[position].start < end:
+            return self._bookings[position]
+        return None
+
+    def _align(self, moment: datetime) -> datetime:
+        midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        steps = -((midnight - moment) // self.slot)  # ceil division
+        return midnight + steps * self.slot
+
+    def _working_start(self, moment: datetime, duration: timedelta) -> datetime:
+        """Move ``moment`` forward into a working-hours window that fits ``duration``."""
+        while True:
+            day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+            opens = day + timedelta(hours=self.day_start)
+            closes = day + timedelta(hours=self.day_end)
+            if self.weekdays_only and day.weekday() >= 5:
+                moment = day + timedelta(days=1)
+                continue
+            if moment < opens:
+                moment = opens
+            if moment + duration <= closes:
+                return moment
+            if duration > closes - opens:
+                raise ValueError("meeting is longer than the working day")
+            moment = day + timedelta(days=1)
+
+    def _find_slot(self, after: datetime, duration: timedelta, position: Optional[int] = None) -> Tuple[datetime, int]:
+        """Return the first free slot at or after ``after`` and the index of
+        the first booking starting after it."""
+        candidate = self._working_start(self._align(after), duration)
+        if position is None:
+            position = bisect_right(self._starts, candidate)
+        while position < len(self._starts) and self._starts[position] <= candidate:
+            position += 1
+        bookings = self._bookings
+        if position and bookings[position - 1].end > candidate:
+            candidate = self._working_start(self._align(bookings[position - 1].end), duration)
+        while position < len(bookings) and bookings[position].start < candidate + duration:
+            if bookings[position].end > candidate:
+                candidate = self._working_start(self._align(bookings[position].end), duration)
+            position += 1
+        return candidate, position
 
 
-__all__ = ["BaseCalendarService", "MockCalendarService"]
+__all__ = [
+    "BaseCalendarService",
+    "MockCalendarService",
+    "LocalCalendarService",
+    "AsyncBaseCalendarService",
+    "AsyncMockCalendarService",
+    "Booking",
+    "SlotUnavailableError",
+    "parse_meeting_time",
+]
@@ -10,15 +10,44 @@ Usage:
     from escale_ai.tools.crm_service import MockCRMService
     crm = MockCRMService()
     crm.create_or_update_contact(email="lead@example.com", name="Lead Name", notes="Interested in our services.")
+
+High-volume writers should batch their updates, either explicitly with
+`BaseCRMService.bulk_upsert` or through a `CRMWriteBuffer`, which coalesces
+repeated updates to the same contact and flushes them in batches:
+
+    with CRMWriteBuffer(SQLiteCRMService("data/crm.sqlite3")) as crm:
+        for lead in leads:
+            crm.create_or_update_contact(lead["email"], lead["name"])
+
+Hosted CRMs implement `AsyncBaseCRMService`; `AsyncMockCRMService`
+simulates one behind a connection pool.
 """
 
+import os
+import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from ..metrics import InstrumentedTool
+from .lead_index import normalize_email
+from .pool import LocalProvider, run_bounded
 
 
-class BaseCRMService(ABC):
+class Contact(NamedTuple):
+    """A CRM contact update."""
+
+    email: str
+    name: str
+    notes: Optional[str] = None
+
+
+class BaseCRMService(InstrumentedTool, ABC):
     """Abstract base class for CRM operations."""
 
+    instrumented = ("create_or_update_contact", "bulk_upsert")
+
     @abstractmethod
     def create_or_update_contact(self, email: str, name: str, notes: Optional[str] = None) -> None:
         """Create or update a contact record in the CRM system.
@@ -30,9 +59,37 @@ class BaseCRMService(ABC):
         """
         raise NotImplementedError
 
+    def bulk_upsert(self, contacts: Iterable[Contact]) -> int:
+        """Create or update several contacts.
+
+        The default implementation issues one call per contact; providers
+        with a batch endpoint should override it.
+
+        Args:
+            contacts: contact updates, applied in order
+
+        Returns:
+            Number of contacts written.
+        """
+        written = 0
+        for contact in contacts:
+            self.create_or_update_contact(*contact)
+            written += 1
+        return written
+
 
 class MockCRMService(BaseCRMService):
-    """Mock CRM service that logs contact creation/updating."""
+    """Mock CRM service that logs contact creation/updating.
+
+    Args:
+        echo: print each update
+        latency: seconds each call blocks for, to emulate a provider round-trip
+    """
+
+    def __init__(self, echo: bool = True, latency: float = 0.0) -> None:
+        self.echo = echo
+        self.latency = latency
+        self.updates = 0
 
     def create_or_update_contact(self, email: str, name: str, notes: Optional[str] = None) -> None:
         """Pretend to create or update a CRM contact by printing details.
@@ -42,7 +99,205 @@ class MockCRMService(BaseCRMService):
             name: full name of the contact
             notes: optional notes or description
         """
-        print(f"CRM record updated for {email} - Name: {name}, Notes: {notes}")
+        if self.latency:
+            time.sleep(self.latency)
+        self.updates += 1
+        if self.echo:
+            print(f"CRM record updated for {email} - Name: {name}, Notes: {notes}")
+
+
+class AsyncBaseCRMService(InstrumentedTool, ABC):
+    """Async counterpart of `BaseCRMService`."""
+
+    instrumented = ("create_or_update_contact", "bulk_upsert")
+
+    @abstractmethod
+    async def create_or_update_contact(self, email: str, name: str, notes: Optional[str] = None) -> None:
+        """Create or update a contact record (see `BaseCRMService`)."""
+        raise NotImplementedError
+
+    async def bulk_upsert(self, contacts: Iterable[Contact], concurrency: int = 10) -> int:
+        """Write several contacts with at most ``concurrency`` requests in flight.
+
+        Updates to different contacts may be applied in any order.
+
+        Returns:
+            Number of contacts written.
+        """
+        return await run_bounded(lambda contact: self.create_or_update_contact(*contact), contacts, concurrency)
+
+    async def aclose(self) -> None:
+        """Release the service's connections."""
+
+
+class AsyncMockCRMService(LocalProvider, AsyncBaseCRMService):
+    """Local stand-in for a hosted CRM; each update is one pooled request."""
+
+    provider = "crm"
+
+    async def create_or_update_contact(self, email: str, name: str, notes: Optional[str] = None) -> None:
+        await self._request()
+
+
+class SQLiteCRMService(BaseCRMService):
+    """Local CRM backed by a SQLite table.
+
+    A realistic stand-in for a hosted CRM: every call is a real write, and
+    `bulk_upsert` writes a whole batch in a single transaction. A ``None``
+    note never erases a note that is already stored.
+
+    Args:
+        path: database file; ``":memory:"`` keeps the CRM in memory
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS contacts ("
+                " email TEXT PRIMARY KEY, name TEXT NOT NULL, notes TEXT, updated_at REAL NOT NULL)"
+            )
+
+    _UPSERT = (
+        "INSERT INTO contacts (email, name, notes, updated_at) VALUES (?, ?, ?, ?)"
+        " ON CONFLICT(email) DO UPDATE SET name = excluded.name,"
+        " notes = COALESCE(excluded.notes, contacts.notes), updated_at = excluded.updated_at"
+    )
+
+    def create_or_update_contact(self, email: str, name: str, notes: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(self._UPSERT, (normalize_email(email), name, notes, time.time()))
+
+    def bulk_upsert(self, contacts: Iterable[Contact]) -> int:
+        now = time.time()
+        rows = [(normalize_email(c[0]), c[1], c[2] if len(c) > 2 else None, now) for c in contacts]
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(self._UPSERT, rows)
+        return len(rows)
+
+    def get_contact(self, email: str) -> Optional[Contact]:
+        """Return the stored contact for ``email`` or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT email, name, notes FROM contacts WHERE email = ?", (normalize_email(email),)
+            ).fetchone()
+        return Contact(*row) if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CRMWriteBuffer(BaseCRMService):
+    """Write-behind buffer that coalesces contact updates before flushing.
+
+    Updates to the same (normalized) email inside one window are merged:
+    the latest name wins and so does the latest note, except that an update
+    without notes (``None``) keeps the previous one; an empty string clears
+    it, as with `SQLiteCRMService`. The buffer is
+    flushed to the wrapped CRM with a single `bulk_upsert` once it holds
+    ``max_items`` distinct contacts or ``max_delay`` seconds after the first
+    pending update, whichever comes first. Call `flush` or `close` (or use
+    the buffer as a context manager) to write out what is left.
+
+    Args:
+        crm: the CRM service receiving the batches
+        max_items: distinct contacts that trigger a flush
+        max_delay: seconds a pending update may wait; ``None`` disables the
+            background timer so only size and explicit flushes apply
+    """
+
+    def __init__(
+        self,
+        crm: BaseCRMService,
+        max_items: int = 500,
+        max_delay: Optional[float] = 1.0,
+    ) -> None:
+        self.crm = crm
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self.coalesced = 0
+        self.flushed = 0
+        self._pending: Dict[str, Contact] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def create_or_update_contact(self, email: str, name: str, notes: Optional[str] = None) -> None:
+        key = normalize_email(email)
+        with self._lock:
+            previous = self._pending.get(key)
+            if previous is not None:
+                self.coalesced += 1
+                if notes is None:
+                    notes = previous.notes
+            self._pending[key] = Contact(key, name, notes)
+            full = len(self._pending) >= self.max_items
+            if not full and self._timer is None and self.max_delay is not None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def bulk_upsert(self, contacts: Iterable[Contact]) -> int:
+        count = 0
+        for contact in contacts:
+            self.create_or_update_contact(*contact)
+            count += 1
+        return count
+
+    def flush(self) -> int:
+        """Write all pending updates to the wrapped CRM.
+
+        Returns:
+            Number of contacts written.
+        """
+        # Serialize flushes so batches reach the CRM in the order they were cut.
+        with self._flush_lock:
+            with self._lock:
+                batch: List[Contact] = list(self._pending.values())
+                self._pending = {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not batch:
+                return 0
+            self.crm.bulk_upsert(batch)
+            self.flushed += len(batch)
+            return len(batch)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "CRMWriteBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 
-__all__ = ["BaseCRMService", "MockCRMService"]
+__all__ = [
+    "BaseCRMService",
+    "MockCRMService",
+    "SQLiteCRMService",
+    "CRMWriteBuffer",
+    "Contact",
+    "AsyncBaseCRMService",
+    "AsyncMockCRMService",
+]
@@ -0,0 +1,345 @@
+"""
+Rate-limited bulk email sending engine.
+
+`EmailSendingEngine` sits in front of any `BaseEmailService`. Messages are
+first written to a durable SQLite outbox, then drained by a bounded pool of
+worker threads. Every send takes a token from a `TokenBucket` (sustained
+rate + burst) and a slot from the daily quota stored in the outbox, which
+enforces ``config.EMAIL_LIMIT_PER_DAY`` across restarts. Failed sends are retried
+with exponential backoff.
+
+Quota slots are reserved and committed before a message is handed to the
+provider, so a crash can never lead to more than the daily limit being
+sent. Messages that were in flight when the process died are put back in
+the queue on the next start (at-least-once delivery).
+
+Usage:
+    from escale_ai.tools.email_sender import EmailSendingEngine
+    from escale_ai.tools.email_service import EmailMessage, MockEmailService
+
+    engine = EmailSendingEngine(MockEmailService())
+    report = engine.send_bulk([EmailMessage("a@example.com", "Hi", "Hello!")])
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from .. import config
+from .email_service import BaseEmailService, EmailMessage
+
+_ENQUEUE_CHUNK = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    to_address TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at REAL NOT NULL,
+    idempotency_key TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, id);
+CREATE TABLE IF NOT EXISTS daily_quota (
+    day TEXT PRIMARY KEY,
+    used INTEGER NOT NULL
+);
+"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Args:
+        rate: tokens added per second
+        capacity: maximum number of tokens (burst size); defaults to ``rate``
+        clock: monotonic time source, injectable for tests
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity if capacity is not None else rate, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take ``tokens`` if available right now."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until ``tokens`` can be taken."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_for = (tokens - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+class SendReport(NamedTuple):
+    """Summary of an `EmailSendingEngine.run`.
+
+    Attributes:
+        sent: emails delivered to the provider
+        failed: emails that exhausted their retries
+        deferred: emails still queued because the daily quota is used up
+    """
+
+    sent: int
+    failed: int
+    deferred: int
+
+
+class Outbox:
+    """Durable queue of outgoing emails and the persisted daily quota."""
+
+    def __init__(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+            if "idempotency_key" not in columns:  # outbox created by an older version
+                self._conn.execute("ALTER TABLE outbox ADD COLUMN idempotency_key TEXT")
+            self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS outbox_idempotency ON outbox (idempotency_key)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, messages: Iterable[EmailMessage], key: Optional[str] = None) -> int:
+        """Append messages to the queue, committing in chunks.
+
+        The iterable is consumed lazily so rendered emails can be streamed
+        in without being collected in memory first.
+
+        With a ``key`` the n-th message is stored under ``"<key>:<n>"`` and
+        skipped if a row with that key is already queued, so enqueueing the
+        same stream again under the same key (a retried run) adds only what
+        the first attempt did not get to.
+
+        Returns:
+            Number of messages consumed, including skipped ones.
+        """
+        total = 0
+        chunk: List[Tuple[str, str, str, float, Optional[str]]] = []
+        for position, message in enumerate(messages):
+            row_key = None if key is None else f"{key}:{position}"
+            chunk.append((message[0], message[1], message[2], time.time(), row_key))
+            if len(chunk) >= _ENQUEUE_CHUNK:
+                total += self._insert(chunk)
+                chunk = []
+        if chunk:
+            total += self._insert(chunk)
+        return total
+
+    def _insert(self, rows: List[Tuple[str, str, str, float, Optional[str]]]) -> int:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO outbox (to_address, subject, body, updated_at, idempotency_key)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def recover(self) -> int:
+        """Requeue messages left in flight by a crashed process."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = 'pending', updated_at = ? WHERE status = 'sending'", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def reserve_and_claim(self, day: str, limit: int, count: int) -> List[Tuple[int, int, EmailMessage]]:
+        """Atomically take up to ``count`` pending messages within the daily quota.
+
+        The quota is consumed in the same transaction that marks the
+        messages as in flight.
+
+        Returns:
+            ``(id, attempts, message)`` tuples.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT used FROM daily_quota WHERE day = ?", (day,)).fetchone()
+            used = row[0] if row else 0
+            grant = min(count, max(limit - used, 0))
+            if grant == 0:
+                return []
+            rows = self._conn.execute(
+                "SELECT id, attempts, to_address, subject, body FROM outbox"
+                " WHERE status = 'pending' ORDER BY id LIMIT ?",
+                (grant,),
+            ).fetchall()
+            if not rows:
+                return []
+            self._conn.executemany(
+                "UPDATE outbox SET status = 'sending', updated_at = ? WHERE id = ?",
+                [(time.time(), r[0]) for r in rows],
+            )
+            self._conn.execute(
+                "INSERT INTO daily_quota (day, used) VALUES (?, ?)"
+                " ON CONFLICT(day) DO UPDATE SET used = used + excluded.used",
+                (day, len(rows)),
+            )
+        return [(r[0], r[1], EmailMessage(r[2], r[3], r[4])) for r in rows]
+
+    def mark_sent(self, message_id: int, attempts: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'sent', attempts = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+                (attempts, time.time(), message_id),
+            )
+
+    def mark_failed(self, message_id: int, attempts: int, error: str, day: str) -> None:
+        """Record a permanent failure and give its quota slot back."""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "UPDATE outbox SET status = 'failed', attempts = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (attempts, error, time.time(), message_id),
+            )
+            self._conn.execute("UPDATE daily_quota SET used = MAX(used - 1, 0) WHERE day = ?", (day,))
+
+    def quota_used(self, day: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT used FROM daily_quota WHERE day = ?", (day,)).fetchone()
+        return row[0] if row else 0
+
+    def count(self, status: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE status = ?", (status,)).fetchone()[0]
+
+
+class EmailSendingEngine:
+    """Drains a durable outbox through an email service under rate and quota limits.
+
+    Args:
+        service: the provider used to deliver each email
+        outbox_path: SQLite file for the queue and quota; defaults to
+            ``config.EMAIL_OUTBOX_PATH``
+        daily_limit: maximum emails per calendar day
+        rate_per_second: sustained sending rate
+        burst: token bucket capacity
+        max_workers: concurrent sends in flight
+        max_retries: retries after the first failed attempt
+        backoff: base delay in seconds; doubles after every failed attempt
+        today: returns the current day, injectable for tests
+    """
+
+    def __init__(
+        self,
+        service: BaseEmailService,
+        outbox_path: Optional[str] = None,
+        daily_limit: int = config.EMAIL_LIMIT_PER_DAY,
+        rate_per_second: float = config.EMAIL_SEND_RATE_PER_SECOND,
+        burst: Optional[float] = config.EMAIL_SEND_BURST,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        today: Callable[[], date] = date.today,
+    ) -> None:
+        self.service = service
+        self.outbox = Outbox(outbox_path or config.EMAIL_OUTBOX_PATH)
+        self.daily_limit = daily_limit
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._today = today
+        self.outbox.recover()
+
+    def close(self) -> None:
+        self.outbox.close()
+
+    def __enter__(self) -> "EmailSendingEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def remaining_today(self) -> int:
+        """Emails that can still be sent today."""
+        return max(self.daily_limit - self.outbox.quota_used(self._today().isoformat()), 0)
+
+    def enqueue(self, messages: Iterable[EmailMessage], key: Optional[str] = None) -> int:
+        """Queue messages durably without sending them; see `Outbox.enqueue` for ``key``."""
+        return self.outbox.enqueue(messages, key)
+
+    def send_bulk(self, messages: Iterable[EmailMessage]) -> SendReport:
+        """Queue ``messages`` and send as many queued emails as today's quota allows."""
+        self.enqueue(messages)
+        return self.run()
+
+    def run(self) -> SendReport:
+        """Send queued emails until the queue is empty or the quota is used up."""
+        day = self._today().isoformat()
+        sent = failed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="escale-email") as pool:
+            in_flight = set()
+            while True:
+                free = 2 * self.max_workers - len(in_flight)
+                claimed = self.outbox.reserve_and_claim(day, self.daily_limit, free) if free > 0 else []
+                for message_id, attempts, message in claimed:
+                    in_flight.add(pool.submit(self._deliver, day, message_id, attempts, message))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.result():
+                        sent += 1
+                    else:
+                        failed += 1
+        return SendReport(sent, failed, self.outbox.count("pending"))
+
+    def _deliver(self, day: str, message_id: int, attempts: int, message: EmailMessage) -> bool:
+        error = ""
+        for retry in range(self.max_retries + 1):
+            if retry:
+                time.sleep(self.backoff * (2 ** (retry - 1)))
+            self.bucket.acquire()
+            attempts += 1
+            try:
+                self.service.send_email(*message)
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                continue
+            self.outbox.mark_sent(message_id, attempts)
+            return True
+        self.outbox.mark_failed(message_id, attempts, error, day)
+        return False
+
+
+__all__ = ["EmailSendingEngine", "Outbox", "SendReport", "TokenBucket"]
@@ -9,14 +9,39 @@ Usage:
     from escale_ai.tools.email_service import MockEmailService
     email_service = MockEmailService()
     email_service.send_email(to_address="example@example.com", subject="Hello", body="Hi there!")
+
+Rate-limited, quota-aware bulk sending lives in `escale_ai.tools.email_sender`.
+
+Async providers implement `AsyncBaseEmailService` and share connections
+through an `escale_ai.tools.pool.ConnectionPool`:
+
+    service = AsyncMockEmailService(latency=0.02, connect_latency=0.1)
+    await service.send_bulk(messages, concurrency=20)
+    await service.aclose()
 """
 
+import threading
+import time
 from abc import ABC, abstractmethod
+from typing import Iterable, NamedTuple, Optional
+
+from ..metrics import InstrumentedTool
+from .pool import ConnectionPool, LocalConnection, LocalProvider, run_bounded
+
+
+class EmailMessage(NamedTuple):
+    """A single outgoing email."""
 
+    to_address: str
+    subject: str
+    body: str
 
-class BaseEmailService(ABC):
+
+class BaseEmailService(InstrumentedTool, ABC):
     """Abstract base class for sending emails."""
 
+    instrumented = ("send_email", "send_bulk")
+
     @abstractmethod
     def send_email(self, to_address: str, subject: str, body: str) -> None:
         """Send an email to the given address.
@@ -28,9 +53,40 @@ class BaseEmailService(ABC):
         """
         raise NotImplementedError
 
+    def send_bulk(self, messages: Iterable[EmailMessage]) -> int:
+        """Send several emails.
+
+        The default implementation sends them one by one; providers with a
+        batch API should override it. This method does not enforce any rate
+        limit or daily quota; use `EmailSendingEngine` for that.
+
+        Args:
+            messages: emails to send; consumed lazily
+
+        Returns:
+            Number of emails sent.
+        """
+        sent = 0
+        for message in messages:
+            self.send_email(*message)
+            sent += 1
+        return sent
+
 
 class MockEmailService(BaseEmailService):
-    """Mock email service that prints email contents instead of sending them."""
+    """Mock email service that prints email contents instead of sending them.
+
+    Args:
+        latency: seconds each send blocks for, to emulate a provider round-trip
+            when benchmarking throughput offline
+        echo: print each email; disable it for benchmarks
+    """
+
+    def __init__(self, latency: float = 0.0, echo: bool = True) -> None:
+        self.latency = latency
+        self.echo = echo
+        self.sent = 0
+        self._lock = threading.Lock()
 
     def send_email(self, to_address: str, subject: str, body: str) -> None:
         """Pretend to send an email by printing its contents.
@@ -40,9 +96,76 @@ class MockEmailService(BaseEmailService):
             subject: subject line of the email
             body: body text of the email
         """
-        print(f"Sending email to {to_address}:")
-        print(f"Subject: {subject}")
-        print(f"Body: {body}")
+        if self.latency:
+            time.sleep(self.latency)
+        if self.echo:
+            print(f"Sending email to {to_address}:")
+            print(f"Subject: {subject}")
+            print(f"Body: {body}")
+        with self._lock:
+            self.sent += 1
+
+
+class AsyncBaseEmailService(InstrumentedTool, ABC):
+    """Async counterpart of `BaseEmailService` for providers reached over the network."""
+
+    instrumented = ("send_email", "send_bulk")
+
+    @abstractmethod
+    async def send_email(self, to_address: str, subject: str, body: str) -> None:
+        """Send an email to the given address.
+
+        Args:
+            to_address: recipient's email address
+            subject: subject line of the email
+            body: body text of the email
+        """
+        raise NotImplementedError
+
+    async def send_bulk(self, messages: Iterable[EmailMessage], concurrency: int = 10) -> int:
+        """Send several emails with at most ``concurrency`` requests in flight.
+
+        Args:
+            messages: emails to send; consumed lazily
+            concurrency: concurrent sends; the provider's pool may cap it further
+
+        Returns:
+            Number of emails sent.
+        """
+        return await run_bounded(lambda message: self.send_email(*message), messages, concurrency)
+
+    async def aclose(self) -> None:
+        """Release the service's connections; pending sends finish first."""
+
+
+class AsyncMockEmailService(LocalProvider, AsyncBaseEmailService):
+    """Local stand-in for an async email provider.
+
+    Each send performs one simulated request on a pooled `LocalConnection`.
+
+    Args:
+        pool: connection pool shared with other services of the provider
+        latency: seconds each send takes once connected
+        connect_latency: seconds to open a connection
+        echo: print each email
+    """
+
+    provider = "email"
+
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool[LocalConnection]] = None,
+        latency: float = 0.0,
+        connect_latency: float = 0.0,
+        echo: bool = False,
+    ) -> None:
+        super().__init__(pool, latency, connect_latency)
+        self.echo = echo
+
+    async def send_email(self, to_address: str, subject: str, body: str) -> None:
+        await self._request()
+        if self.echo:
+            print(f"Sending email to {to_address}: {subject}")
 
 
-__all__ = ["BaseEmailService", "MockEmailService"]
+__all__ = ["BaseEmailService", "MockEmailService", "EmailMessage", "AsyncBaseEmailService", "AsyncMockEmailService"]
@@ -0,0 +1,522 @@
+"""
+Persistent, memory-mapped lead index.
+
+The index keeps every lead ever ingested in a compact append-only data file
+and a memory-mapped open-addressing hash table keyed by the normalized email
+(and by the clinic's domain). Lookups and duplicate checks are O(1) and do
+not require re-reading the source CSV files. New exports are ingested
+incrementally: the byte offset reached in each CSV is remembered, so only
+rows appended since the previous run are parsed.
+
+Files written next to ``path``:
+
+- ``<path>.dat``: one compact JSON array per lead, in `LeadIndex.FIELDS` order.
+- ``<path>.idx``: the hash table (header + fixed-size slots).
+- ``<path>.sources.json``: CSV path -> byte offset already ingested.
+
+Usage:
+    from escale_ai.tools.lead_index import LeadIndex
+    with LeadIndex("data/lead_index") as index:
+        index.ingest_csv("data/leads.csv")
+        if "lead@example.com" not in index:
+            ...
+        for lead in index.query(state="FL", services="botox", limit=50):
+            ...
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .lead_source import CSVLeadSource
+
+_MAGIC = b"ESLIDX01"
+# magic, capacity, leads, occupied slots, bytes of the data file covered
+_HEADER = struct.Struct("<8sQQQQ")
+# 64-bit key hash, data offset + 1 (0 marks an empty slot)
+_SLOT = struct.Struct("<QQ")
+_INITIAL_CAPACITY = 1024
+_MAX_LOAD = 0.5
+
+#: Webmail providers are shared by unrelated clinics, so they are never
+#: used as a clinic's domain key.
+FREE_MAIL_DOMAINS = frozenset(
+    {
+        "gmail.com",
+        "googlemail.com",
+        "yahoo.com",
+        "hotmail.com",
+        "outlook.com",
+        "live.com",
+        "aol.com",
+        "icloud.com",
+        "me.com",
+        "msn.com",
+        "protonmail.com",
+    }
+)
+
+
+def normalize_email(email: str) -> str:
+    """Return the canonical form of an email address used as index key."""
+    return email.strip().lower()
+
+
+def normalize_domain(value: str) -> str:
+    """Return the bare domain of an email address or website URL."""
+    value = value.strip().lower()
+    if "@" in value:
+        value = value.rsplit("@", 1)[1]
+    for prefix in ("https://", "http://"):
+        if value.startswith(prefix):
+            value = value[len(prefix):]
+    value = value.split("/", 1)[0].split(":", 1)[0]
+    if value.startswith("www."):
+        value = value[4:]
+    return value
+
+
+def _key_hash(key: str) -> int:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class LeadIndex:
+    """Memory-mapped lead store with O(1) dedup by email and domain."""
+
+    FIELDS: Tuple[str, ...] = (
+        "email",
+        "domain",
+        "clinic_name",
+        "website",
+        "city",
+        "state",
+        "instagram",
+        "services",
+        "notes",
+    )
+    #: CSV columns read when ingesting an export.
+    CSV_COLUMNS: Tuple[str, ...] = (
+        "clinic_name",
+        "email",
+        "website",
+        "city",
+        "state",
+        "instagram",
+        "services",
+        "notes",
+    )
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.getenv("LEADS_INDEX_PATH", "data/lead_index")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._data_path = self.path + ".dat"
+        self._index_path = self.path + ".idx"
+        self._sources_path = self.path + ".sources.json"
+
+        self._data = open(self._data_path, "a+b")
+        self._data_map: Optional[mmap.mmap] = None
+        self._index_file = None
+        self._index: Optional[mmap.mmap] = None
+        self._capacity = 0
+        self._count = 0
+        self._used = 0
+        self._covered = 0
+        # Slots of records not yet fsynced to the data file: key hash ->
+        # data offsets. They are only published to the mapped table by
+        # `flush`, so the table never points at data lost in a crash.
+        self._pending: Dict[int, List[int]] = {}
+        self._end = os.fstat(self._data.fileno()).st_size
+        self._open_index()
+        self._drop_dangling()
+        self._recover_tail()
+        self._sources = self._load_sources()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def close(self) -> None:
+        """Flush pending writes and release the mapped files."""
+        if self._index is None:
+            return
+        self.flush()
+        if self._data_map is not None:
+            self._data_map.close()
+            self._data_map = None
+        self._index.close()
+        self._index = None
+        self._index_file.close()
+        self._data.close()
+
+    def flush(self) -> None:
+        """Persist the data file, the hash table and the ingest offsets."""
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._publish()
+        self._write_header()
+        self._index.flush()
+        tmp_path = self._sources_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._sources, f)
+        os.replace(tmp_path, self._sources_path)
+
+    def __enter__(self) -> "LeadIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, email: object) -> bool:
+        return isinstance(email, str) and self.contains_email(email)
+
+    def contains_email(self, email: str) -> bool:
+        """Return True if a lead with this email was already indexed."""
+        return self._find(normalize_email(email), domain=False) is not None
+
+    def contains_domain(self, domain: str) -> bool:
+        """Return True if a lead for this clinic domain was already indexed."""
+        return self._find(normalize_domain(domain), domain=True) is not None
+
+    def get(self, email: str) -> Optional[Dict[str, str]]:
+        """Return the stored lead for ``email`` or None."""
+        offset = self._find(normalize_email(email), domain=False)
+        return None if offset is None else self._read_record(offset)
+
+    def query(
+        self,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        services: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict[str, str]]:
+        """Stream indexed leads matching all given filters.
+
+        Args:
+            state: exact state (case-insensitive), e.g. ``"FL"``
+            city: exact city (case-insensitive)
+            services: keyword that must appear in the lead's services
+            limit: maximum number of leads to yield
+
+        Yields:
+            Lead dictionaries keyed by `FIELDS`, in ingestion order.
+        """
+        state_key = state.strip().lower() if state else None
+        city_key = city.strip().lower() if city else None
+        service_key = services.strip().lower() if services else None
+        # Cheap byte-level pre-filter before decoding each record. Only plain
+        # ASCII values are safe to match against the raw JSON bytes.
+        needles = [
+            value.encode("ascii")
+            for value in (state_key, city_key, service_key)
+            if value and value.isascii() and '"' not in value and "\\" not in value
+        ]
+        state_pos = self.FIELDS.index("state")
+        city_pos = self.FIELDS.index("city")
+        services_pos = self.FIELDS.index("services")
+
+        emitted = 0
+        for line in self._iter_lines():
+            if limit is not None and emitted >= limit:
+                return
+            if needles:
+                lowered = line.lower()
+                if not all(needle in lowered for needle in needles):
+                    continue
+            values = json.loads(line)
+            if state_key and values[state_pos].strip().lower() != state_key:
+                continue
+            if city_key and values[city_pos].strip().lower() != city_key:
+                continue
+            if service_key and service_key not in values[services_pos].lower():
+                continue
+            emitted += 1
+            yield dict(zip(self.FIELDS, values))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def add(self, lead: Mapping[str, str]) -> bool:
+        """Index a lead unless its email is already known.
+
+        Accepts CSV-style rows (``clinic_name``/``email``) as well as the
+        ``name``/``contact`` dictionaries returned by lead sources.
+
+        Returns:
+            True if the lead was new and has been stored.
+        """
+        email = normalize_email(lead.get("email") or lead.get("contact") or "")
+        if not email:
+            return False
+        found, email_hash = self._locate(email, domain=False)
+        if found is not None:
+            return False
+        domain = normalize_domain(email)
+        if domain in FREE_MAIL_DOMAINS:
+            domain = normalize_domain(lead.get("website") or "")
+        record = {
+            "email": email,
+            "domain": domain,
+            "clinic_name": lead.get("clinic_name") or lead.get("name") or "",
+        }
+        values = [record.get(field, lead.get(field) or "") for field in self.FIELDS]
+        line = json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        # The file is opened in append mode, so writes always land at the
+        # tracked end offset; seeking here would flush the buffer per lead.
+        offset = self._end
+        self._data.write(line)
+        self._end += len(line)
+        self._insert(email_hash, offset, domain)
+        return True
+
+    def add_many(self, leads: Iterable[Mapping[str, str]]) -> int:
+        """Index several leads and return how many were new."""
+        return sum(1 for lead in leads if self.add(lead))
+
+    def ingest_csv(self, csv_path: str, batch_size: int = 5000) -> int:
+        """Index the rows appended to ``csv_path`` since the last ingest.
+
+        Args:
+            csv_path: path to a leads CSV export
+            batch_size: rows parsed per batch; bounds memory use
+
+        Returns:
+            Number of new (non-duplicate) leads indexed.
+        """
+        key = os.path.abspath(csv_path)
+        offset = self._sources.get(key, 0)
+        try:
+            if os.path.getsize(csv_path) < offset:
+                # The export was replaced by a shorter file: rescan it; the
+                # email keys keep already indexed leads from duplicating.
+                offset = 0
+        except OSError:
+            return 0
+        added = 0
+        source = CSVLeadSource(csv_path)
+        for batch in source.iter_leads(batch_size=batch_size, offset=offset, columns=self.CSV_COLUMNS):
+            added += self.add_many(batch.leads)
+            self._sources[key] = batch.offset
+            self.flush()
+        return added
+
+    # ------------------------------------------------------------------
+    # Hash table internals
+    # ------------------------------------------------------------------
+    def _open_index(self) -> None:
+        exists = os.path.exists(self._index_path) and os.path.getsize(self._index_path) >= _HEADER.size
+        if not exists:
+            self._create_index(self._index_path, _INITIAL_CAPACITY)
+        self._index_file = open(self._index_path, "r+b")
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+        magic, self._capacity, self._count, self._used, self._covered = _HEADER.unpack_from(self._index, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self._index_path} is not a lead index file")
+
+    @staticmethod
+    def _create_index(path: str, capacity: int) -> None:
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, capacity, 0, 0, 0))
+            f.truncate(_HEADER.size + capacity * _SLOT.size)
+
+    def _drop_dangling(self) -> None:
+        """Rebuild the table if it points past the end of the data file.
+
+        The mapped table can reach the disk before the data it indexes (an
+        index written by an older version, or a data file restored from a
+        backup), so slots beyond EOF are discarded on open. Linear probing
+        cannot delete single slots, so the table is cleared and
+        `_recover_tail` re-indexes the whole data file.
+        """
+        with memoryview(self._index)[_HEADER.size:] as slots, slots.cast("Q") as words:
+            furthest = max(words[1::2], default=0)
+        if furthest <= self._end and self._covered <= self._end:
+            return
+        self._index[_HEADER.size:] = bytes(len(self._index) - _HEADER.size)
+        self._count = self._used = self._covered = 0
+        self._pending.clear()
+        self._write_header_at(0)
+
+    def _write_header(self) -> None:
+        self._write_header_at(self._end)
+
+    def _write_header_at(self, covered: int) -> None:
+        self._covered = covered
+        _HEADER.pack_into(self._index, 0, _MAGIC, self._capacity, self._count, self._used, self._covered)
+
+    def _recover_tail(self) -> None:
+        """Index records appended to the data file after the last flush."""
+        self._data.seek(0, os.SEEK_END)
+        size = self._data.tell()
+        if size <= self._covered:
+            return
+        self._data.seek(self._covered)
+        offset = self._covered
+        for line in iter(self._data.readline, b""):
+            if not line.endswith(b"\n"):
+                # Torn write: drop the partial record.
+                self._data.truncate(offset)
+                self._end = offset
+                break
+            values = json.loads(line)
+            found, email_hash = self._locate(values[0], domain=False)
+            if found is None:
+                self._insert(email_hash, offset, values[1])
+            offset += len(line)
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._publish()
+        self._write_header()
+
+    def _slot_position(self, slot: int) -> int:
+        return _HEADER.size + slot * _SLOT.size
+
+    def _locate(self, key: str, domain: bool) -> Tuple[Optional[int], int]:
+        """Probe the table for ``key``.
+
+        Returns:
+            The data offset of the matching record (or None) and the key hash,
+            which callers reuse when inserting a missing key.
+        """
+        key_hash = _key_hash("@" + key if domain else key)
+        field = 1 if domain else 0
+        index, unpack = self._index, _SLOT.unpack_from
+        mask = self._capacity - 1
+        slot = key_hash & mask
+        while True:
+            stored_hash, stored_offset = unpack(index, _HEADER.size + slot * _SLOT.size)
+            if stored_offset == 0:
+                for offset in self._pending.get(key_hash, ()):
+                    if self._read_values(offset)[field] == key:
+                        return offset, key_hash
+                return None, key_hash
+            if stored_hash == key_hash:
+                offset = stored_offset - 1
+                # 64-bit hashes practically never collide, but verify anyway.
+                if self._read_values(offset)[field] == key:
+                    return offset, key_hash
+            slot = (slot + 1) & mask
+
+    def _find(self, key: str, domain: bool) -> Optional[int]:
+        if not key:
+            return None
+        return self._locate(key, domain)[0]
+
+    def _insert(self, email_hash: int, offset: int, domain: str) -> None:
+        hashes = [email_hash]
+        if domain:
+            found, domain_hash = self._locate(domain, domain=True)
+            if found is None:
+                hashes.append(domain_hash)
+        if self._used + len(hashes) > self._capacity * _MAX_LOAD:
+            self._grow()
+        for key_hash in hashes:
+            self._pending.setdefault(key_hash, []).append(offset)
+        self._used += len(hashes)
+        # Only email keys count as leads; domain keys ride along.
+        self._count += 1
+
+    def _publish(self) -> None:
+        """Write the pending slots into the table; the data must be on disk."""
+        index, unpack = self._index, _SLOT.unpack_from
+        mask = self._capacity - 1
+        for key_hash, offsets in self._pending.items():
+            for offset in offsets:
+                slot = key_hash & mask
+                while unpack(index, _HEADER.size + slot * _SLOT.size)[1]:
+                    slot = (slot + 1) & mask
+                _SLOT.pack_into(index, _HEADER.size + slot * _SLOT.size, key_hash, offset + 1)
+        self._pending.clear()
+
+    def _grow(self) -> None:
+        """Double the table, rehashing slots from their stored hashes."""
+        old_index, old_capacity = self._index, self._capacity
+        new_capacity = old_capacity * 2
+        tmp_path = self._index_path + ".tmp"
+        self._create_index(tmp_path, new_capacity)
+        with open(tmp_path, "r+b") as f:
+            new_index = mmap.mmap(f.fileno(), 0)
+            mask = new_capacity - 1
+            for slot in range(old_capacity):
+                stored_hash, stored_offset = _SLOT.unpack_from(old_index, self._slot_position(slot))
+                if stored_offset == 0:
+                    continue
+                position = stored_hash & mask
+                while _SLOT.unpack_from(new_index, _HEADER.size + position * _SLOT.size)[1]:
+                    position = (position + 1) & mask
+                _SLOT.pack_into(new_index, _HEADER.size + position * _SLOT.size, stored_hash, stored_offset)
+            # Keep the last flushed counters: pending slots are not in the table yet.
+            _, _, count, used, covered = _HEADER.unpack_from(old_index, 0)
+            _HEADER.pack_into(new_index, 0, _MAGIC, new_capacity, count, used, covered)
+            new_index.flush()
+            new_index.close()
+        old_index.close()
+        self._index_file.close()
+        os.replace(tmp_path, self._index_path)
+        self._index_file = open(self._index_path, "r+b")
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+        self._capacity = new_capacity
+
+    # ------------------------------------------------------------------
+    # Data file internals
+    # ------------------------------------------------------------------
+    def _mapped_data(self, offset: int = -1) -> Optional[mmap.mmap]:
+        """Return a read-only map of the data file covering ``offset``.
+
+        The map is only refreshed when a record beyond its end is needed
+        (or, with the default offset, when the file grew), so lookups during
+        bulk ingestion do not remap the file on every call.
+        """
+        if self._data_map is not None and 0 <= offset < len(self._data_map):
+            return self._data_map
+        self._data.flush()
+        size = os.fstat(self._data.fileno()).st_size
+        if size == 0:
+            return None
+        if self._data_map is None or len(self._data_map) != size:
+            if self._data_map is not None:
+                self._data_map.close()
+            self._data_map = mmap.mmap(self._data.fileno(), size, access=mmap.ACCESS_READ)
+        return self._data_map
+
+    def _read_values(self, offset: int) -> list:
+        data = self._mapped_data(offset)
+        end = data.find(b"\n", offset)
+        return json.loads(data[offset:end])
+
+    def _read_record(self, offset: int) -> Dict[str, str]:
+        return dict(zip(self.FIELDS, self._read_values(offset)))
+
+    def _iter_lines(self) -> Iterator[bytes]:
+        data = self._mapped_data()
+        if data is None:
+            return
+        start, size = 0, len(data)
+        while start < size:
+            end = data.find(b"\n", start)
+            if end == -1:
+                return
+            yield data[start:end]
+            start = end + 1
+
+    def _load_sources(self) -> Dict[str, int]:
+        try:
+            with open(self._sources_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+
+__all__ = ["LeadIndex", "normalize_email", "normalize_domain", "FREE_MAIL_DOMAINS"]
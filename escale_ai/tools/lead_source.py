@@ -9,61 +9,234 @@ and testing purposes.
 Usage:
     from escale_ai.tools.lead_source import MockLeadSource
     leads = MockLeadSource().fetch_leads(limit=10)
+
+Large CSV exports should be consumed in batches so memory stays flat and a
+run can pick up where the previous one stopped:
+
+    source = CSVLeadSource("data/leads.csv")
+    for batch in source.iter_leads(batch_size=1000, offset=saved_offset):
+        handle(batch.leads)
+        saved_offset = batch.offset
+
+Remote lead databases implement `AsyncBaseLeadSource`;
+`AsyncMockLeadSource` simulates one behind a connection pool.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
 import csv
 import os
+import time
+
+from ..metrics import InstrumentedTool
+from .pool import LocalProvider
 
-class BaseLeadSource(ABC):
+class BaseLeadSource(InstrumentedTool, ABC):
     """Abstract base class for lead source services."""
+
+    instrumented = ("fetch_leads",)
+
     @abstractmethod
     def fetch_leads(self, limit: int = 10) -> List[Dict[str, str]]:
         """Return a list of leads. Each lead must have 'name' and 'contact'."""
         raise NotImplementedError
 
+def _synthetic_leads(limit: int) -> List[Dict[str, str]]:
+    return [
+        {"name": f"Lead {i+1}", "contact": f"lead{i+1}@example.com"}
+        for i in range(limit)
+    ]
+
 class MockLeadSource(BaseLeadSource):
-    """A simple mock lead source used for testing and development."""
+    """A simple mock lead source used for testing and development.
+
+    Args:
+        latency: seconds each call blocks for, to emulate a provider round-trip
+    """
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+
     def fetch_leads(self, limit: int = 10) -> List[Dict[str, str]]:
-        return [
-            {"name": f"Lead {i+1}", "contact": f"lead{i+1}@example.com"}
-            for i in range(limit)
-        ]
+        """
+        Return a list of synthetic leads.
+
+        Returns:
+            List of dictionaries with 'name' and 'contact' fields.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        return _synthetic_leads(limit)
+
+
+class AsyncBaseLeadSource(InstrumentedTool, ABC):
+    """Async counterpart of `BaseLeadSource`."""
+
+    instrumented = ("fetch_leads",)
+
+    @abstractmethod
+    async def fetch_leads(self, limit: int = 10) -> List[Dict[str, str]]:
+        """Return a list of leads. Each lead must have 'name' and 'contact'."""
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Release the source's connections."""
+
+
+class AsyncMockLeadSource(LocalProvider, AsyncBaseLeadSource):
+    """Local stand-in for a remote lead database; each query is one pooled request."""
+
+    provider = "leads"
+
+    async def fetch_leads(self, limit: int = 10) -> List[Dict[str, str]]:
+        await self._request()
+        return _synthetic_leads(limit)
+
+
+class LeadBatch(NamedTuple):
+    """A batch of leads streamed from a CSV file.
+
+    Attributes:
+        leads: The leads parsed in this batch.
+        offset: Byte offset just past the last row of the batch. Pass it
+            back to `CSVLeadSource.iter_leads` to resume after this batch.
+    """
+
+    leads: List[Dict[str, str]]
+    offset: int
+
 
 class CSVLeadSource(BaseLeadSource):
     """
     Lead source that reads leads from a CSV file.
     Expects at least 'clinic_name' and 'email' columns.
+
+    Rows are streamed from disk, so memory use depends on the batch size
+    and not on the size of the file.
     """
+
+    #: Column aliases used to build the default ``name``/``contact`` leads.
+    NAME_COLUMNS = ("clinic_name", "name")
+    CONTACT_COLUMNS = ("email", "contact")
+
     def __init__(self, csv_path: Optional[str] = None):
         self.csv_path = csv_path or os.getenv("LEADS_CSV_PATH", "data/leads.csv")
 
     def fetch_leads(self, limit: int = 10) -> List[Dict[str, str]]:
         leads: List[Dict[str, str]] = []
-        try:
-            with open(self.csv_path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if len(leads) >= limit:
-                        break
-                    name = row.get("clinic_name") or row.get("name")
-                    contact = row.get("email") or row.get("contact")
-                    if not name or not contact:
-                        continue
-                    leads.append({"name": name, "contact": contact})
-        except FileNotFoundError:
-            pass
+        if limit <= 0:
+            return leads
+        for batch in self.iter_leads(batch_size=limit):
+            leads.extend(batch.leads[: limit - len(leads)])
+            if len(leads) >= limit:
+                break
         return leads
 
+    def iter_leads(
+        self,
+        batch_size: int = 1000,
+        offset: int = 0,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Iterator[LeadBatch]:
+        """Stream leads from the CSV file in batches.
 
-            List of dictionaries with 'name' and 'contact' fields.
+        Only the requested columns are materialized for each row. Without
+        ``columns`` each lead is a ``{"name", "contact"}`` dict built from
+        the ``clinic_name``/``email`` columns and rows missing either value
+        are skipped. With ``columns`` each lead maps those column names to
+        their (possibly empty) values.
+
+        Args:
+            batch_size: maximum number of leads per yielded batch
+            offset: byte offset to resume from, as reported by a previous
+                `LeadBatch.offset`. ``0`` starts right after the header.
+            columns: optional list of CSV columns to project
+
+        Yields:
+            LeadBatch objects; the last one may be smaller than ``batch_size``.
         """
-        return [
-            {"name": f"Lead {i+1}", "contact": f"lead{i+1}@example.com"}
-            for i in range(limit)
-        ]
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        try:
+            f = open(self.csv_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            header_line = f.readline()
+            header = next(csv.reader([header_line.decode("utf-8-sig")]), None)
+            if not header:
+                return
+            if offset > f.tell():
+                f.seek(offset)
+            project = self._projection(header, columns)
+            if project is None:
+                return
+
+            # Track the byte position of the line feeding the csv reader so
+            # the offset of every complete row is known, even for quoted
+            # fields spanning several lines.
+            position = [f.tell()]
+
+            def lines() -> Iterator[str]:
+                for raw in iter(f.readline, b""):
+                    position[0] += len(raw)
+                    yield raw.decode("utf-8")
+
+            batch: List[Dict[str, str]] = []
+            for row in csv.reader(lines()):
+                lead = project(row)
+                if lead is None:
+                    continue
+                batch.append(lead)
+                if len(batch) >= batch_size:
+                    yield LeadBatch(batch, position[0])
+                    batch = []
+            if batch:
+                yield LeadBatch(batch, position[0])
+
+    def _projection(self, header: List[str], columns: Optional[Sequence[str]]):
+        """Build a function that extracts only the needed fields of a row."""
+        index = {name.strip(): i for i, name in enumerate(header)}
+        if columns is not None:
+            picks = [(name, index.get(name)) for name in columns]
+
+            def project_columns(row: List[str]) -> Optional[Dict[str, str]]:
+                if not row:
+                    return None
+                size = len(row)
+                return {
+                    name: row[i] if i is not None and i < size else ""
+                    for name, i in picks
+                }
+
+            return project_columns
+
+        name_idx = [index[c] for c in self.NAME_COLUMNS if c in index]
+        contact_idx = [index[c] for c in self.CONTACT_COLUMNS if c in index]
+        if not name_idx or not contact_idx:
+            return None
+
+        def first(row: List[str], candidates: List[int]) -> str:
+            size = len(row)
+            for i in candidates:
+                if i < size and row[i]:
+                    return row[i]
+            return ""
+
+        def project_default(row: List[str]) -> Optional[Dict[str, str]]:
+            name = first(row, name_idx)
+            contact = first(row, contact_idx)
+            if not name or not contact:
+                return None
+            return {"name": name, "contact": contact}
 
+        return project_default
 
-__all__ = ["BaseLeadSource", "MockLeadSource", "CSVLeadSource"]
 
+__all__ = [
+    "BaseLeadSource",
+    "MockLeadSource",
+    "CSVLeadSource",
+    "LeadBatch",
+    "AsyncBaseLeadSource",
+    "AsyncMockLeadSource",
+]
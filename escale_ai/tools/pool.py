@@ -0,0 +1,388 @@
+"""
+Shared connection pools for the async tool services.
+
+Real providers (email APIs, calendars, CRMs, lead databases) are reached
+over HTTP or database connections whose set-up (TCP + TLS handshake,
+authentication) costs far more than a request on an open connection.
+`ConnectionPool` keeps idle connections alive for reuse, caps how many are
+open at once (the provider's concurrency limit) and closes everything
+gracefully on shutdown: new requests are refused, in-flight ones are
+allowed to finish and idle connections are closed.
+
+`PoolManager` owns one pool per provider name so every service talking to
+the same provider shares its connections; ``config.TOOL_POOL_LIMITS``
+holds the default per-provider limits.
+
+`LocalConnection` is an in-process stand-in for a provider connection with
+configurable connect and request latencies. The async mock services use
+it, so the effect of pooling can be measured without a network.
+
+A pool belongs to the event loop it is first used on.
+
+Usage:
+    from escale_ai.tools.pool import PoolManager, local_connector
+
+    async with PoolManager() as pools:
+        pool = pools.pool("email", local_connector("email", connect_latency=0.05))
+        async with pool.connection() as conn:
+            await conn.request(latency=0.01)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from .. import config
+
+C = TypeVar("C")
+T = TypeVar("T")
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when a connection is requested from a closed pool."""
+
+
+class PoolStats(NamedTuple):
+    """Counters of a `ConnectionPool`.
+
+    Attributes:
+        created: connections opened so far
+        reused: acquisitions served by an idle connection
+        in_use: connections currently checked out
+        idle: connections kept alive for reuse
+    """
+
+    created: int
+    reused: int
+    in_use: int
+    idle: int
+
+
+class ConnectionPool(Generic[C]):
+    """Bounded pool of reusable async connections.
+
+    Args:
+        connect: coroutine function opening a new connection
+        close: coroutine function closing a connection; defaults to calling
+            the connection's ``close()`` coroutine if it has one
+        max_size: connections open at the same time; further requests wait
+        max_idle: idle connections kept alive; ``0`` disables keep-alive
+        idle_timeout: seconds an idle connection may be reused
+        name: label used in errors
+        clock: monotonic time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[C]],
+        close: Optional[Callable[[C], Awaitable[None]]] = None,
+        max_size: int = 10,
+        max_idle: Optional[int] = None,
+        idle_timeout: float = config.TOOL_POOL_IDLE_TIMEOUT,
+        name: str = "pool",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self._connect = connect
+        self._close = close or _close_connection
+        self.max_size = max_size
+        self.max_idle = max_size if max_idle is None else max_idle
+        self.idle_timeout = idle_timeout
+        self.name = name
+        self._clock = clock
+        self._idle: Deque[Tuple[float, C]] = deque()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._released: Optional[asyncio.Condition] = None
+        self._in_use = 0
+        self._created = 0
+        self._reused = 0
+        self.closed = False
+
+    @property
+    def stats(self) -> PoolStats:
+        return PoolStats(self._created, self._reused, self._in_use, len(self._idle))
+
+    async def acquire(self) -> C:
+        """Take a connection, waiting while ``max_size`` are in use.
+
+        Raises:
+            PoolClosedError: if the pool is closed (or closes while waiting).
+        """
+        if self.closed:
+            raise PoolClosedError(f"{self.name} pool is closed")
+        slots = self._semaphore()
+        await slots.acquire()
+        if self.closed:
+            slots.release()
+            raise PoolClosedError(f"{self.name} pool is closed")
+        self._in_use += 1
+        try:
+            return await self._checkout()
+        except BaseException:
+            self._in_use -= 1
+            slots.release()
+            raise
+
+    async def release(self, connection: C, discard: bool = False) -> None:
+        """Return a connection; ``discard`` closes it instead (e.g. after an I/O error)."""
+        self._in_use -= 1
+        try:
+            if discard or self.closed or len(self._idle) >= self.max_idle:
+                await self._close(connection)
+            else:
+                # Most recently used last: reuse the warmest connection first.
+                self._idle.append((self._clock(), connection))
+        finally:
+            self._semaphore().release()
+            if self._released is not None:
+                async with self._released:
+                    self._released.notify_all()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[C]:
+        """``async with pool.connection() as conn``; the connection is
+        discarded if the block raises."""
+        connection = await self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            await self.release(connection, discard=True)
+            raise
+        await self.release(connection)
+
+    async def aclose(self, timeout: Optional[float] = None) -> None:
+        """Stop handing out connections, wait for checked-out ones and close all.
+
+        Args:
+            timeout: maximum seconds to wait for in-flight requests; the
+                remaining connections are closed when they come back.
+        """
+        self.closed = True
+        if self._released is None:
+            self._released = asyncio.Condition()
+        if self._in_use:
+            async with self._released:
+                try:
+                    await asyncio.wait_for(self._released.wait_for(lambda: self._in_use == 0), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        while self._idle:
+            _, connection = self._idle.popleft()
+            await self._close(connection)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the loop that uses the pool (Python 3.9).
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_size)
+        return self._slots
+
+    async def _checkout(self) -> C:
+        now = self._clock()
+        while self._idle:
+            last_used, connection = self._idle.pop()
+            if now - last_used <= self.idle_timeout:
+                self._reused += 1
+                return connection
+            await self._close(connection)
+        connection = await self._connect()
+        self._created += 1
+        return connection
+
+
+async def _close_connection(connection: Any) -> None:
+    close = getattr(connection, "close", None)
+    if close is not None:
+        result = close()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+class PoolManager:
+    """One `ConnectionPool` per provider, shared by every service using it.
+
+    Args:
+        limits: per-provider ``max_size``; defaults to ``config.TOOL_POOL_LIMITS``
+        idle_timeout: keep-alive of idle connections in seconds
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        idle_timeout: float = config.TOOL_POOL_IDLE_TIMEOUT,
+    ) -> None:
+        self.limits = dict(config.TOOL_POOL_LIMITS if limits is None else limits)
+        self.idle_timeout = idle_timeout
+        self._pools: Dict[str, ConnectionPool] = {}
+
+    def pool(
+        self,
+        provider: str,
+        connect: Callable[[], Awaitable[C]],
+        close: Optional[Callable[[C], Awaitable[None]]] = None,
+        max_size: Optional[int] = None,
+    ) -> ConnectionPool[C]:
+        """Return the provider's pool, creating it with ``connect`` on first use."""
+        pool = self._pools.get(provider)
+        if pool is None or pool.closed:
+            pool = self._pools[provider] = ConnectionPool(
+                connect,
+                close,
+                max_size=max_size or self.limits.get(provider, config.TOOL_POOL_DEFAULT_LIMIT),
+                idle_timeout=self.idle_timeout,
+                name=provider,
+            )
+        return pool
+
+    def __contains__(self, provider: object) -> bool:
+        return provider in self._pools
+
+    async def aclose(self, timeout: Optional[float] = None) -> None:
+        """Close every pool gracefully (see `ConnectionPool.aclose`)."""
+        pools, self._pools = list(self._pools.values()), {}
+        await asyncio.gather(*(pool.aclose(timeout) for pool in pools))
+
+    async def __aenter__(self) -> "PoolManager":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+async def run_bounded(fn: Callable[[T], Awaitable[Any]], items: Iterable[T], limit: int) -> int:
+    """Await ``fn(item)`` for every item with at most ``limit`` calls in flight.
+
+    The iterable is consumed lazily. The first exception cancels the
+    remaining calls and is re-raised.
+
+    Returns:
+        Number of calls made.
+    """
+    iterator = iter(items)
+    done = 0
+
+    async def worker() -> None:
+        nonlocal done
+        for item in iterator:
+            await fn(item)
+            done += 1
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(limit, 1))]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+    return done
+
+
+class LocalConnection:
+    """In-process stand-in for a provider connection.
+
+    Opening one sleeps ``connect_latency`` (handshake and authentication);
+    each request sleeps ``latency`` (the provider round-trip).
+    """
+
+    def __init__(self, provider: str) -> None:
+        self.provider = provider
+        self.requests = 0
+        self.closed = False
+
+    @classmethod
+    async def open(cls, provider: str, connect_latency: float = 0.0) -> "LocalConnection":
+        if connect_latency:
+            await asyncio.sleep(connect_latency)
+        return cls(provider)
+
+    async def request(self, latency: float = 0.0) -> None:
+        if self.closed:
+            raise ConnectionError(f"{self.provider} connection is closed")
+        if latency:
+            await asyncio.sleep(latency)
+        self.requests += 1
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def local_connector(provider: str, connect_latency: float = 0.0) -> Callable[[], Awaitable[LocalConnection]]:
+    """Return a ``connect`` function opening `LocalConnection` objects."""
+
+    async def connect() -> LocalConnection:
+        return await LocalConnection.open(provider, connect_latency)
+
+    return connect
+
+
+class LocalProvider:
+    """Base of the async mock services: a simulated remote provider.
+
+    Every call checks a `LocalConnection` out of ``pool`` and performs one
+    request on it. Without a pool the service opens its own, limited by
+    ``config.TOOL_POOL_LIMITS`` for the subclass's ``provider``. `aclose`
+    only closes a pool the service opened itself; a shared pool is closed
+    by its owner.
+
+    Args:
+        pool: shared pool, typically from `PoolManager.pool`
+        latency: seconds per request
+        connect_latency: seconds to open a connection
+    """
+
+    provider = "local"
+
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool[LocalConnection]] = None,
+        latency: float = 0.0,
+        connect_latency: float = 0.0,
+    ) -> None:
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self._owns_pool = pool is None
+        self.pool = pool or ConnectionPool(
+            local_connector(self.provider, connect_latency),
+            max_size=config.TOOL_POOL_LIMITS.get(self.provider, config.TOOL_POOL_DEFAULT_LIMIT),
+            name=self.provider,
+        )
+        self.calls = 0
+
+    async def _request(self) -> None:
+        async with self.pool.connection() as connection:
+            await connection.request(self.latency)
+        self.calls += 1
+
+    async def aclose(self) -> None:
+        if self._owns_pool:
+            await self.pool.aclose()
+
+
+__all__ = [
+    "ConnectionPool",
+    "PoolManager",
+    "PoolStats",
+    "PoolClosedError",
+    "LocalConnection",
+    "LocalProvider",
+    "local_connector",
+    "run_bounded",
+]
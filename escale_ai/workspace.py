@@ -0,0 +1,304 @@
+"""
+Persistent per-client workspaces.
+
+Every client gets a workspace holding its brand kit overrides, its limits,
+the state produced by its latest pipeline run and a bounded history of
+past runs. Workspaces live in a single SQLite file keyed by client name, so
+opening one is a primary-key lookup regardless of how many clients exist,
+and nothing is read until a client is actually used. History is only
+queried on demand.
+
+`WorkspaceStore` keeps a bounded LRU of hot workspaces, so a busy client's
+brand kit and limits are read from SQLite once. `WorkspaceStore.team`
+returns a new `ClientTeam` attached to the hot workspace on every call: a
+team holds the state of one run, so concurrent runs for the same client
+each get their own. Runs save their result back to the workspace
+automatically.
+
+Usage:
+    from escale_ai.workspace import WorkspaceStore
+
+    store = WorkspaceStore("data/workspaces.sqlite3")
+    team = store.team("Clinic A")
+    team.run_pipeline()
+    print(store.open("Clinic A").state, store.open("Clinic A").history(limit=5))
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Optional
+
+from . import config
+from .cache import StageCache
+from .client_team import ClientTeam
+from .scheduler import FairScheduler
+
+if TYPE_CHECKING:
+    from .agent_pool import AgentPool
+    from .assets import AssetStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workspaces (
+    client_name TEXT PRIMARY KEY,
+    brand_kit TEXT NOT NULL,
+    limits TEXT NOT NULL,
+    state TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_name TEXT NOT NULL,
+    ran_at REAL NOT NULL,
+    context TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_client ON history (client_name, id);
+"""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+class Workspace:
+    """One client's persisted settings, latest state and run history.
+
+    Obtain workspaces from `WorkspaceStore.open`; changes made through the
+    ``update_*`` methods and `record_run` are written immediately.
+
+    Attributes:
+        client_name: The client the workspace belongs to.
+        brand_kit_overrides: Client values replacing ``config.DEFAULT_BRAND_KIT``.
+        limit_overrides: Client values replacing ``config.DEFAULT_CLIENT_LIMITS``.
+        state: Context produced by the latest run, or None.
+    """
+
+    def __init__(
+        self,
+        store: "WorkspaceStore",
+        client_name: str,
+        brand_kit: Dict[str, str],
+        limits: Dict[str, Any],
+        state: Optional[Dict[str, Any]],
+    ) -> None:
+        self._store = store
+        self.client_name = client_name
+        self.brand_kit_overrides = brand_kit
+        self.limit_overrides = limits
+        self.state = state
+
+    @property
+    def brand_kit(self) -> Dict[str, str]:
+        return {**config.DEFAULT_BRAND_KIT, **self.brand_kit_overrides}
+
+    @property
+    def limits(self) -> Dict[str, Any]:
+        return {**config.DEFAULT_CLIENT_LIMITS, **self.limit_overrides}
+
+    def update_brand_kit(self, changes: Mapping[str, str]) -> None:
+        # Mutated in place: attached teams read the same dict.
+        self.brand_kit_overrides.update(changes)
+        self._store._save_settings(self)
+
+    def update_limits(self, changes: Mapping[str, Any]) -> None:
+        self.limit_overrides.update(changes)
+        self._store._save_settings(self)
+
+    def record_run(self, context: Mapping[str, Any]) -> None:
+        """Save ``context`` as the latest state and append it to the history."""
+        self.state = dict(context)
+        self._store._record_run(self.client_name, self.state)
+
+    def history(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` past runs, newest first, as ``{"ran_at", "context"}``."""
+        return self._store._history(self.client_name, limit)
+
+    def __repr__(self) -> str:
+        return f"Workspace({self.client_name!r})"
+
+
+class WorkspaceStore:
+    """SQLite-backed collection of client workspaces with a hot workspace cache.
+
+    Args:
+        path: SQLite file; ``":memory:"`` keeps everything in memory
+        max_hot_teams: workspaces kept loaded in memory for `team`
+        history_limit: past runs kept per client
+        stage_cache: cache handed to the teams created by `team`
+        scheduler: `escale_ai.scheduler.FairScheduler` handed to those teams
+        asset_store: `escale_ai.assets.AssetStore` handed to those teams
+    """
+
+    def __init__(
+        self,
+        path: str = config.WORKSPACE_DB_PATH,
+        max_hot_teams: int = config.WORKSPACE_HOT_TEAMS,
+        history_limit: int = config.WORKSPACE_HISTORY_LIMIT,
+        stage_cache: Optional[StageCache] = None,
+        scheduler: Optional[FairScheduler] = None,
+        asset_store: Optional["AssetStore"] = None,
+    ) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_hot_teams = max_hot_teams
+        self.history_limit = history_limit
+        self.stage_cache = stage_cache
+        self.scheduler = scheduler
+        self.asset_store = asset_store
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        self._hot: "OrderedDict[str, Workspace]" = OrderedDict()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._hot.clear()
+            self._conn.close()
+
+    def __enter__(self) -> "WorkspaceStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, client_name: str) -> Optional[Workspace]:
+        """Load an existing workspace, or return None."""
+        with self._lock:
+            workspace = self._hot.get(client_name)
+            if workspace is not None:
+                return workspace
+            row = self._conn.execute(
+                "SELECT brand_kit, limits, state FROM workspaces WHERE client_name = ?", (client_name,)
+            ).fetchone()
+        if row is None:
+            return None
+        state = json.loads(row[2]) if row[2] is not None else None
+        return Workspace(self, client_name, json.loads(row[0]), json.loads(row[1]), state)
+
+    def open(self, client_name: str, brand_kit: Optional[Mapping[str, str]] = None) -> Workspace:
+        """Load the client's workspace, creating it on first use.
+
+        Args:
+            client_name: The client.
+            brand_kit: Optional overrides merged into the stored brand kit.
+        """
+        with self._lock:
+            workspace = self.get(client_name)
+            if workspace is None:
+                now = time.time()
+                self._conn.execute(
+                    "INSERT INTO workspaces (client_name, brand_kit, limits, created_at, updated_at)"
+                    " VALUES (?, '{}', '{}', ?, ?)",
+                    (client_name, now, now),
+                )
+                workspace = Workspace(self, client_name, {}, {}, None)
+            if brand_kit:
+                workspace.update_brand_kit(brand_kit)
+            return workspace
+
+    def team(
+        self,
+        client_name: str,
+        brand_kit: Optional[Mapping[str, str]] = None,
+        agent_pool: Optional["AgentPool"] = None,
+        priority: Optional[int] = None,
+        deadline: Optional[float] = None,
+        stage_cache: Optional[StageCache] = None,
+        scheduler: Optional[FairScheduler] = None,
+        asset_store: Optional["AssetStore"] = None,
+    ) -> ClientTeam:
+        """Return a new `ClientTeam` attached to the client's hot workspace.
+
+        Workspaces are loaded on first use and the least recently used one
+        is dropped once more than ``max_hot_teams`` are held. Teams are
+        cheap (their agents come from ``agent_pool`` or are built lazily),
+        so every run gets its own, with its own ``priority`` and
+        ``deadline`` (see `ClientTeam`). ``stage_cache``, ``scheduler`` and
+        ``asset_store`` override the store's own for this team.
+        """
+        with self._lock:
+            workspace = self._hot.get(client_name)
+            if workspace is None:
+                workspace = self.open(client_name, brand_kit)
+                self._hot[client_name] = workspace
+                while len(self._hot) > self.max_hot_teams:
+                    self._hot.popitem(last=False)
+            else:
+                self._hot.move_to_end(client_name)
+                if brand_kit:
+                    workspace.update_brand_kit(brand_kit)
+        return ClientTeam(
+            client_name,
+            stage_cache=self.stage_cache if stage_cache is None else stage_cache,
+            workspace=workspace,
+            agent_pool=agent_pool,
+            scheduler=self.scheduler if scheduler is None else scheduler,
+            priority=priority,
+            deadline=deadline,
+            asset_store=self.asset_store if asset_store is None else asset_store,
+        )
+
+    def __contains__(self, client_name: object) -> bool:
+        with self._lock:
+            if client_name in self._hot:
+                return True
+            return self._conn.execute(
+                "SELECT 1 FROM workspaces WHERE client_name = ?", (client_name,)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM workspaces").fetchone()[0]
+
+    def names(self) -> Iterator[str]:
+        """Iterate over client names in alphabetical order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT client_name FROM workspaces ORDER BY client_name").fetchall()
+        for (name,) in rows:
+            yield name
+
+    def _save_settings(self, workspace: Workspace) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE workspaces SET brand_kit = ?, limits = ?, updated_at = ? WHERE client_name = ?",
+                (_dumps(workspace.brand_kit_overrides), _dumps(workspace.limit_overrides), time.time(), workspace.client_name),
+            )
+
+    def _record_run(self, client_name: str, state: Mapping[str, Any]) -> None:
+        payload, now = _dumps(state), time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "UPDATE workspaces SET state = ?, updated_at = ? WHERE client_name = ?", (payload, now, client_name)
+            )
+            self._conn.execute(
+                "INSERT INTO history (client_name, ran_at, context) VALUES (?, ?, ?)", (client_name, now, payload)
+            )
+            self._conn.execute(
+                "DELETE FROM history WHERE client_name = ? AND id < ("
+                " SELECT id FROM history WHERE client_name = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (client_name, client_name, self.history_limit - 1),
+            )
+
+    def _history(self, client_name: str, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ran_at, context FROM history WHERE client_name = ? ORDER BY id DESC LIMIT ?",
+                (client_name, limit),
+            ).fetchall()
+        return [{"ran_at": ran_at, "context": json.loads(context)} for ran_at, context in rows]
+
+
+__all__ = ["Workspace", "WorkspaceStore"]
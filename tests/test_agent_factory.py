@@ -31,6 +31,29 @@ class TestAgentFactory(unittest.TestCase):
         for key in expected_keys:
             self.assertIn(key, result)
 
+    def test_run_client_pipelines_isolates_contexts(self):
+        shared = {"notes": []}
+        clients = {f"Clinic {i}": shared for i in range(5)}
+        for executor in ("thread", "async"):
+            results = list(AgentFactory.run_client_pipelines(clients, max_workers=2, executor=executor))
+            self.assertEqual(sorted(r.client_name for r in results), sorted(clients))
+            for result in results:
+                self.assertTrue(result.ok)
+                self.assertGreaterEqual(result.elapsed, 0)
+                self.assertEqual(result.context["account_manager"], f"{result.client_name} onboarded")
+                self.assertIsNot(result.context["notes"], shared["notes"])
+
+    def test_run_client_pipelines_reports_failures(self):
+        results = list(AgentFactory.run_client_pipelines(["Good", ("Bad", "not a dict")]))
+        by_name = {r.client_name: r for r in results}
+        self.assertTrue(by_name["Good"].ok)
+        self.assertFalse(by_name["Bad"].ok)
+        self.assertIsNone(by_name["Bad"].context)
+
+    def test_run_client_pipelines_process_pool(self):
+        results = list(AgentFactory.run_client_pipelines(["A", "B"], max_workers=2, executor="process"))
+        self.assertEqual(sorted(r.client_name for r in results), ["A", "B"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+
+from escale_ai.agent_factory import AgentFactory
+from escale_ai.agent_pool import AgentPool
+from escale_ai.base_team import BaseTeam
+from escale_ai.client_team import ClientTeam
+from escale_ai.tools.calendar_service import LocalCalendarService
+
+
+def pool_keys(team):
+    """What the pool stores each of ``team``'s agents under."""
+    return {(getattr(type(team), stage.name), getattr(type(team), stage.name).key(team)) for stage in team.graph}
+
+
+class TestAgentPool(unittest.TestCase):
+    def test_stateless_agents_are_shared_and_account_managers_per_client(self):
+        pool = AgentPool()
+        a1 = ClientTeam("Clinic A", agent_pool=pool)
+        a2 = ClientTeam("Clinic A", agent_pool=pool)
+        b = ClientTeam("Clinic B", agent_pool=pool)
+        self.assertIs(a1.media_buyer, b.media_buyer)
+        self.assertIs(a1.account_manager, a2.account_manager)
+        self.assertIsNot(a1.account_manager, b.account_manager)
+        self.assertEqual(b.account_manager.client_name, "Clinic B")
+        self.assertIsNot(ClientTeam("Clinic A").media_buyer, a1.media_buyer)
+        self.assertEqual(pool.stats.built, 3)
+
+    def test_agents_keyed_by_services(self):
+        pool = AgentPool()
+        calendar = LocalCalendarService()
+        first = BaseTeam(calendar=calendar, agent_pool=pool)
+        self.assertIs(first.appointment_setter, BaseTeam(calendar=calendar, agent_pool=pool).appointment_setter)
+        self.assertIsNot(first.appointment_setter, BaseTeam(agent_pool=pool).appointment_setter)
+        self.assertIs(first.sales_manager, BaseTeam(agent_pool=pool).sales_manager)
+
+    def test_least_recently_used_client_agents_are_dropped(self):
+        pool = AgentPool(max_agents=2)
+        keep = ClientTeam("A", agent_pool=pool).account_manager
+        ClientTeam("B", agent_pool=pool).account_manager
+        self.assertIs(ClientTeam("A", agent_pool=pool).account_manager, keep)
+        ClientTeam("C", agent_pool=pool).account_manager
+        self.assertIs(ClientTeam("A", agent_pool=pool).account_manager, keep)
+        self.assertEqual(len(pool), 2)
+        ClientTeam("B", agent_pool=pool).account_manager
+        self.assertEqual(pool.stats.built, 4)
+
+    def test_warm_builds_agents_ahead_of_runs(self):
+        pool = AgentPool()
+        self.assertEqual(pool.warm(ClientTeam("", agent_pool=pool), shared_only=True), 4)
+        self.assertEqual(pool.warm(ClientTeam("Clinic A", agent_pool=pool)), 6)
+        built = pool.stats.built
+        ClientTeam("Clinic A", agent_pool=pool).run_pipeline()
+        self.assertEqual(pool.stats.built, built)
+
+    def test_concurrent_runs_with_shared_agents(self):
+        previous = AgentFactory.agent_pool
+        AgentFactory.agent_pool = AgentPool()
+        try:
+            AgentFactory.warm_up(["Clinic 0"])
+
+            async def scenario():
+                return await asyncio.gather(
+                    *(AgentFactory.run_client_pipeline_async(f"Clinic {i % 3}") for i in range(12))
+                )
+
+            results = asyncio.run(scenario())
+            self.assertEqual(
+                [r["account_manager"] for r in results], [f"Clinic {i % 3} onboarded" for i in range(12)]
+            )
+            # One agent per distinct key: the shared ones once, the account manager per client.
+            keys = pool_keys(BaseTeam()).union(*(pool_keys(ClientTeam(f"Clinic {i}")) for i in range(3)))
+            self.assertEqual(AgentFactory.agent_pool.stats.built, len(keys))
+        finally:
+            AgentFactory.agent_pool = previous
+
+
+if __name__ == "__main__":
+    unittest.main()
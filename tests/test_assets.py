@@ -0,0 +1,87 @@
+import os
+import tempfile
+import threading
+import unittest
+import zlib
+
+from escale_ai.assets import AssetRef, AssetStore, Image, solid_png
+from escale_ai.client_team import ClientTeam
+
+
+class TestAssetStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = AssetStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_identical_content_is_stored_once(self):
+        first = self.store.put(b"creative")
+        second = self.store.put(b"creative")
+        self.assertEqual(first, second)
+        self.assertEqual(self.store.read(first), b"creative")
+        self.assertEqual((self.store.stats.written, self.store.stats.deduplicated), (1, 1))
+
+        path = os.path.join(self.tmp.name, "upload.PNG")
+        with open(path, "wb") as f:
+            f.write(b"creative")
+        self.assertEqual(self.store.put_file(path), first)
+        self.assertEqual(AssetRef.parse(first.name), first)
+        self.assertEqual(first.media_type, "image/png")
+        with self.assertRaises(ValueError):
+            AssetRef.parse("../secret.png")
+
+    def test_derived_assets_are_built_once(self):
+        source = self.store.put(b"source")
+        calls = []
+
+        def build():
+            calls.append(1)
+            return b"derived"
+
+        threads = [threading.Thread(target=self.store.derive, args=(("x", source.digest), build)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        derived = self.store.derive(("x", source.digest), build)
+        self.assertEqual(self.store.read(derived), b"derived")
+        self.assertEqual(len(calls), 1)
+        # The index on disk is found by a new store on the same directory.
+        self.assertEqual(AssetStore(self.tmp.name).derive(("x", source.digest), build), derived)
+        self.assertEqual(len(calls), 1)
+
+    def test_solid_png(self):
+        data = solid_png(3, 2, "#0066CC")
+        self.assertTrue(data.startswith(b"\x89PNG\r\n\x1a\n"))
+        start = data.index(b"IDAT") + 4
+        self.assertEqual(zlib.decompress(data[start:]).count(b"\x00\x66\xcc"), 6)
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_branded_variants(self):
+        ref = self.store.put(solid_png(400, 300, "#FFFFFF"))
+        thumb = self.store.render(ref, "thumbnail", brand_kit={"primary_color": "#FF0000"})
+        self.assertEqual(self.store.render(ref, "thumbnail", brand_kit={"primary_color": "#FF0000"}), thumb)
+        with Image.open(self.store.path(thumb)) as image:
+            self.assertEqual(image.size, (256, 256))
+            self.assertEqual(image.getpixel((128, 255))[:3], (255, 0, 0))
+        self.assertEqual(self.store.stats.derived_built, 2)
+
+    @unittest.skipIf(Image is not None, "Pillow is installed")
+    def test_variants_need_pillow(self):
+        with self.assertRaises(RuntimeError):
+            self.store.variant(self.store.put(solid_png(4, 4, "#FFFFFF")), "thumbnail")
+        with self.assertRaises(KeyError):
+            self.store.variant(self.store.put(b"x"), "billboard")
+
+    def test_client_creatives_are_references(self):
+        first = ClientTeam("Clinic A", asset_store=self.store).run_pipeline()["creatives"]
+        second = ClientTeam("Clinic B", asset_store=self.store).run_pipeline()["creatives"]
+        self.assertEqual(first, second)
+        self.assertTrue(all(self.store.exists(AssetRef.parse(name)) for name in first))
+        self.assertEqual(self.store.stats.written, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
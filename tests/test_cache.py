@@ -0,0 +1,173 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from escale_ai import config
+from escale_ai.assets import AssetRef, AssetStore
+from escale_ai.cache import StageCache, fingerprint, stage_key
+from escale_ai.client_team import ClientTeam
+from escale_ai.pipeline import PipelineTeam, Stage, StageGraph
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Echo:
+    def __init__(self, stage):
+        self.stage = stage
+        self.calls = 0
+
+    def run(self, context):
+        self.calls += 1
+        for key in self.stage.writes:
+            context[key] = [context.get(r) for r in self.stage.reads]
+        return context
+
+
+class BriefTeam(PipelineTeam):
+    graph = StageGraph(
+        (
+            Stage("draft", ("brief",), ("draft",)),
+            Stage("review", ("draft",), ("review",)),
+            Stage("assets", (), ("assets",)),
+        )
+    )
+
+    def __init__(self, cache):
+        self.stage_cache = cache
+        for stage in self.graph:
+            setattr(self, stage.name, Echo(stage))
+
+    def cache_key(self, stage, context):
+        return stage_key("brief-team", stage.name, {k: context.get(k) for k in stage.reads})
+
+
+class TestStageCache(unittest.TestCase):
+    def test_key_ignores_mapping_order(self):
+        self.assertEqual(fingerprint({"a": 1, "b": [2]}), fingerprint({"b": [2], "a": 1}))
+        self.assertNotEqual(stage_key("c", "s", {"a": 1}), stage_key("c", "s", {"a": 2}))
+        self.assertNotEqual(stage_key("c", "s", {"a": 1}, "x"), stage_key("c", "s", {"a": 1}, "y"))
+
+    def test_memory_lru_and_ttl(self):
+        clock = Clock()
+        cache = StageCache(max_entries=2, ttl=10, clock=clock)
+        cache.put("c/a/1", {"v": 1})
+        cache.put("c/b/1", {"v": 2})
+        cache.get("c/a/1")
+        cache.put("c/c/1", {"v": 3})
+        self.assertIsNone(cache.get("c/b/1"))
+        hit = cache.get("c/a/1")
+        hit["v"] = 99
+        self.assertEqual(cache.get("c/a/1"), {"v": 1})
+        clock.now += 11
+        self.assertIsNone(cache.get("c/a/1"))
+
+    def test_disk_tier_survives_restart_and_is_capped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.sqlite3")
+            cache = StageCache(max_entries=1, path=path, max_disk_bytes=2000)
+            for i in range(20):
+                cache.put(f"client/stage/{i}", {"blob": "x" * 200})
+            cache.put("other/stage/1", {"v": 1})
+            cache.close()
+
+            reopened = StageCache(path=path, max_disk_bytes=2000)
+            self.assertEqual(reopened.get("other/stage/1"), {"v": 1})
+            self.assertIsNone(reopened.get("client/stage/0"))
+            self.assertEqual(reopened.get("client/stage/19"), {"blob": "x" * 200})
+            self.assertLessEqual(reopened._disk_bytes, 2000)
+            reopened.invalidate("client")
+            self.assertIsNone(reopened.get("client/stage/19"))
+            self.assertEqual(reopened.get("other/stage/1"), {"v": 1})
+            reopened.close()
+
+    def test_values_that_would_change_are_refused(self):
+        cache = StageCache()
+        for value in ({"ci": (1, 2)}, {"plan": {1: "a"}}, {"when": object()}):
+            with self.assertRaises(TypeError):
+                cache.put("c/s/1", value)
+        self.assertEqual(len(cache), 0)
+        cache.put("c/s/1", {"ci": [1.5, 2], "plan": {"a": None}})
+        self.assertEqual(cache.get("c/s/1"), {"ci": [1.5, 2], "plan": {"a": None}})
+
+
+class ThreadRecordingCache(StageCache):
+    def get(self, key):
+        self.threads.add(threading.current_thread())
+        return super().get(key)
+
+    def put(self, key, value):
+        self.threads.add(threading.current_thread())
+        super().put(key, value)
+
+
+class TestCachedPipelines(unittest.TestCase):
+    def test_only_stages_downstream_of_a_change_rerun(self):
+        cache = StageCache(ttl=None)
+        first = BriefTeam(cache)
+        first.run_pipeline({"brief": "v1"})
+        second = BriefTeam(cache)
+        result = second.run_pipeline({"brief": "v1"})
+        self.assertEqual([second.agent(s.name).calls for s in BriefTeam.graph], [0, 0, 0])
+        self.assertEqual(result["review"], [["v1"]])
+
+        third = BriefTeam(cache)
+        result = third.run_pipeline({"brief": "v2"})
+        self.assertEqual([third.agent(s.name).calls for s in BriefTeam.graph], [1, 1, 0])
+        self.assertEqual(result["review"], [["v2"]])
+
+    def test_unserializable_results_are_not_cached(self):
+        cache = StageCache(ttl=None)
+        team = BriefTeam(cache)
+        team.draft.run = lambda context: {"draft": ("a", "b")}
+        self.assertEqual(team.run_pipeline({"brief": "v1"})["draft"], ("a", "b"))
+        # The review echoes the tuple too; only the assets stage is stored.
+        self.assertEqual(len(cache), 1)
+
+    def test_disk_tier_is_used_off_the_event_loop(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ThreadRecordingCache(path=os.path.join(tmp, "cache.sqlite3"))
+            cache.threads = set()
+            asyncio.run(BriefTeam(cache).run_pipeline_async({"brief": "v1"}))
+            cache.close()
+        self.assertTrue(cache.threads)
+        self.assertNotIn(threading.main_thread(), cache.threads)
+
+    def test_client_team_brand_kit_invalidates(self):
+        cache = StageCache(ttl=None)
+        ClientTeam("Clinic A", stage_cache=cache).run_pipeline()
+        self.assertEqual((cache.hits, cache.misses), (0, 6))
+        result = ClientTeam("Clinic A", stage_cache=cache).run_pipeline()
+        self.assertEqual(cache.hits, 6)
+        self.assertEqual(result["creatives"], ["image1.png", "image2.png"])
+
+        ClientTeam("Clinic A", {"primary_color": "#000000"}, stage_cache=cache).run_pipeline()
+        self.assertEqual(cache.misses, 12)
+        original = dict(config.DEFAULT_BRAND_KIT)
+        try:
+            config.DEFAULT_BRAND_KIT["logo_path"] = "assets/new_logo.png"
+            ClientTeam("Clinic A", stage_cache=cache).run_pipeline()
+        finally:
+            config.DEFAULT_BRAND_KIT.clear()
+            config.DEFAULT_BRAND_KIT.update(original)
+        self.assertEqual(cache.misses, 18)
+
+    def test_client_team_agent_config_is_part_of_the_key(self):
+        cache = StageCache(ttl=None)
+        ClientTeam("Clinic A", stage_cache=cache).run_pipeline()
+        with tempfile.TemporaryDirectory() as root:
+            result = ClientTeam("Clinic A", stage_cache=cache, asset_store=AssetStore(root)).run_pipeline()
+        # The creatives and the compliance check that reads them rerun.
+        self.assertEqual((cache.hits, cache.misses), (4, 8))
+        self.assertEqual([AssetRef.parse(name).ext for name in result["creatives"]], [".png", ".png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
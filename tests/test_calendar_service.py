@@ -0,0 +1,50 @@
+import unittest
+from datetime import datetime
+
+from escale_ai.base_team import AIAppointmentSetter
+from escale_ai.tools.calendar_service import LocalCalendarService, SlotUnavailableError
+
+
+# 2026-02-09 is a Monday.
+MONDAY_9AM = datetime(2026, 2, 9, 9, 0)
+
+
+class TestLocalCalendarService(unittest.TestCase):
+    def test_conflicts_are_rejected(self):
+        calendar = LocalCalendarService()
+        calendar.schedule_meeting("a@example.com", "2026-02-09 10:00", 60)
+        self.assertFalse(calendar.is_free("2026-02-09 10:30"))
+        self.assertTrue(calendar.is_free("2026-02-09 11:00"))
+        self.assertTrue(calendar.is_free("2026-02-09 09:30"))
+        with self.assertRaises(SlotUnavailableError):
+            calendar.schedule_meeting("b@example.com", "2026-02-09 09:45", 30)
+        with self.assertRaises(ValueError):
+            calendar.schedule_meeting("b@example.com", "next tuesday")
+
+    def test_next_free_slot_skips_bookings_and_off_hours(self):
+        calendar = LocalCalendarService()
+        calendar.schedule_meeting("a@example.com", "2026-02-09 09:00", 30)
+        calendar.schedule_meeting("b@example.com", "2026-02-09 09:30", 45)
+        self.assertEqual(calendar.next_free_slot("2026-02-09 09:10"), datetime(2026, 2, 9, 10, 15))
+        self.assertEqual(calendar.next_free_slot("2026-02-09 16:50"), datetime(2026, 2, 10, 9, 0))
+        # Friday evening rolls over to Monday morning.
+        self.assertEqual(calendar.next_free_slot("2026-02-13 18:00"), datetime(2026, 2, 16, 9, 0))
+
+    def test_schedule_batch_fills_gaps_in_one_pass(self):
+        calendar = LocalCalendarService()
+        calendar.schedule_meeting("busy@example.com", "2026-02-09 10:00", 60)
+        bookings = calendar.schedule_batch([f"p{i}@example.com" for i in range(4)], MONDAY_9AM, 30)
+        starts = [b.start.strftime("%H:%M") for b in bookings]
+        self.assertEqual(starts, ["09:00", "09:30", "11:00", "11:30"])
+        self.assertEqual([b.start for b in calendar.bookings], sorted(b.start for b in calendar.bookings))
+        for booking in bookings:
+            self.assertFalse(calendar.is_free(booking.start))
+
+    def test_appointment_setter_books_prospects(self):
+        setter = AIAppointmentSetter(LocalCalendarService())
+        context = setter.run({"prospects": ["Glow Spa", "Skin Lab"], "schedule_after": "2026-02-09 16:00"})
+        self.assertEqual(context["appointments"], ["Glow Spa: 2026-02-09 16:00", "Skin Lab: 2026-02-09 16:30"])
+
+
+if __name__ == "__main__":
+    unittest.main()
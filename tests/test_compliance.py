@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+
+from escale_ai.base_team import AIQACompliance, BaseTeam
+from escale_ai.client_team import AIQAComplianceAds, ClientTeam
+from escale_ai.compliance import WARN, ComplianceChecker, Rule
+from escale_ai.templates import EmailTemplate
+
+
+class TestComplianceChecker(unittest.TestCase):
+    def test_phrases_and_claims(self):
+        checker = ComplianceChecker()
+        verdict = checker.check("GUARANTEED   results and a Miracle Cure!\nLose 10 lbs in 7 days.")
+        self.assertFalse(verdict.compliant)
+        self.assertEqual(
+            [(v.rule_id, v.text) for v in verdict.violations],
+            [("guaranteed-results", "GUARANTEED   results"), ("miracle-cure", "Miracle Cure"), ("lose-weight-fast", "Lose 10 lbs in 7 days")],
+        )
+        self.assertEqual(verdict.violations[1].start, 27)
+
+    def test_word_boundaries_and_warnings(self):
+        checker = ComplianceChecker()
+        self.assertTrue(checker.check("A secure booking page; a manicure special.").compliant)
+        verdict = checker.check("Quick visit, zero downtime. 95% satisfaction.")
+        self.assertFalse(verdict.compliant)
+        self.assertEqual([v.severity for v in verdict.violations], [WARN, "block"])
+        self.assertTrue(checker.check("Zero downtime!").compliant)
+
+    def test_batch_scan_and_cache(self):
+        checker = ComplianceChecker(cache_size=10)
+        texts = ["Book a consultation", "Risk-free trial", "Book a consultation", "no\\nrisk"]
+        verdicts = checker.check_batch(texts)
+        self.assertEqual([v.compliant for v in verdicts], [True, False, True, True])
+        self.assertEqual(checker.scanned, 3)
+        checker.check_batch(texts)
+        self.assertEqual(checker.scanned, 3)
+
+    def test_matches_do_not_cross_texts(self):
+        checker = ComplianceChecker()
+        self.assertEqual([v.compliant for v in checker.check_batch(["we offer no", "risk assessment"])], [True, True])
+
+    def test_custom_rules_from_file(self):
+        rules = [{"rule_id": "brand", "pattern": "cheap fillers"}, {"rule_id": "price", "pattern": r"\$\d+ botox", "regex": True}]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rules.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(rules, f)
+            checker = ComplianceChecker.from_file(path)
+        self.assertEqual(checker.rules[0], Rule("brand", "cheap fillers"))
+        self.assertEqual([v.rule_id for v in checker.check("CHEAP fillers, $99 Botox").violations], ["brand", "price"])
+
+
+class TestComplianceAgents(unittest.TestCase):
+    def test_base_qa_checks_outreach_issues_and_proposal(self):
+        context = AIQACompliance().run({"outreach_issues": ["act-now: act now"], "proposal": "100% safe plan"})
+        self.assertFalse(context["compliance"])
+        self.assertEqual(context["compliance_issues"], ["act-now: act now", "100-safe: 100% safe"])
+        self.assertTrue(AIQACompliance().run({"outreach_issues": [], "proposal": "Plan"})["compliance"])
+
+    def test_base_team_reports_rejected_outreach(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "leads.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("clinic_name,email\nclinic1,a@example.com\nclinic2,b@example.com\n")
+            team = BaseTeam(leads_csv=path, outreach_template=EmailTemplate("Hi", "{{ clinic_name }}: guaranteed results"))
+            context = team.run_pipeline()
+        self.assertEqual((context["outreach_queued"], context["outreach_rejected"]), (0, 2))
+        self.assertFalse(context["compliance"])
+        self.assertEqual(context["compliance_issues"], ["guaranteed-results: guaranteed results"])
+
+    def test_ads_qa_checks_ad_copy(self):
+        ads = [{"creative": "a.png", "headline": "Natural results", "body": "Permanent results!"}]
+        context = AIQAComplianceAds().run({"ad_copy": ads, "creatives": ["Guaranteed results"]})
+        self.assertFalse(context["ads_compliance"])
+        self.assertEqual([issue.split(":")[0] for issue in context["ads_compliance_issues"]], ["permanent-results"])
+
+    def test_client_team_checks_its_ad_copy(self):
+        context = ClientTeam("Clinic A").run_pipeline()
+        self.assertEqual([ad["creative"] for ad in context["ad_copy"]], context["creatives"])
+        self.assertTrue(context["ads_compliance"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import time
+import unittest
+
+from escale_ai.tools.crm_service import Contact, CRMWriteBuffer, MockCRMService, SQLiteCRMService
+
+
+class RecordingCRM(MockCRMService):
+    def __init__(self):
+        super().__init__(echo=False)
+        self.batches = []
+
+    def bulk_upsert(self, contacts):
+        self.batches.append(list(contacts))
+        return len(self.batches[-1])
+
+
+class TestSQLiteCRMService(unittest.TestCase):
+    def test_bulk_upsert_keeps_existing_notes(self):
+        crm = SQLiteCRMService()
+        crm.create_or_update_contact("Lead@Example.com", "Lead", "first call")
+        written = crm.bulk_upsert([Contact("lead@example.com", "Lead Renamed"), Contact("b@example.com", "B", "x")])
+        self.assertEqual(written, 2)
+        self.assertEqual(crm.count(), 2)
+        self.assertEqual(crm.get_contact("LEAD@example.com"), Contact("lead@example.com", "Lead Renamed", "first call"))
+
+
+class TestCRMWriteBuffer(unittest.TestCase):
+    def test_coalesces_and_flushes_on_size(self):
+        crm = RecordingCRM()
+        buffer = CRMWriteBuffer(crm, max_items=2, max_delay=None)
+        buffer.create_or_update_contact("a@example.com", "A", "note")
+        buffer.create_or_update_contact("A@example.com", "A2")
+        self.assertEqual(crm.batches, [])
+        buffer.create_or_update_contact("b@example.com", "B")
+        self.assertEqual(crm.batches, [[Contact("a@example.com", "A2", "note"), Contact("b@example.com", "B")]])
+        self.assertEqual(buffer.coalesced, 1)
+
+    def test_empty_notes_clear_and_missing_notes_keep(self):
+        crm = SQLiteCRMService()
+        with CRMWriteBuffer(crm, max_delay=None) as buffer:
+            buffer.create_or_update_contact("a@example.com", "A", "note")
+            buffer.create_or_update_contact("a@example.com", "A")
+            buffer.create_or_update_contact("b@example.com", "B", "note")
+            buffer.create_or_update_contact("b@example.com", "B", "")
+        self.assertEqual(crm.get_contact("a@example.com").notes, "note")
+        self.assertEqual(crm.get_contact("b@example.com").notes, "")
+
+    def test_flushes_after_delay(self):
+        crm = RecordingCRM()
+        buffer = CRMWriteBuffer(crm, max_items=100, max_delay=0.01)
+        buffer.create_or_update_contact("a@example.com", "A")
+        deadline = time.time() + 2
+        while not crm.batches and time.time() < deadline:
+            time.sleep(0.005)
+        self.assertEqual(crm.batches, [[Contact("a@example.com", "A")]])
+        self.assertEqual(len(buffer), 0)
+
+    def test_context_manager_flushes_remaining(self):
+        crm = SQLiteCRMService()
+        with CRMWriteBuffer(crm, max_delay=None) as buffer:
+            buffer.bulk_upsert(Contact(f"lead{i % 10}@example.com", f"Lead {i}") for i in range(100))
+        self.assertEqual(crm.count(), 10)
+        self.assertEqual(crm.get_contact("lead3@example.com").name, "Lead 93")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+from escale_ai.tools.email_sender import EmailSendingEngine, TokenBucket
+from escale_ai.tools.email_service import EmailMessage, MockEmailService
+
+
+class FlakyEmailService(MockEmailService):
+    def __init__(self, failures):
+        super().__init__(echo=False)
+        self.failures = dict(failures)
+
+    def send_email(self, to_address, subject, body):
+        if self.failures.get(to_address, 0) > 0:
+            self.failures[to_address] -= 1
+            raise ConnectionError("provider unavailable")
+        super().send_email(to_address, subject, body)
+
+
+def messages(n):
+    return (EmailMessage(f"lead{i}@example.com", "Hello", "Body") for i in range(n))
+
+
+class TestEmailSendingEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "outbox.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def engine(self, service, **kwargs):
+        kwargs.setdefault("rate_per_second", 1000)
+        kwargs.setdefault("burst", 1000)
+        kwargs.setdefault("backoff", 0)
+        return EmailSendingEngine(service, self.path, **kwargs)
+
+    def test_daily_limit_survives_restart(self):
+        service = MockEmailService(echo=False)
+        with self.engine(service, daily_limit=5) as engine:
+            report = engine.send_bulk(messages(8))
+        self.assertEqual((report.sent, report.failed, report.deferred), (5, 0, 3))
+        with self.engine(service, daily_limit=5) as engine:
+            self.assertEqual(engine.run().sent, 0)
+            self.assertEqual(engine.remaining_today(), 0)
+        with self.engine(service, daily_limit=5, today=lambda: date(2099, 1, 1)) as engine:
+            self.assertEqual(engine.run(), (3, 0, 0))
+        self.assertEqual(service.sent, 8)
+
+    def test_retries_then_fails(self):
+        service = FlakyEmailService({"lead0@example.com": 1, "lead1@example.com": 10})
+        with self.engine(service, max_retries=2) as engine:
+            report = engine.send_bulk(messages(3))
+            self.assertEqual((report.sent, report.failed), (2, 1))
+            # The failed email gives its quota slot back.
+            self.assertEqual(engine.remaining_today(), engine.daily_limit - 2)
+
+    def test_in_flight_messages_are_requeued_after_crash(self):
+        service = MockEmailService(echo=False)
+        with self.engine(service) as engine:
+            engine.enqueue(messages(2))
+            engine.outbox.reserve_and_claim(date.today().isoformat(), 50, 2)
+        with self.engine(service) as engine:
+            self.assertEqual(engine.run().sent, 2)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_refills_over_time(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        now[0] = 0.5
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+
+if __name__ == "__main__":
+    unittest.main()
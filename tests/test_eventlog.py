@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+
+from escale_ai.base_team import AIAppointmentSetter, AIOutreachSpecialist, BaseTeam
+from escale_ai.eventlog import EventLog, JournaledCalendarService, JournaledEmailService, effect
+from escale_ai.pipeline import LazyAgent, PipelineHook, PipelineTeam, Stage, StageGraph
+from escale_ai.templates import EmailTemplate
+from escale_ai.tools.calendar_service import LocalCalendarService
+from escale_ai.tools.email_sender import EmailSendingEngine
+from escale_ai.tools.email_service import MockEmailService
+
+
+class Crash(BaseException):
+    """Stands in for the process dying in the middle of a stage."""
+
+
+class CrashingSetter(AIAppointmentSetter):
+    crashes = 1
+
+    def run(self, context):
+        context = super().run(context)
+        if CrashingSetter.crashes:
+            CrashingSetter.crashes -= 1
+            raise Crash()
+        return context
+
+
+class CrashingTeam(BaseTeam):
+    appointment_setter = LazyAgent(lambda team: CrashingSetter(team.calendar))
+
+
+class Mailer:
+    def __init__(self, email):
+        self.email = email
+
+    def run(self, context):
+        # A reminder sent twice on purpose: identical calls are two effects.
+        self.email.send_email("a@clinic.com", "Hola", "Body")
+        self.email.send_email("a@clinic.com", "Hola", "Body")
+        context["sent"] = 2
+        return context
+
+
+class MailTeam(PipelineTeam):
+    graph = StageGraph([Stage("mailer", writes=("sent",))])
+    mailer = LazyAgent(lambda team: Mailer(team.email))
+
+    def __init__(self, email):
+        self.email = email
+
+
+class CrashingOutreach(AIOutreachSpecialist):
+    crashes = 1
+
+    def run(self, context):
+        context = super().run(context)
+        if CrashingOutreach.crashes:
+            CrashingOutreach.crashes -= 1
+            raise Crash()
+        return context
+
+
+class OutreachTeam(PipelineTeam):
+    graph = StageGraph([Stage.of("outreach", AIOutreachSpecialist)])
+
+    def __init__(self, outreach):
+        self.outreach = outreach
+
+
+class Recorder(PipelineHook):
+    def __init__(self, ran):
+        self.ran = ran
+
+    def before_stage(self, team, stage, context):
+        self.ran.append(stage.name)
+
+
+def crash_context():
+    return {"schedule_after": datetime(2026, 3, 2, 9)}
+
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "events.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def events(self):
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_finished_runs_are_not_pending(self):
+        with EventLog(self.path, fsync=False) as log:
+            result = log.run(BaseTeam(), {"prospect_filters": None}, run_id="r1")
+            self.assertEqual(log.pending(), [])
+        self.assertIn("proposal", result)
+        kinds = [event["type"] for event in self.events()]
+        self.assertEqual(kinds[0], "run_started")
+        self.assertEqual(kinds.count("stage"), len(BaseTeam.graph))
+        self.assertEqual(kinds[-1], "run_finished")
+
+    def test_failed_runs_are_recorded(self):
+        class Broken:
+            def run(self, context):
+                raise ValueError("boom")
+
+        class BrokenTeam(MailTeam):
+            mailer = LazyAgent(lambda team: Broken())
+
+        with EventLog(self.path, fsync=False) as log:
+            with self.assertRaises(ValueError):
+                log.run(BrokenTeam(None))
+            self.assertEqual(log.stats.pending_runs, 0)
+        self.assertEqual(self.events()[-1]["error"], "ValueError: boom")
+
+    def test_crashed_run_is_resumed_without_repeating_bookings(self):
+        calendar = LocalCalendarService()
+        CrashingSetter.crashes = 1
+        log = EventLog(self.path, fsync=False)
+        with self.assertRaises(Crash):
+            log.run(CrashingTeam(calendar=JournaledCalendarService(calendar)), crash_context(), run_id="r1")
+        log.close()
+        bookings = len(calendar.bookings)
+        self.assertGreater(bookings, 0)
+
+        with EventLog(self.path, fsync=False) as log:
+            [record] = log.pending()
+            self.assertEqual(record.run_id, "r1")
+            self.assertIn("prospector", record.completed)
+            self.assertNotIn("appointment_setter", record.completed)
+            self.assertEqual(len(record.effects), 1)
+            ran = []
+
+            def team_for(record):
+                team = BaseTeam(calendar=JournaledCalendarService(calendar))
+                team.add_hook(Recorder(ran))
+                return team
+
+            results = log.recover(team_for)
+            self.assertEqual(log.pending(), [])
+        self.assertEqual(set(ran), {stage.name for stage in BaseTeam.graph} - record.completed)
+        self.assertEqual(len(calendar.bookings), bookings)
+        self.assertEqual(results["r1"]["appointments"], [f"{b.invitee_email}: {b.start:%Y-%m-%d %H:%M}" for b in calendar.bookings])
+
+    def test_skipped_bookings_are_restored_into_a_new_calendar(self):
+        calendar = LocalCalendarService()
+        CrashingSetter.crashes = 1
+        with EventLog(self.path, fsync=False) as log:
+            with self.assertRaises(Crash):
+                log.run(CrashingTeam(calendar=JournaledCalendarService(calendar)), crash_context(), run_id="r1")
+        rebuilt = LocalCalendarService()
+        with EventLog(self.path, fsync=False) as log:
+            log.recover(lambda record: BaseTeam(calendar=JournaledCalendarService(rebuilt)))
+        self.assertEqual(rebuilt.bookings, calendar.bookings)
+        self.assertFalse(rebuilt.is_free(calendar.bookings[0].start))
+
+    def test_resumed_outreach_does_not_queue_emails_twice(self):
+        csv_path = os.path.join(self.tmp.name, "leads.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("clinic_name,email\nGlow,glow@example.com\nAura,aura@example.com\n")
+        template = EmailTemplate("Hi", "Hello {{ clinic_name }}")
+        engine = EmailSendingEngine(MockEmailService(echo=False), outbox_path=":memory:", today=lambda: date(2026, 1, 1))
+        CrashingOutreach.crashes = 1
+        with EventLog(self.path, fsync=False) as log:
+            with self.assertRaises(Crash):
+                log.run(OutreachTeam(CrashingOutreach(template, csv_path, engine)), run_id="r1")
+            self.assertEqual(engine.outbox.count("pending"), 2)
+            results = log.recover(lambda record: OutreachTeam(AIOutreachSpecialist(template, csv_path, engine)))
+            # A new run queues its own copies.
+            log.run(OutreachTeam(AIOutreachSpecialist(template, csv_path, engine)), run_id="r2")
+        self.assertEqual(results["r1"]["outreach_queued"], 2)
+        self.assertEqual(engine.outbox.count("pending"), 4)
+        engine.close()
+
+    def test_effects_run_once_per_run(self):
+        email = MockEmailService(echo=False)
+        with EventLog(self.path, fsync=False) as log:
+            log.run(MailTeam(JournaledEmailService(email)), run_id="r1")
+        self.assertEqual(email.sent, 2)
+        # Replaying the run's events in a new log skips the sends already made.
+        lines = [e for e in self.events() if e["type"] != "run_finished"]
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e) + "\n" for e in lines))
+        with EventLog(self.path, fsync=False) as log:
+            log.recover(lambda record: MailTeam(JournaledEmailService(email)))
+        self.assertEqual(email.sent, 2)
+        self.assertEqual(effect("outside", lambda: "called"), "called")
+
+    def test_runs_inside_an_event_loop(self):
+        email = MockEmailService(echo=False)
+
+        async def handler(log):
+            return log.run(MailTeam(JournaledEmailService(email)), run_id="r1")
+
+        async def recovering_handler(log):
+            return log.recover(lambda record: MailTeam(JournaledEmailService(email)))
+
+        with EventLog(self.path, fsync=False) as log:
+            result = asyncio.run(handler(log))
+        self.assertEqual((result["sent"], email.sent), (2, 2))
+        self.assertEqual([e["type"] for e in self.events()], ["run_started", "effect", "effect", "stage", "run_finished"])
+        lines = [e for e in self.events() if e["type"] != "run_finished"]
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e) + "\n" for e in lines))
+        with EventLog(self.path, fsync=False) as log:
+            asyncio.run(recovering_handler(log))
+        self.assertEqual(email.sent, 2)
+
+    def test_torn_tail_is_truncated(self):
+        with EventLog(self.path, fsync=False) as log:
+            log.run(MailTeam(MockEmailService(echo=False)), run_id="r1")
+        size = os.path.getsize(self.path)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"type":"run_started","run":"r2","te')
+        with EventLog(self.path, fsync=False) as log:
+            self.assertEqual(log.pending(), [])
+        self.assertEqual(os.path.getsize(self.path), size)
+
+    def test_concurrent_runs_share_commits(self):
+        async def main(log):
+            teams = [BaseTeam() for _ in range(20)]
+            return await asyncio.gather(*(log.run_async(team) for team in teams))
+
+        with EventLog(self.path, commit_delay=0.002, fsync=True) as log:
+            results = asyncio.run(main(log))
+            stats = log.stats
+        self.assertEqual(len(results), 20)
+        self.assertEqual(stats.events, 20 * (len(BaseTeam.graph) + 2))
+        self.assertLess(stats.commits, stats.events / 4)
+
+    def test_compact_keeps_pending_runs(self):
+        CrashingSetter.crashes = 1
+        with EventLog(self.path, fsync=False) as log:
+            log.run(BaseTeam(), run_id="done")
+            with self.assertRaises(Crash):
+                log.run(CrashingTeam(), crash_context(), run_id="crashed")
+            kept = 1 + len(log.pending()[0].effects) + len(log.pending()[0].completed)
+            self.assertEqual(log.compact(), kept)
+            [before] = log.pending()
+        with EventLog(self.path, fsync=False) as log:
+            [after] = log.pending()
+        self.assertEqual((after.run_id, after.completed, after.effects), (before.run_id, before.completed, before.effects))
+        self.assertEqual(after.context["prospects"], before.context["prospects"])
+        self.assertEqual({e["run"] for e in self.events()}, {"crashed"})
+
+
+if __name__ == "__main__":
+    unittest.main()
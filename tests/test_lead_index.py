@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from escale_ai.base_team import AIProspector
+from escale_ai.tools.lead_index import LeadIndex
+
+
+CSV_HEADER = "clinic_name,email,website,city,state,instagram,services,notes\n"
+
+
+class TestLeadIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp, "leads.csv")
+        self.index_path = os.path.join(self.tmp, "index")
+        with open(self.csv_path, "w", encoding="utf-8", newline="") as f:
+            f.write(CSV_HEADER)
+            f.write("Glow Spa,Info@GlowSpa.com,glowspa.com,Miami,FL,@glow,botox;fillers,\n")
+            f.write("Glow Spa Dup,info@glowspa.com,,Miami,FL,,botox,\n")
+            f.write("Laser Co,laserco@gmail.com,https://www.laser.co/,Austin,TX,,laser,\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def slots(self):
+        with open(self.index_path + ".idx", "rb") as f:
+            return f.read()[40:]
+
+    def test_dedup_and_lookup(self):
+        with LeadIndex(self.index_path) as index:
+            self.assertEqual(index.ingest_csv(self.csv_path), 2)
+            self.assertEqual(len(index), 2)
+            self.assertIn(" info@glowspa.com ", index)
+            self.assertTrue(index.contains_domain("https://glowspa.com/contact"))
+            self.assertTrue(index.contains_domain("laser.co"))
+            self.assertFalse(index.contains_domain("gmail.com"))
+            self.assertEqual(index.get("laserco@gmail.com")["city"], "Austin")
+
+    def test_incremental_ingest_and_reopen(self):
+        with LeadIndex(self.index_path) as index:
+            index.ingest_csv(self.csv_path)
+        with open(self.csv_path, "a", encoding="utf-8", newline="") as f:
+            f.write("Skin Lab,hello@skinlab.com,,Tampa,fl,,botox,\n")
+        with LeadIndex(self.index_path) as index:
+            self.assertEqual(index.ingest_csv(self.csv_path), 1)
+            self.assertEqual(index.ingest_csv(self.csv_path), 0)
+            self.assertEqual(len(index), 3)
+            names = [lead["clinic_name"] for lead in index.query(state="FL", services="BOTOX")]
+            self.assertEqual(names, ["Glow Spa", "Skin Lab"])
+
+    def test_table_grows_past_initial_capacity(self):
+        with LeadIndex(self.index_path) as index:
+            added = index.add_many({"email": f"lead{i}@clinic{i}.com"} for i in range(3000))
+            self.assertEqual(added, 3000)
+        with LeadIndex(self.index_path) as index:
+            self.assertEqual(len(index), 3000)
+            self.assertTrue(all(f"lead{i}@clinic{i}.com" in index for i in range(0, 3000, 97)))
+
+    def test_slots_are_published_after_the_data_is_flushed(self):
+        with LeadIndex(self.index_path) as index:
+            index.add({"email": "a@clinic.com"})
+            self.assertIn("a@clinic.com", index)
+            self.assertEqual(self.slots().strip(b"\0"), b"")
+            index.flush()
+            self.assertNotEqual(self.slots().strip(b"\0"), b"")
+
+    def test_slots_past_the_data_file_are_dropped(self):
+        with LeadIndex(self.index_path) as index:
+            index.add({"email": "a@clinic.com"})
+            index.flush()
+            size = os.path.getsize(self.index_path + ".dat")
+            index.add({"email": "b@clinic.com"})
+        with open(self.index_path + ".dat", "r+b") as f:
+            f.truncate(size)
+        with LeadIndex(self.index_path) as index:
+            self.assertEqual(len(index), 1)
+            self.assertIn("a@clinic.com", index)
+            self.assertNotIn("b@clinic.com", index)
+            self.assertTrue(index.add({"email": "b@clinic.com"}))
+
+    def test_prospector_queries_index(self):
+        with LeadIndex(self.index_path) as index:
+            prospector = AIProspector(index, self.csv_path)
+            context = prospector.run({"prospect_filters": {"state": "TX"}})
+        self.assertEqual(context["prospects"], ["Laser Co"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+from escale_ai.tools.lead_source import CSVLeadSource
+
+
+CSV_HEADER = "clinic_name,email,website,city,state,instagram,services,notes\n"
+
+
+class TestCSVLeadSource(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(CSV_HEADER)
+            for i in range(10):
+                f.write(f"Clinic {i},c{i}@example.com,,Miami,FL,,botox,\n")
+            f.write('Clinic Q,q@example.com,,Austin,TX,,"botox\nfillers",note\n')
+            f.write(",missing@example.com,,,,,,\n")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_fetch_leads_respects_limit(self):
+        leads = CSVLeadSource(self.path).fetch_leads(limit=3)
+        self.assertEqual(
+            leads,
+            [{"name": f"Clinic {i}", "contact": f"c{i}@example.com"} for i in range(3)],
+        )
+
+    def test_iter_leads_batches_and_resumes(self):
+        source = CSVLeadSource(self.path)
+        batches = list(source.iter_leads(batch_size=4))
+        self.assertEqual([len(b.leads) for b in batches], [4, 4, 3])
+        self.assertEqual(batches[-1].leads[-1]["name"], "Clinic Q")
+
+        resumed = list(source.iter_leads(batch_size=100, offset=batches[0].offset))
+        names = [lead["name"] for b in resumed for lead in b.leads]
+        self.assertEqual(names[0], "Clinic 4")
+        self.assertEqual(len(names), 7)
+
+    def test_iter_leads_projects_columns(self):
+        batch = next(CSVLeadSource(self.path).iter_leads(columns=["email", "services", "missing"]))
+        self.assertEqual(batch.leads[-2], {"email": "q@example.com", "services": "botox\nfillers", "missing": ""})
+
+    def test_missing_file_yields_nothing(self):
+        self.assertEqual(list(CSVLeadSource(self.path + ".nope").iter_leads()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import time
+import unittest
+
+from escale_ai import config
+from escale_ai.cache import StageCache
+from escale_ai.client_team import AIMediaBuyer, ClientTeam
+from escale_ai.media_sim import Channel, channels_from, plan_media, plan_portfolio, splits
+from escale_ai.workspace import WorkspaceStore
+
+CHANNELS = [
+    Channel("cheap", cpm=5.0, ctr=0.01, cvr=0.1, audience=1_000_000, noise=0.2),
+    Channel("pricey", cpm=50.0, ctr=0.01, cvr=0.1, audience=1_000_000, noise=0.2),
+]
+
+
+class TestMediaSim(unittest.TestCase):
+    def test_splits_cover_the_simplex(self):
+        table = splits(3, 0.25)
+        self.assertEqual(len(table), 1 + 15)
+        self.assertTrue(((table.sum(axis=1) - 1) ** 2 < 1e-12).all())
+        self.assertAlmostEqual(table[0][0], 1 / 3)
+
+    def test_plan_prefers_the_cheaper_channel(self):
+        plan = plan_media(1000, CHANNELS, scenarios=500, seed=1)
+        self.assertEqual(plan.allocation, {"cheap": 1000.0, "pricey": 0.0})
+        self.assertTrue(plan.complete)
+        self.assertLessEqual(plan.leads_ci[0], plan.expected_leads)
+        self.assertLessEqual(plan.expected_leads, plan.leads_ci[1])
+        self.assertLessEqual(plan.reach_ci[0], plan.expected_reach)
+        self.assertAlmostEqual(plan.expected_cpl, 1000 / plan.expected_leads)
+
+    def test_saturated_channels_spread_the_budget(self):
+        small = [channel._replace(audience=2000) for channel in CHANNELS]
+        plan = plan_media(1000, small, scenarios=500, seed=1)
+        self.assertGreater(plan.allocation["pricey"], 0)
+        self.assertAlmostEqual(sum(plan.allocation.values()), 1000)
+
+    def test_time_budget_returns_the_best_so_far(self):
+        plan = plan_media(1000, config.MEDIA_CHANNELS, scenarios=200_000, step=0.05, time_budget=0.0, seed=1)
+        self.assertFalse(plan.complete)
+        self.assertGreaterEqual(plan.candidates, 1)
+        self.assertAlmostEqual(sum(plan.allocation.values()), 1000)
+
+    def test_time_budget_holds_for_many_channels(self):
+        many = [channel._replace(name=f"channel{i}") for i in range(8) for channel in CHANNELS[:1]]
+        started = time.perf_counter()
+        plan = plan_media(1000, many, step=0.05, time_budget=0.2, seed=1)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertFalse(plan.complete)
+        self.assertAlmostEqual(sum(plan.allocation.values()), 1000)
+
+    def test_seeded_plans_are_reproducible(self):
+        self.assertEqual(plan_media(800, seed=3), plan_media(800, seed=3))
+        self.assertEqual([c.name for c in channels_from()], list(config.MEDIA_CHANNELS))
+
+    def test_portfolio_over_processes(self):
+        budgets = {f"Clinic {i}": 200.0 * (i + 1) for i in range(4)}
+        previous = config.MEDIA_SIM_PROCESS_THRESHOLD
+        config.MEDIA_SIM_PROCESS_THRESHOLD = 2
+        try:
+            pooled = plan_portfolio(budgets, CHANNELS, workers=2, scenarios=200, seed=2)
+        finally:
+            config.MEDIA_SIM_PROCESS_THRESHOLD = previous
+        inline = plan_portfolio(budgets, CHANNELS, scenarios=200, seed=2)
+        self.assertEqual(list(pooled), list(budgets))
+        self.assertEqual(pooled, inline)
+
+
+class TestMediaBuyer(unittest.TestCase):
+    def test_client_plan_uses_the_workspace_budget(self):
+        with WorkspaceStore(":memory:") as store:
+            store.open("Clinic A").update_limits({"daily_ad_budget_usd": 250})
+            result = store.team("Clinic A").run_pipeline()
+        plan = result["media_plan"]
+        self.assertEqual(plan["budget"], 250)
+        self.assertEqual(set(plan["allocation"]), set(config.MEDIA_CHANNELS))
+
+    def test_channels_from_the_context(self):
+        result = ClientTeam("Clinic B").run_pipeline(
+            {"media_budget_usd": 400, "media_channels": {"meta": config.MEDIA_CHANNELS["meta"]}}
+        )
+        self.assertEqual(result["media_plan"]["allocation"], {"meta": 400.0})
+
+    def test_plans_cut_short_are_not_reused(self):
+        cache = StageCache(ttl=None)
+        buyer = AIMediaBuyer(time_budget=0.0)
+        for _ in range(2):
+            team = ClientTeam("Clinic C", stage_cache=cache)
+            team.media_buyer = buyer
+            self.assertFalse(team.run_pipeline()["media_plan"]["complete"])
+        self.assertEqual(buyer._plans, {})
+        # Every stage but the media buyer came from the cache the second time.
+        self.assertEqual(cache.hits, len(ClientTeam.graph) - 1)
+
+        buyer = AIMediaBuyer(time_budget=None)
+        self.assertTrue(buyer.run({"media_budget_usd": 500})["media_plan"]["complete"])
+        self.assertEqual(len(buyer._plans), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
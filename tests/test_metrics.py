@@ -0,0 +1,128 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from escale_ai import metrics
+from escale_ai.eventlog import JournaledCalendarService, JournaledEmailService
+from escale_ai.pipeline import PipelineTeam, Stage, StageGraph
+from escale_ai.tools.calendar_service import LocalCalendarService
+from escale_ai.tools.email_service import AsyncMockEmailService, MockEmailService
+
+
+class Mailer:
+    def __init__(self, service):
+        self.service = service
+
+    def run(self, context):
+        self.service.send_email("ana@example.com", "Hola", "...")
+        context["sent"] = True
+        return context
+
+
+class Broken:
+    def run(self, context):
+        raise RuntimeError("boom")
+
+
+class MailTeam(PipelineTeam):
+    graph = StageGraph((Stage("mailer", (), ("sent",)),))
+
+    def __init__(self):
+        self.mailer = Mailer(MockEmailService(echo=False))
+
+
+class BrokenTeam(PipelineTeam):
+    graph = StageGraph((Stage("broken", (), ("x",)),))
+
+    def __init__(self):
+        self.broken = Broken()
+
+
+class TestRegistry(unittest.TestCase):
+    def test_prometheus_text_format(self):
+        registry = metrics.Registry()
+        registry.counter("jobs_total", "Jobs.", ("kind",)).inc(("base",), 2)
+        histogram = registry.histogram("latency_seconds", "Latency.", ("op",), buckets=(0.1, 1.0))
+        histogram.observe(("send",), 0.05)
+        histogram.observe(("send",), 0.5)
+        text = registry.render()
+        self.assertIn("# TYPE jobs_total counter\n", text)
+        self.assertIn('jobs_total{kind="base"} 2\n', text)
+        self.assertIn('latency_seconds_bucket{op="send",le="0.1"} 1\n', text)
+        self.assertIn('latency_seconds_bucket{op="send",le="+Inf"} 2\n', text)
+        self.assertIn('latency_seconds_sum{op="send"} 0.55\n', text)
+        self.assertIn('latency_seconds_count{op="send"} 2\n', text)
+        with self.assertRaises(ValueError):
+            registry.histogram("jobs_total", "Jobs.")
+
+
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        metrics.disable()
+
+    def test_disabled_records_nothing(self):
+        MailTeam().run_pipeline()
+        seconds, _ = metrics.stage_metrics()
+        self.assertEqual(seconds.count(("MailTeam", "mailer")), 0)
+        self.assertIsNone(metrics.current_span())
+
+    def test_stage_and_tool_metrics_with_nested_spans(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spans.jsonl")
+            metrics.enable(spans_path=path)
+            MailTeam().run_pipeline()
+            asyncio.run(MailTeam().run_pipeline_async())
+            metrics.disable()
+            spans = metrics.read_spans(path)
+
+        stage_seconds, _ = metrics.stage_metrics()
+        tool_seconds, _ = metrics.tool_metrics()
+        self.assertEqual(stage_seconds.count(("MailTeam", "mailer")), 2)
+        self.assertGreaterEqual(tool_seconds.count(("MockEmailService", "send_email")), 2)
+
+        by_id = {span.span_id: span for span in spans}
+        tools = [span for span in spans if span.kind == "tool"]
+        self.assertEqual(len(tools), 2)
+        for tool in tools:
+            stage = by_id[tool.parent_id]
+            self.assertEqual((stage.kind, stage.name), ("stage", "MailTeam/mailer"))
+            pipeline = by_id[stage.parent_id]
+            self.assertEqual(pipeline.kind, "pipeline")
+            self.assertIsNone(pipeline.parent_id)
+            self.assertEqual({tool.trace_id, stage.trace_id}, {pipeline.trace_id})
+
+    def test_errors_are_counted(self):
+        metrics.enable()
+        with self.assertRaises(RuntimeError):
+            BrokenTeam().run_pipeline()
+        _, errors = metrics.stage_metrics()
+        self.assertEqual(errors.value(("BrokenTeam", "broken")), 1)
+        self.assertIsNone(metrics.current_span())
+
+    def test_journaled_wrappers_are_not_counted_again(self):
+        metrics.enable()
+        JournaledEmailService(MockEmailService(echo=False)).send_email("ana@example.com", "Hola", "...")
+        JournaledCalendarService(LocalCalendarService()).schedule_meeting("ana@example.com", "2026-02-10 10:00")
+        seconds, _ = metrics.tool_metrics()
+        self.assertEqual(seconds.count(("MockEmailService", "send_email")), 1)
+        self.assertEqual(seconds.count(("LocalCalendarService", "schedule_meeting")), 1)
+        self.assertEqual(seconds.count(("JournaledEmailService", "send_email")), 0)
+        self.assertEqual(seconds.count(("JournaledCalendarService", "schedule_meeting")), 0)
+
+    def test_async_tool_calls(self):
+        metrics.enable()
+
+        async def scenario():
+            service = AsyncMockEmailService()
+            await service.send_email("ana@example.com", "Hola", "...")
+            await service.aclose()
+
+        asyncio.run(scenario())
+        seconds, _ = metrics.tool_metrics()
+        self.assertGreaterEqual(seconds.count(("AsyncMockEmailService", "send_email")), 1)
+        self.assertIn("escale_tool_call_duration_seconds_bucket", metrics.render_prometheus())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import asyncio
+import time
+import unittest
+
+from escale_ai.client_team import ClientTeam
+from escale_ai.pipeline import PipelineHook, PipelineTeam, Stage, StageGraph, StageTimer
+
+
+class SlowAgent:
+    def __init__(self, reads, writes, delay=0.05):
+        self.reads, self.writes, self.delay = reads, writes, delay
+
+    async def arun(self, context):
+        for key in self.reads:
+            assert key in context, key
+        await asyncio.sleep(self.delay)
+        for key in self.writes:
+            context[key] = key
+        return context
+
+    def run(self, context):
+        for key in self.writes:
+            context[key] = key
+        return context
+
+
+class Failing:
+    def run(self, context):
+        raise RuntimeError("boom")
+
+
+class DiamondTeam(PipelineTeam):
+    graph = StageGraph(
+        (
+            Stage("root", (), ("a",)),
+            Stage("left", ("a",), ("b",)),
+            Stage("right", ("a",), ("c",)),
+            Stage("join", ("b", "c"), ("d",)),
+        )
+    )
+
+    def __init__(self):
+        for stage in self.graph:
+            setattr(self, stage.name, SlowAgent(stage.reads, stage.writes))
+
+
+class TestStageGraph(unittest.TestCase):
+    def test_dependencies_follow_declared_keys(self):
+        deps = ClientTeam.graph.dependencies
+        self.assertEqual(deps["funnel_architect"], {"growth_strategist"})
+        self.assertEqual(deps["creative_director"], {"growth_strategist"})
+        self.assertEqual(deps["qa_compliance_ads"], {"creative_director"})
+        self.assertEqual(
+            DiamondTeam.graph.levels(), (("root",), ("left", "right"), ("join",))
+        )
+
+    def test_write_after_read_orders_stages(self):
+        graph = StageGraph((Stage("reader", ("x",), ("y",)), Stage("writer", (), ("x",))))
+        self.assertEqual(graph.dependencies["writer"], {"reader"})
+
+    def test_independent_stages_run_concurrently(self):
+        start = time.perf_counter()
+        context = DiamondTeam().run_pipeline({"seed": 1})
+        elapsed = time.perf_counter() - start
+        self.assertEqual(context, {"seed": 1, "a": "a", "b": "b", "c": "c", "d": "d"})
+        # Critical path is three stages of 50ms, not four.
+        self.assertLess(elapsed, 0.19)
+
+    def test_sync_wrapper_inside_event_loop(self):
+        async def call():
+            return DiamondTeam().run_pipeline()
+
+        self.assertEqual(asyncio.run(call())["d"], "d")
+
+    def test_failure_propagates(self):
+        team = DiamondTeam()
+        team.left = Failing()
+        with self.assertRaises(RuntimeError):
+            team.run_pipeline()
+
+    def test_hooks_observe_every_stage(self):
+        class Recorder(PipelineHook):
+            def __init__(self):
+                self.events = []
+
+            def before_stage(self, team, stage, context):
+                self.events.append(("before", stage.name))
+
+            def after_stage(self, team, stage, result, elapsed, error=None):
+                self.events.append(("after", stage.name, error is None))
+
+        team = DiamondTeam()
+        recorder, timer = Recorder(), StageTimer()
+        team.add_hook(recorder)
+        team.add_hook(timer)
+        team.run_pipeline()
+        self.assertEqual(len(recorder.events), 8)
+        self.assertEqual(recorder.events[0], ("before", "root"))
+        self.assertEqual(recorder.events[-1], ("after", "join", True))
+        self.assertEqual(set(timer.samples), {("DiamondTeam", s.name) for s in DiamondTeam.graph})
+        self.assertGreaterEqual(timer.samples[("DiamondTeam", "join")][0], 0.04)
+
+        team.left = Failing()
+        with self.assertRaises(RuntimeError):
+            team.run_pipeline()
+        self.assertIn(("after", "left", False), recorder.events)
+
+    def test_stream_yields_deltas_in_completion_order(self):
+        async def collect(context):
+            return [item async for item in DiamondTeam().stream_pipeline_async(context)]
+
+        context = {"seed": 1}
+        items = asyncio.run(collect(context))
+        self.assertEqual([item.stage for item in items][0], "root")
+        self.assertEqual([item.stage for item in items][-1], "join")
+        self.assertEqual(items[0].delta, {"a": "a"})
+        self.assertEqual(context, {"seed": 1, "a": "a", "b": "b", "c": "c", "d": "d"})
+
+    def test_stream_raises_agent_failure(self):
+        async def collect():
+            team = DiamondTeam()
+            team.left = Failing()
+            return [item.stage async for item in team.stream_pipeline_async()]
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(collect())
+
+
+class Counting(SlowAgent):
+    def __init__(self, reads, writes, value):
+        super().__init__(reads, writes, delay=0)
+        self.value = value
+        self.calls = 0
+
+    def run(self, context):
+        self.calls += 1
+        for key in self.writes:
+            context[key] = [self.value] + [context.get(r) for r in self.reads]
+        return context
+
+    arun = None
+
+
+class CheckpointTeam(DiamondTeam):
+    def __init__(self):
+        for stage in self.graph:
+            setattr(self, stage.name, Counting(stage.reads, stage.writes, 1))
+
+    def calls(self):
+        return {stage.name: self.agent(stage.name).calls for stage in self.graph}
+
+
+class TestIncrementalRerun(unittest.TestCase):
+    def test_downstream_closure(self):
+        self.assertEqual(DiamondTeam.graph.downstream({"left"}), {"left", "join"})
+        self.assertEqual(DiamondTeam.graph.downstream({"root"}), {"root", "left", "right", "join"})
+        with self.assertRaises(KeyError):
+            DiamondTeam.graph.downstream({"missing"})
+
+    def test_resume_from_replays_downstream_only(self):
+        team = CheckpointTeam()
+        team.run_pipeline()
+        team.left.value = 2
+        context = team.resume_from("left")
+        self.assertEqual(team.calls(), {"root": 1, "left": 2, "right": 1, "join": 2})
+        self.assertEqual(context["b"], [2, [1]])
+        self.assertEqual(context["d"][1], [2, [1]])
+
+    def test_rerun_dirty_keeps_manual_fix(self):
+        team = CheckpointTeam()
+        team.run_pipeline()
+        self.assertEqual(team.dirty_stages({"c": "fixed"}), {"join"})
+        context = team.rerun_dirty({"c": "fixed"})
+        self.assertEqual(team.calls(), {"root": 1, "left": 1, "right": 1, "join": 2})
+        self.assertEqual(context["c"], "fixed")
+        self.assertEqual(context["d"][2], "fixed")
+        self.assertEqual(team.dirty_stages(), frozenset())
+
+    def test_rerun_dirty_after_failure(self):
+        team = CheckpointTeam()
+        team.left = Failing()
+        with self.assertRaises(RuntimeError):
+            team.run_pipeline()
+        team.left = Counting(("a",), ("b",), 1)
+        context = team.rerun_dirty()
+        self.assertEqual(team.root.calls, 1)
+        self.assertEqual(context["d"], [1, [1, [1]], [1, [1]]])
+
+    def test_resume_requires_a_run(self):
+        with self.assertRaises(RuntimeError):
+            CheckpointTeam().rerun_dirty()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import unittest
+
+from escale_ai.tools.calendar_service import AsyncMockCalendarService
+from escale_ai.tools.crm_service import AsyncMockCRMService, Contact
+from escale_ai.tools.email_service import AsyncMockEmailService, EmailMessage
+from escale_ai.tools.lead_source import AsyncMockLeadSource
+from escale_ai.tools.pool import ConnectionPool, PoolClosedError, PoolManager, local_connector, run_bounded
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestConnectionPool(unittest.TestCase):
+    def test_reuses_connections_within_the_limit(self):
+        async def scenario():
+            pool = ConnectionPool(local_connector("email"), max_size=3)
+            peak = 0
+
+            async def call(_):
+                nonlocal peak
+                async with pool.connection() as conn:
+                    peak = max(peak, pool.stats.in_use)
+                    await conn.request(0.001)
+
+            self.assertEqual(await run_bounded(call, range(30), 10), 30)
+            await pool.aclose()
+            return pool.stats, peak
+
+        stats, peak = asyncio.run(scenario())
+        self.assertEqual((stats.created, stats.reused, stats.in_use, stats.idle), (3, 27, 0, 0))
+        self.assertEqual(peak, 3)
+
+    def test_idle_timeout_and_discard_on_error(self):
+        async def scenario():
+            clock = Clock()
+            pool = ConnectionPool(local_connector("crm"), max_size=2, idle_timeout=10, clock=clock)
+            first = await pool.acquire()
+            await pool.release(first)
+            clock.now = 5
+            self.assertIs(await pool.acquire(), first)
+            await pool.release(first)
+            clock.now = 20
+            second = await pool.acquire()
+            self.assertIsNot(second, first)
+            self.assertTrue(first.closed)
+            await pool.release(second)
+            with self.assertRaises(ValueError):
+                async with pool.connection():
+                    raise ValueError("boom")
+            self.assertTrue(second.closed)
+            return pool.stats
+
+        self.assertEqual(asyncio.run(scenario()).idle, 0)
+
+    def test_graceful_shutdown(self):
+        async def scenario():
+            pool = ConnectionPool(local_connector("email"), max_size=1)
+            conn = await pool.acquire()
+            waiter = asyncio.ensure_future(pool.acquire())
+            closing = asyncio.ensure_future(pool.aclose())
+            await asyncio.sleep(0)
+            self.assertFalse(closing.done())
+            await pool.release(conn)
+            await closing
+            with self.assertRaises(PoolClosedError):
+                await waiter
+            with self.assertRaises(PoolClosedError):
+                await pool.acquire()
+            return conn
+
+        self.assertTrue(asyncio.run(scenario()).closed)
+
+    def test_manager_shares_pools_per_provider(self):
+        async def scenario():
+            async with PoolManager(limits={"email": 2}) as pools:
+                pool = pools.pool("email", local_connector("email"))
+                self.assertIs(pools.pool("email", local_connector("other")), pool)
+                self.assertEqual(pool.max_size, 2)
+                email = AsyncMockEmailService(pool, latency=0.001)
+                sent = await email.send_bulk((EmailMessage(f"{i}@x.com", "s", "b") for i in range(5)), concurrency=4)
+            self.assertTrue(pool.closed)
+            return sent, pool.stats.created
+
+        self.assertEqual(asyncio.run(scenario()), (5, 2))
+
+    def test_closing_a_service_leaves_a_shared_pool_open(self):
+        async def scenario():
+            async with PoolManager() as pools:
+                pool = pools.pool("email", local_connector("email"))
+                first, second = AsyncMockEmailService(pool), AsyncMockEmailService(pool)
+                await first.aclose()
+                self.assertFalse(pool.closed)
+                await second.send_email("a@b.com", "s", "b")
+                own = AsyncMockEmailService()
+                await own.aclose()
+                self.assertTrue(own.pool.closed)
+            self.assertTrue(pool.closed)
+            return second.calls
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+
+
+class TestAsyncMocks(unittest.TestCase):
+    def test_services(self):
+        async def scenario():
+            leads = AsyncMockLeadSource()
+            calendar = AsyncMockCalendarService()
+            crm = AsyncMockCRMService()
+            found = await leads.fetch_leads(limit=2)
+            link = await calendar.schedule_meeting("a@b.com", "2026-01-01 10:00")
+            written = await crm.bulk_upsert([Contact("a@b.com", "A"), Contact("c@d.com", "C")])
+            for service in (leads, calendar, crm):
+                await service.aclose()
+            return found, link, written, crm.calls
+
+        found, link, written, calls = asyncio.run(scenario())
+        self.assertEqual(found[1], {"name": "Lead 2", "contact": "lead2@example.com"})
+        self.assertEqual(link, "https://cal.mock/a_at_b_com/2026-01-01_10-00")
+        self.assertEqual((written, calls), (2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from escale_ai.agent_factory import AgentFactory
+from escale_ai.client_team import ClientTeam
+from escale_ai.scheduler import PRIORITY_ONBOARDING, PRIORITY_ROUTINE, FairScheduler, Ticket
+from escale_ai.workspace import WorkspaceStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_stages(scheduler, clock, tickets, stage_seconds=1.0):
+    """Queue every ticket behind a held slot, then record the grant order."""
+    order = []
+
+    async def stage(ticket):
+        async with scheduler.slot(ticket):
+            order.append(ticket.tenant)
+            clock.now += stage_seconds
+            await asyncio.sleep(0)
+
+    async def main():
+        blocker = await scheduler.acquire(Ticket("blocker"))
+        tasks = [asyncio.ensure_future(stage(ticket)) for ticket in tickets]
+        await asyncio.sleep(0)
+        scheduler.release(blocker)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    return order
+
+
+class TestFairScheduler(unittest.TestCase):
+    def test_capacity_is_shared_by_weight(self):
+        clock = FakeClock()
+        scheduler = FairScheduler(capacity=1, clock=clock)
+        tickets = [Ticket("big", weight=1)] * 8 + [Ticket("premium", weight=3)] * 8
+        order = run_stages(scheduler, clock, tickets)
+        self.assertEqual(len(order), 16)
+        self.assertGreaterEqual(order[:8].count("premium"), 5)
+        stats = scheduler.stats()
+        self.assertEqual(stats.tenants["premium"].completed, 8)
+        self.assertEqual((stats.running, stats.queued), (0, 0))
+        self.assertGreater(stats.tenants["big"].wait_max_ms, stats.tenants["premium"].wait_p50_ms)
+
+    def test_heavy_stages_are_charged_for_their_time(self):
+        clock = FakeClock()
+        scheduler = FairScheduler(capacity=1, clock=clock)
+        durations = {"heavy": 5.0, "light": 1.0}
+        order = []
+
+        async def stage(ticket):
+            async with scheduler.slot(ticket):
+                order.append(ticket.tenant)
+                clock.now += durations[ticket.tenant]
+                await asyncio.sleep(0)
+
+        async def main():
+            blocker = await scheduler.acquire(Ticket("blocker"))
+            tasks = [asyncio.ensure_future(stage(Ticket(name))) for _ in range(6) for name in durations]
+            await asyncio.sleep(0)
+            scheduler.release(blocker)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(main())
+        self.assertEqual(order[:7], ["heavy"] + ["light"] * 5 + ["heavy"])
+
+    def test_priority_and_deadlines(self):
+        clock = FakeClock()
+        scheduler = FairScheduler(capacity=1, deadline_slack=1.0, clock=clock)
+        order = run_stages(
+            scheduler,
+            clock,
+            [
+                Ticket("routine", PRIORITY_ROUTINE),
+                Ticket("onboarding", PRIORITY_ONBOARDING),
+                Ticket("urgent", PRIORITY_ROUTINE, deadline=clock.now + 0.5),
+                Ticket("later", PRIORITY_ROUTINE, deadline=clock.now + 60),
+            ],
+        )
+        self.assertEqual(order, ["urgent", "onboarding", "routine", "later"])
+
+    def test_deadline_misses_are_counted(self):
+        clock = FakeClock()
+        scheduler = FairScheduler(capacity=1, clock=clock)
+        run_stages(scheduler, clock, [Ticket("a", deadline=clock.now + 0.5)] * 2)
+        self.assertEqual(scheduler.stats().tenants["a"].deadline_misses, 2)
+
+    def test_per_tenant_cap_and_cancellation(self):
+        scheduler = FairScheduler(capacity=4)
+
+        async def main():
+            first = await scheduler.acquire(Ticket("a", max_concurrent=1))
+            waiting = asyncio.ensure_future(scheduler.acquire(Ticket("a", max_concurrent=1)))
+            other = await asyncio.wait_for(scheduler.acquire(Ticket("b")), 1)
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.stats().tenants["a"].queued, 1)
+            self.assertFalse(waiting.done())
+            waiting.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+            self.assertEqual(scheduler.stats().queued, 0)
+            scheduler.release(first)
+            scheduler.release(other)
+            again = await asyncio.wait_for(scheduler.acquire(Ticket("a", max_concurrent=1)), 1)
+            scheduler.release(again)
+
+        asyncio.run(main())
+        self.assertEqual(scheduler.stats().running, 0)
+
+    def test_blocking_acquire_across_threads(self):
+        scheduler = FairScheduler(capacity=1)
+        held = scheduler.acquire_blocking(Ticket("a"))
+        granted = []
+        thread = threading.Thread(target=lambda: granted.append(scheduler.acquire_blocking(Ticket("b"))))
+        thread.start()
+        time.sleep(0.05)
+        self.assertEqual(granted, [])
+        scheduler.release(held)
+        thread.join(1)
+        self.assertEqual(len(granted), 1)
+        self.assertGreater(granted[0].waited, 0)
+        scheduler.release(granted[0])
+
+
+class TestClientTeamScheduling(unittest.TestCase):
+    def test_client_runs_use_workspace_limits_and_onboarding_priority(self):
+        scheduler = FairScheduler(capacity=2)
+        with WorkspaceStore(":memory:", scheduler=scheduler) as store:
+            store.open("Clinic A").update_limits({"scheduler_weight": 4, "max_concurrent_stages": 1})
+            team = store.team("Clinic A")
+            ticket = team.ticket()
+            self.assertEqual((ticket.priority, ticket.weight, ticket.max_concurrent), (PRIORITY_ONBOARDING, 4, 1))
+            result = team.run_pipeline()
+            self.assertEqual(result["account_manager"], "Clinic A onboarded")
+            self.assertEqual(team.ticket().priority, PRIORITY_ROUTINE)
+        self.assertEqual(scheduler.stats().tenants["Clinic A"].completed, len(ClientTeam.graph))
+
+    def test_factory_runs_keep_their_own_priority(self):
+        with WorkspaceStore(":memory:") as store:
+            AgentFactory.workspace_store = store
+            try:
+                urgent = AgentFactory.create_client_team("Clinic A", priority=0, within=5)
+                routine = AgentFactory.create_client_team("Clinic A")
+            finally:
+                AgentFactory.workspace_store = None
+            self.assertEqual(urgent.ticket().priority, 0)
+            self.assertIsNotNone(urgent.ticket().deadline)
+            self.assertEqual(routine.ticket().priority, PRIORITY_ONBOARDING)
+            self.assertIsNone(routine.ticket().deadline)
+
+    def test_concurrent_clients(self):
+        scheduler = FairScheduler(capacity=3)
+
+        async def main():
+            teams = [ClientTeam(f"Clinic {i}", scheduler=scheduler) for i in range(10)]
+            return await asyncio.gather(*(team.run_pipeline_async() for team in teams))
+
+        results = asyncio.run(main())
+        self.assertEqual(len(results), 10)
+        stats = scheduler.stats()
+        self.assertEqual(sum(t.completed for t in stats.tenants.values()), 10 * len(ClientTeam.graph))
+        self.assertEqual((stats.running, stats.queued), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from escale_ai.base_team import BaseTeam
+from escale_ai.bench.scoring import python_top_k, synthetic_leads
+from escale_ai.scoring import LeadTable, ScoringWeights
+
+LEADS = [
+    {"clinic_name": "Glow", "email": "a@glow.com", "website": "glow.com", "instagram": "@glow", "city": "Miami", "state": "FL", "services": "Botox;Fillers"},
+    {"clinic_name": "North", "email": "b@north.ca", "website": "north.ca", "instagram": "@north", "city": "Toronto", "state": "ON", "services": "botox;fillers"},
+    {"clinic_name": "Lux", "email": "c@lux.com", "website": "", "instagram": "", "city": "Austin", "state": "TX", "services": "botox"},
+    {"clinic_name": "Skin", "email": "d@skin.com", "website": "skin.com", "instagram": "", "city": "miami", "state": "fl", "services": "laser hair removal"},
+    {"clinic_name": "NoEmail", "email": "", "website": "x.com", "instagram": "", "city": "Miami", "state": "FL", "services": "botox"},
+]
+
+
+class TestLeadTable(unittest.TestCase):
+    def test_scores_and_qualification(self):
+        table = LeadTable.from_leads(LEADS)
+        self.assertEqual(len(table), 4)
+        scores = table.score(services="botox, fillers")
+        self.assertEqual(list(scores), [5.0, float("-inf"), 1.5, 1.0])
+        top = table.top_k(10, services="botox, fillers")
+        self.assertEqual([lead.clinic_name for lead in top], ["Glow", "Lux", "Skin"])
+        self.assertEqual(top[0].email, "a@glow.com")
+
+    def test_filters_and_weights(self):
+        table = LeadTable.from_leads(LEADS)
+        self.assertEqual([l.clinic_name for l in table.top_k(5, state="fl", city="MIAMI")], ["Glow", "Skin"])
+        weights = ScoringWeights(services=0.0, website=0.0, instagram=5.0)
+        self.assertEqual(table.top_k(1, weights=weights)[0].clinic_name, "Glow")
+        self.assertEqual(table.top_k(0), [])
+        with self.assertRaises(ValueError):
+            table.top_k(1, country="Atlantis")
+
+    def test_matches_python_reference_with_ties(self):
+        rows = list(synthetic_leads(5000, seed=3))
+        table = LeadTable.from_leads(rows)
+        for k in (1, 17, 500):
+            vectorized = [lead.clinic_name for lead in table.top_k(k, services="botox, chemical peel")]
+            self.assertEqual(vectorized, python_top_k(rows, k, "botox, chemical peel"))
+
+    def test_from_csv_and_prospector(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "leads.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("clinic_name,email,website,city,state,instagram,services,notes\n")
+                for lead in LEADS:
+                    f.write(",".join(lead[c] for c in ("clinic_name", "email", "website", "city", "state", "instagram", "services")) + ",\n")
+            table = LeadTable.from_csv(path)
+        team = BaseTeam(lead_table=table)
+        context = team.run_pipeline({"prospect_filters": {"services": "botox"}})
+        self.assertEqual(context["prospects"], ["Glow", "Lux", "Skin"])
+
+
+if __name__ == "__main__":
+    unittest.main()
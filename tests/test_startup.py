@@ -0,0 +1,51 @@
+import subprocess
+import sys
+import unittest
+
+import escale_ai
+import escale_ai.tools
+from escale_ai.base_team import AIQACompliance, BaseTeam
+from escale_ai.bench.startup import BUDGETS, import_profile
+from escale_ai.client_team import ClientTeam
+from escale_ai.state import BasePipelineState
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_heavy_dependencies_are_not_imported(self):
+        for module, (_, forbidden) in BUDGETS.items():
+            loaded = import_profile(module)
+            self.assertIn(module, loaded)
+            self.assertEqual([name for name in forbidden if name in loaded], [], module)
+
+    def test_package_attributes(self):
+        from escale_ai.tools.crm_service import SQLiteCRMService
+
+        self.assertIs(escale_ai.tools.SQLiteCRMService, SQLiteCRMService)
+        self.assertIs(escale_ai.BaseTeam, BaseTeam)
+        self.assertIn("LeadIndex", dir(escale_ai.tools))
+        with self.assertRaises(AttributeError):
+            escale_ai.tools.Missing
+        code = "from escale_ai.tools import EmailMessage; import escale_ai; print(escale_ai.config.EMAIL_LIMIT_PER_DAY)"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), str(escale_ai.config.EMAIL_LIMIT_PER_DAY))
+
+
+class TestLazyAgents(unittest.TestCase):
+    def test_agents_are_built_on_first_use(self):
+        team = ClientTeam("Clinic")
+        self.assertEqual(vars(team).keys() & {stage.name for stage in team.graph}, set())
+        self.assertEqual(team.agent("account_manager").client_name, "Clinic")
+        self.assertIs(team.account_manager, team.agent("account_manager"))
+        self.assertIsNot(ClientTeam("Other").account_manager, team.account_manager)
+
+    def test_agents_can_be_replaced(self):
+        team = BaseTeam()
+        qa = AIQACompliance()
+        team.qa_compliance = qa
+        self.assertIs(team.agent("qa_compliance"), qa)
+        self.assertIs(BaseTeam.state_model, BasePipelineState)
+        self.assertEqual(team.run_pipeline()["sales_manager"], "reviewed")
+
+
+if __name__ == "__main__":
+    unittest.main()
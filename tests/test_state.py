@@ -0,0 +1,66 @@
+import json
+import unittest
+
+from pydantic import ValidationError
+
+from escale_ai.base_team import BaseTeam
+from escale_ai.client_team import ClientTeam
+from escale_ai.state import ClientPipelineState, SlotState, enter_state, exit_state, slots_for, to_json
+
+
+class TestSlotState(unittest.TestCase):
+    def test_behaves_like_a_dict(self):
+        state = enter_state(ClientPipelineState, {"client_name": "A", "extra_key": 1})
+        self.assertFalse(hasattr(state, "__dict__"))
+        self.assertEqual(state["client_name"], "A")
+        self.assertEqual(state.get("extra_key"), 1)
+        self.assertIsNone(state.get("missing"))
+        state["funnel"] = "designed"
+        clone = state.copy()
+        clone["funnel"] = "changed"
+        clone["other"] = 2
+        self.assertEqual(state["funnel"], "designed")
+        self.assertNotIn("other", state)
+        self.assertEqual(dict(state)["extra_key"], 1)
+        self.assertEqual(exit_state(ClientPipelineState, state).funnel, "designed")
+
+    def test_unvalidated_construction(self):
+        state = slots_for(ClientPipelineState)({"creatives": ["a.png"]})
+        self.assertEqual(state.to_dict()["creatives"], ["a.png"])
+        self.assertIsNone(state["media_plan"])
+
+    def test_only_generated_classes_can_be_instantiated(self):
+        class Handwritten(SlotState):
+            __slots__ = ()
+
+        for cls in (SlotState, Handwritten):
+            with self.assertRaises(TypeError):
+                cls({})
+
+    def test_to_json(self):
+        model = ClientPipelineState(client_name="A")
+        self.assertEqual(json.loads(to_json(model))["client_name"], "A")
+        self.assertEqual(json.loads(to_json({"a": 1})), {"a": 1})
+
+
+class TestTypedPipelines(unittest.TestCase):
+    def test_entry_validation(self):
+        with self.assertRaises(ValidationError):
+            BaseTeam().run_pipeline({"prospects": "not a list"})
+
+    def test_run_state_returns_model(self):
+        result = ClientTeam("Typed Clinic").run_state(ClientPipelineState())
+        self.assertIsInstance(result, ClientPipelineState)
+        self.assertEqual(result.client_name, "Typed Clinic")
+        self.assertTrue(result.ads_compliance)
+
+    def test_caller_context_is_filled_in(self):
+        context = {"campaign": "spring"}
+        result = ClientTeam("A").run_pipeline(context)
+        self.assertIs(result, context)
+        self.assertEqual(result["campaign"], "spring")
+        self.assertEqual(result["funnel"], "designed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import csv
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from escale_ai.base_team import AIOutreachSpecialist
+from escale_ai.bench.templates import interpreted_render
+from escale_ai.compliance import ComplianceChecker
+from escale_ai.templates import EmailTemplate, Template, TemplateError, default_outreach_template
+from escale_ai.tools.email_sender import EmailSendingEngine
+from escale_ai.tools.email_service import MockEmailService
+from escale_ai.tools.lead_source import CSVLeadSource
+
+LEADS = [
+    {"clinic_name": "Glow", "email": "glow@example.com", "city": "miami", "services": "Botox;Fillers"},
+    {"clinic_name": "Skin", "email": "", "city": "austin", "services": "laser"},
+    {"clinic_name": "Aura", "email": "aura@example.com", "city": "", "services": ""},
+]
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_with_filters_and_defaults(self):
+        template = Template('Hi {{name|default: "there"}}, {{ city | title }} / {{ services | first | upper }}!')
+        self.assertEqual(template.fields, ("name", "city", "services"))
+        self.assertEqual(template({"city": "new york", "services": "botox, fillers"}), "Hi there, New York / BOTOX!")
+        self.assertEqual(Template("{{ x }}")({"x": "only"}), "only")
+        self.assertEqual(Template("no fields")({}), "no fields")
+
+    def test_literals_are_not_code(self):
+        source = "quote ' \" \\ {x} %s\n{{ a }}''')"
+        self.assertEqual(Template(source)({"a": "A"}), "quote ' \" \\ {x} %s\nA''')")
+
+    def test_errors(self):
+        for source in ("{{ a | nope }}", "{{ a.b }}", "{{ a }} }}", "{{ a | default }}", "{{ a | upper: 'x' }}"):
+            with self.assertRaises(TemplateError, msg=source):
+                Template(source)
+
+    def test_matches_interpreted_rendering(self):
+        template = default_outreach_template()
+        for lead in LEADS:
+            self.assertEqual(template.body(lead), interpreted_render(template.body.source, lead))
+
+
+class TestEmailTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, "leads.csv")
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["clinic_name", "email", "website", "city", "state", "services"])
+            writer.writeheader()
+            writer.writerows(LEADS)
+        self.template = EmailTemplate("For {{ clinic_name }}", "{{ services | first | default: \"care\" }} in {{ city }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_batch_skips_leads_without_address(self):
+        messages = list(self.template.render_batch(LEADS))
+        self.assertEqual([m.to_address for m in messages], ["glow@example.com", "aura@example.com"])
+        self.assertEqual(messages[0].subject, "For Glow")
+        self.assertEqual(messages[1].body, "care in ")
+
+    def test_stream_compliance_gate(self):
+        template = EmailTemplate("Hi", "{{ clinic_name }}: guaranteed results")
+        rejected = []
+        messages = list(
+            template.stream(CSVLeadSource(self.csv_path), batch_size=1, checker=ComplianceChecker(),
+                            on_reject=lambda message, verdict: rejected.append(message.to_address))
+        )
+        self.assertEqual(messages, [])
+        self.assertEqual(rejected, ["glow@example.com", "aura@example.com"])
+
+    def test_outreach_streams_into_engine(self):
+        engine = EmailSendingEngine(MockEmailService(echo=False), outbox_path=":memory:", today=lambda: date(2026, 1, 1))
+        agent = AIOutreachSpecialist(self.template, self.csv_path, engine)
+        context = agent.run({"prospects": ["Aura", "Skin"]})
+        self.assertEqual((context["outreach"], context["outreach_queued"]), ("emails_queued", 1))
+        self.assertEqual(engine.outbox.count("pending"), 1)
+        self.assertEqual(AIOutreachSpecialist(self.template, self.csv_path).run({})["outreach_queued"], 2)
+        engine.close()
+
+    def test_outreach_filter_reads_clinic_name_the_template_does_not_use(self):
+        template = EmailTemplate("Hello", "Hi there in {{ city }}")
+        context = AIOutreachSpecialist(template, self.csv_path).run({"prospects": ["Aura"]})
+        self.assertEqual(context["outreach_queued"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+
+from escale_ai import config
+from escale_ai.agent_factory import AgentFactory
+from escale_ai.assets import AssetStore, Image, solid_png
+from escale_ai.workspace import WorkspaceStore
+from web_chat import app as web_app
+from web_chat.app import app
+from web_chat.jobs import JobQueue, QueueFullError
+
+
+def wait_for(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+class TestJobEndpoints(unittest.TestCase):
+    def setUp(self):
+        # The app opens its own asset store when none is set; keep it out of the tree.
+        self.tmp = tempfile.TemporaryDirectory()
+        self.asset_store_path = config.ASSET_STORE_PATH
+        config.ASSET_STORE_PATH = self.tmp.name
+
+    def tearDown(self):
+        config.ASSET_STORE_PATH = self.asset_store_path
+        self.tmp.cleanup()
+
+    def test_run_client_returns_job_id_then_result(self):
+        with TestClient(app) as client:
+            response = client.post("/run_client", json={"client_name": "Clinic A"})
+            self.assertEqual(response.status_code, 202)
+            job_id = response.json()["job_id"]
+            self.assertEqual(response.headers["location"], f"/jobs/{job_id}")
+            job = wait_for(client, job_id)
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["result"]["client_name"], "Clinic A")
+
+    def test_run_base_and_unknown_job(self):
+        with TestClient(app) as client:
+            job = wait_for(client, client.post("/run_base").json()["job_id"])
+            self.assertEqual(job["status"], "done")
+            self.assertIn("sales_manager", job["result"])
+            self.assertEqual(client.get("/jobs/missing").status_code, 404)
+
+    def test_metrics_endpoint(self):
+        with TestClient(app) as client:
+            wait_for(client, client.post("/run_base").json()["job_id"])
+            response = client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn('escale_stage_duration_seconds_count{team="BaseTeam",stage="prospector"}', response.text)
+
+    def test_assets_are_served_with_etag_and_ranges(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = AgentFactory.asset_store = AssetStore(root)
+            try:
+                with TestClient(app) as client:
+                    job = wait_for(client, client.post("/run_client", json={"client_name": "Clinic A"}).json()["job_id"])
+                    name = job["result"]["creatives"][0]
+                    response = client.get(f"/assets/{name}")
+                    etag = response.headers["etag"]
+                    cached = client.get(f"/assets/{name}", headers={"If-None-Match": etag})
+                    partial = client.get(f"/assets/{name}", headers={"Range": "bytes=0-7"})
+                    missing = client.get("/assets/" + "0" * 64 + ".png")
+                    resized = client.get(f"/assets/{name}", params={"format": "thumbnail"})
+            finally:
+                AgentFactory.asset_store = None
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "image/png")
+        self.assertEqual(response.content, solid_png(1080, 1080, "#F4E1D2"))
+        self.assertEqual(etag, f'"{name[:64]}"')
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual((partial.status_code, partial.content), (206, b"\x89PNG\r\n\x1a\n"))
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(resized.status_code, 501 if Image is None else 200)
+        self.assertEqual(store.stats.written, 2 if Image is None else 3)
+
+    def test_asset_variants_redirect_and_need_a_known_client(self):
+        class PaintingStore(AssetStore):
+            """Renders a variant as a tile of the brand color, without Pillow."""
+
+            def render(self, ref, fmt=None, brand_kit=None):
+                return self.put(solid_png(8, 8, (brand_kit or {}).get("primary_color", "#000000")))
+
+        with tempfile.TemporaryDirectory() as root:
+            store = AgentFactory.asset_store = PaintingStore(root)
+            workspaces = AgentFactory.workspace_store = WorkspaceStore(":memory:")
+            try:
+                workspaces.open("Clinic A", {"primary_color": "#112233"})
+                name = store.put(solid_png(64, 64, "#FFFFFF")).name
+                with TestClient(app) as client:
+                    unknown = client.get(f"/assets/{name}", params={"client": "Clinic Z"})
+                    branded = client.get(f"/assets/{name}", params={"client": "Clinic A"}, follow_redirects=False)
+                    variant = client.get(branded.headers["location"])
+                self.assertNotIn("Clinic Z", workspaces)
+            finally:
+                AgentFactory.asset_store = AgentFactory.workspace_store = None
+                workspaces.close()
+        self.assertEqual(unknown.status_code, 404)
+        self.assertEqual(branded.status_code, 302)
+        self.assertNotIn("immutable", branded.headers["cache-control"])
+        self.assertEqual(variant.content, solid_png(8, 8, "#112233"))
+        self.assertIn("immutable", variant.headers["cache-control"])
+
+    def test_stream_client_sends_one_event_per_stage(self):
+        with TestClient(app) as client:
+            response = client.get("/stream/client", params={"client_name": "Clinic A"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+        stages = [json.loads(lines[1][len("data: "):]) for lines in events if lines[0] == "event: stage"]
+        self.assertEqual(len(stages), 6)
+        self.assertEqual(events[-1][0], "event: done")
+        media = next(s for s in stages if s["stage"] == "media_buyer")
+        self.assertEqual(list(media["delta"]), ["media_plan"])
+
+    def test_stream_slot_is_freed_when_the_client_is_gone(self):
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            raise OSError("connection reset")
+
+        response = web_app._stream(AgentFactory.create_base_team())
+        self.assertEqual(web_app.active_streams, 1)
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        with self.assertRaises(Exception):
+            asyncio.run(response(scope, receive, send))
+        self.assertEqual(web_app.active_streams, 0)
+
+
+class TestJobQueue(unittest.TestCase):
+    def test_backpressure_and_failures(self):
+        async def scenario():
+            queue = JobQueue(workers=1, max_pending=1, keep=2)
+            await queue.start()
+            release = asyncio.Event()
+
+            async def blocked():
+                await release.wait()
+                return {"ok": True}
+
+            async def broken():
+                raise ValueError("bad input")
+
+            first = queue.submit("test", blocked)
+            await asyncio.sleep(0)  # the worker picks up the first job
+            second = queue.submit("test", broken)
+            with self.assertRaises(QueueFullError):
+                queue.submit("test", blocked)
+            release.set()
+            while not second.done:
+                await asyncio.sleep(0.001)
+            await queue.stop()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first.result, {"ok": True})
+        self.assertEqual(second.status, "failed")
+        self.assertEqual(second.error, "ValueError: bad input")
+
+    def test_finished_jobs_are_pruned(self):
+        async def scenario():
+            queue = JobQueue(workers=2, max_pending=10, keep=2)
+            await queue.start()
+
+            async def quick():
+                return {}
+
+            submitted = [queue.submit("test", quick) for _ in range(5)]
+            while not all(job.done for job in submitted):
+                await asyncio.sleep(0.001)
+            await queue.stop()
+            return queue, submitted
+
+        queue, submitted = asyncio.run(scenario())
+        self.assertEqual(sum(queue.get(job.id) is not None for job in submitted), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from escale_ai import config
+from escale_ai.agent_factory import AgentFactory
+from escale_ai.cache import StageCache
+from escale_ai.scheduler import FairScheduler
+from escale_ai.workspace import WorkspaceStore
+
+
+class TestWorkspaceStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "workspaces.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_workspace_defaults_and_persistence(self):
+        with WorkspaceStore(self.path) as store:
+            self.assertIsNone(store.get("Clinic A"))
+            workspace = store.open("Clinic A", {"primary_color": "#111111"})
+            workspace.update_limits({"daily_ad_budget_usd": 250})
+            self.assertIn("Clinic A", store)
+
+        with WorkspaceStore(self.path) as store:
+            workspace = store.get("Clinic A")
+            self.assertEqual(workspace.brand_kit["primary_color"], "#111111")
+            self.assertEqual(workspace.brand_kit["logo_path"], config.DEFAULT_BRAND_KIT["logo_path"])
+            self.assertEqual(workspace.limits["daily_ad_budget_usd"], 250)
+            self.assertEqual(
+                workspace.limits["max_creatives_per_run"], config.DEFAULT_CLIENT_LIMITS["max_creatives_per_run"]
+            )
+            self.assertEqual(len(store), 1)
+
+    def test_runs_are_saved_with_bounded_history(self):
+        with WorkspaceStore(self.path, history_limit=3) as store:
+            team = store.team("Clinic A")
+            other = store.team("Clinic B")
+            for _ in range(5):
+                team.run_pipeline()
+                other.run_pipeline()
+            team.rerun_dirty({"creatives": ["fixed.png"]})
+
+        with WorkspaceStore(self.path) as store:
+            workspace = store.get("Clinic A")
+            self.assertEqual(workspace.state["creatives"], ["fixed.png"])
+            history = workspace.history()
+            self.assertEqual(len(history), 3)
+            self.assertEqual(history[0]["context"]["creatives"], ["fixed.png"])
+            self.assertEqual(len(store.get("Clinic B").history()), 3)
+
+    def test_hot_workspaces_are_reused_and_bounded(self):
+        with WorkspaceStore(self.path, max_hot_teams=2) as store:
+            first = store.team("A")
+            second = store.team("A")
+            self.assertIsNot(second, first)
+            self.assertIs(second.workspace, first.workspace)
+            store.team("B")
+            store.team("C")
+            self.assertIsNot(store.team("A").workspace, first.workspace)
+            self.assertEqual(list(store.names()), ["A", "B", "C"])
+
+    def test_concurrent_runs_of_one_client_do_not_share_state(self):
+        with WorkspaceStore(self.path) as store:
+            first, second = store.team("A"), store.team("A")
+            first.run_pipeline({"media_budget_usd": 100})
+            second.run_pipeline({"media_budget_usd": 200})
+            first.rerun_dirty({"creatives": ["fixed.png"]})
+            self.assertEqual(store.get("A").state["media_plan"]["budget"], 100)
+            self.assertEqual(len(store.get("A").history()), 3)
+
+    def test_brand_kit_changes_reach_attached_team(self):
+        with WorkspaceStore(self.path) as store:
+            team = store.team("A")
+            store.open("A").update_brand_kit({"secondary_color": "#222222"})
+            self.assertEqual(team.brand_kit["secondary_color"], "#222222")
+
+    def test_agent_factory_attaches_to_workspace(self):
+        store = WorkspaceStore(self.path)
+        AgentFactory.workspace_store = store
+        try:
+            team = AgentFactory.create_client_team("Clinic A", {"primary_color": "#333333"})
+            self.assertIs(AgentFactory.create_client_team("Clinic A").workspace, team.workspace)
+            AgentFactory.run_client_pipeline("Clinic A")
+        finally:
+            AgentFactory.workspace_store = None
+        self.assertEqual(store.get("Clinic A").state["client_name"], "Clinic A")
+        self.assertEqual(store.get("Clinic A").brand_kit_overrides, {"primary_color": "#333333"})
+        store.close()
+
+    def test_agent_factory_settings_reach_workspace_teams(self):
+        store = WorkspaceStore(self.path)
+        cache, scheduler = StageCache(ttl=None), FairScheduler()
+        AgentFactory.workspace_store, AgentFactory.stage_cache, AgentFactory.scheduler = store, cache, scheduler
+        try:
+            team = AgentFactory.create_client_team("Clinic A")
+        finally:
+            AgentFactory.workspace_store = AgentFactory.stage_cache = AgentFactory.scheduler = None
+        self.assertIs(team.stage_cache, cache)
+        self.assertIs(team.scheduler, scheduler)
+        self.assertIsNone(store.team("Clinic A").stage_cache)
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,52 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from escale_ai import config, metrics
 from escale_ai.agent_factory import AgentFactory
+from escale_ai.assets import AssetRef, AssetStore
+from escale_ai.state import to_json
+from web_chat.jobs import JobQueue, QueueFullError
 import os
 
-app = FastAPI()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Pipeline runs are executed in the background so handlers never block the event loop
+jobs = JobQueue(
+    workers=config.WEB_JOB_WORKERS,
+    max_pending=config.WEB_JOB_QUEUE_SIZE,
+    keep=config.WEB_JOB_RETENTION,
+)
+
+# Streams run in the handler's own task, so they are capped separately
+active_streams = 0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.WEB_METRICS_ENABLED:
+        metrics.enable(spans_path=config.METRICS_SPANS_PATH)
+    own_assets = config.WEB_ASSETS_ENABLED and AgentFactory.asset_store is None
+    if own_assets:
+        AgentFactory.asset_store = AssetStore(config.ASSET_STORE_PATH)
+    AgentFactory.warm_up()
+    await jobs.start()
+    try:
+        yield
+    finally:
+        await jobs.stop()
+        if own_assets:
+            AgentFactory.asset_store = None
+        if config.WEB_METRICS_ENABLED:
+            metrics.disable()
+
+
+app = FastAPI(lifespan=lifespan)
+
 # Serve static files
 app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 
@@ -16,23 +55,131 @@ async def read_index():
     """Serve the chat interface"""
     return FileResponse(os.path.join(BASE_DIR, "static", "index.html"))
 
-@app.post("/run_base")
-async def run_base():
-    """Execute the base team pipeline and return its context"""
+@app.get("/metrics")
+async def get_metrics():
+    """Expose stage and tool call metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+# Blobs never change once stored, so clients may cache them forever
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Branded/resized variants redirect to their blob; which blob that is changes
+# with the client's brand kit, so the redirect itself is only cached briefly
+ASSET_VARIANT_CACHE_CONTROL = "public, max-age=60"
+
+def _brand_kit(client):
+    """Brand kit of an existing client, read without creating a workspace; None if unknown"""
+    if AgentFactory.workspace_store is None:
+        return dict(config.DEFAULT_BRAND_KIT)
+    workspace = AgentFactory.workspace_store.get(client)
+    return workspace.brand_kit if workspace is not None else None
+
+@app.get("/assets/{name}")
+async def get_asset(name: str, request: Request, format: Optional[str] = None, client: Optional[str] = None):
+    """Serve a stored creative; branded or resized variants redirect to their own blob, rendered on first request"""
+    store = AgentFactory.asset_store
     try:
-        result = AgentFactory.run_base_pipeline()
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        ref = AssetRef.parse(name)
+    except ValueError:
+        ref = None
+    if store is None or ref is None or not store.exists(ref):
+        raise HTTPException(status_code=404, detail="asset not found")
+    if format is not None or client is not None:
+        brand_kit = None
+        if client:
+            brand_kit = await asyncio.to_thread(_brand_kit, client)
+            if brand_kit is None:
+                raise HTTPException(status_code=404, detail="client not found")
+        try:
+            # Rendering is CPU-bound; done once per variant, then served from disk
+            ref = await asyncio.to_thread(store.render, ref, format, brand_kit)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"unknown ad format: {format}")
+        except RuntimeError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+        return RedirectResponse(f"/assets/{ref.name}", status_code=302, headers={"Cache-Control": ASSET_VARIANT_CACHE_CONTROL})
+    headers = {"ETag": f'"{ref.digest}"', "Cache-Control": ASSET_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if any(tag.strip().removeprefix("W/") in (headers["ETag"], "*") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    # FileResponse streams straight from disk (zero-copy where the server
+    # supports pathsend) and answers Range requests itself
+    return FileResponse(store.path(ref), media_type=ref.media_type, headers=headers)
+
+def _submit(kind, factory):
+    """Queue a pipeline run and answer 202 with its job id, or 429 if the queue is full"""
+    try:
+        job = jobs.submit(kind, factory)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status},
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+@app.post("/run_base", status_code=202)
+async def run_base():
+    """Queue a base team pipeline run and return its job id"""
+    return _submit("base", AgentFactory.run_base_pipeline_async)
 
 class ClientRequest(BaseModel):
     client_name: str
 
-@app.post("/run_client")
+@app.post("/run_client", status_code=202)
 async def run_client(req: ClientRequest):
-    """Execute a client team pipeline given a client name"""
+    """Queue a client team pipeline run given a client name and return its job id"""
+    return _submit("client", lambda: AgentFactory.run_client_pipeline_async(req.client_name))
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return the status of a pipeline run and, once finished, its context or error"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job.to_dict()
+
+async def _stage_events(team, context=None):
+    """Yield one SSE event per completed stage with only the keys it wrote"""
     try:
-        result = AgentFactory.run_client_pipeline(req.client_name)
-        return result
+        async for item in team.stream_pipeline_async(context):
+            payload = {"stage": item.stage, "delta": item.delta, "elapsed_ms": round(item.elapsed * 1000, 3)}
+            yield f"event: stage\ndata: {to_json(payload)}\n\n"
+        yield "event: done\ndata: {}\n\n"
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        yield f"event: error\ndata: {to_json({'error': str(e)})}\n\n"
+
+class _StreamSlotResponse(StreamingResponse):
+    """Streaming response that frees its stream slot however it ends
+
+    The slot is released here rather than in the generator, whose cleanup
+    never runs when the client disconnects before the first event.
+    """
+
+    async def __call__(self, scope, receive, send):
+        global active_streams
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            active_streams -= 1
+
+def _stream(team, context=None):
+    """Answer with a Server-Sent Events stream of the team's stages, or 429 when too many are open"""
+    global active_streams
+    if active_streams >= config.WEB_STREAM_LIMIT:
+        raise HTTPException(status_code=429, detail="too many open streams", headers={"Retry-After": "1"})
+    active_streams += 1
+    return _StreamSlotResponse(
+        _stage_events(team, context),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/stream/base")
+async def stream_base():
+    """Stream the base team pipeline stage by stage"""
+    return _stream(AgentFactory.create_base_team())
+
+@app.get("/stream/client")
+async def stream_client(client_name: str):
+    """Stream a client team pipeline stage by stage"""
+    return _stream(AgentFactory.create_client_team(client_name))
@@ -0,0 +1,142 @@
+"""
+Bounded background job queue for the chat server.
+
+Pipeline runs are submitted as coroutine factories and executed by a fixed
+number of asyncio worker tasks, so request handlers return immediately with
+a job id and the event loop stays free for other users. When the queue is
+full `JobQueue.submit` raises `QueueFullError` and the caller should answer
+with HTTP 429. Finished jobs are kept for polling until ``keep`` newer jobs
+have finished.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+JobFactory = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """A queued pipeline run and, once finished, its result."""
+
+    __slots__ = ("id", "kind", "status", "result", "error", "created", "started", "finished", "_factory")
+
+    def __init__(self, kind: str, factory: JobFactory) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._factory: Optional[JobFactory] = factory
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobQueue:
+    """Run submitted jobs on ``workers`` asyncio tasks with a bounded backlog.
+
+    Args:
+        workers: jobs executed concurrently
+        max_pending: jobs allowed to wait in the queue
+        keep: finished jobs retained for status lookups
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 100, keep: int = 1000) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.keep = keep
+        self._jobs: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued jobs are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, kind: str, factory: JobFactory) -> Job:
+        """Queue a job without waiting for it.
+
+        Raises:
+            QueueFullError: if ``max_pending`` jobs are already waiting.
+            RuntimeError: if the queue has not been started.
+        """
+        if self._queue is None:
+            raise RuntimeError("job queue is not running")
+        job = Job(kind, factory)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"{self.max_pending} jobs already waiting") from None
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def pending(self) -> int:
+        """Jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            job.status = "running"
+            job.started = time.time()
+            factory, job._factory = job._factory, None
+            try:
+                job.result = await factory()
+                job.status = "done"
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                job.error = f"{type(exc).__name__}: {exc}"
+                job.status = "failed"
+            finally:
+                job.finished = time.time()
+                self._retire(job)
+                queue.task_done()
+
+    def _retire(self, job: Job) -> None:
+        self._finished[job.id] = None
+        while len(self._finished) > self.keep:
+            old_id, _ = self._finished.popitem(last=False)
+            self._jobs.pop(old_id, None)